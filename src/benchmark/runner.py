@@ -0,0 +1,183 @@
+# src/benchmark/runner.py
+
+import io
+import os
+import json
+import time
+import inspect
+import platform
+import tempfile
+from contextlib import redirect_stdout
+from src.benchmark.synthetic import DEFAULT_FILLERS, generate_xpt, zip_xpt
+from src.extract.extract import extract_zip
+from src.flow.instrumentation import StageProfiler
+from src.transform.transform import DEFAULT_FEATURE_MAP_PATH, DEFAULT_TARGET_COUNTS, output_path_for, transform_dataset
+from src.visualization import charts
+from src.visualization.data_loader import load_aggregates
+
+DEFAULT_WORKDIR = "data/benchmark"
+DEFAULT_ROWS = [10_000, 300_000]
+DEFAULT_THRESHOLD = 0.10
+# Pada input kecil kelas 0 tidak cukup untuk 70.000 sampel: target diskalakan ke seperempat baris
+SMALL_INPUT_FRACTION = 0.25
+# Selisih absolut minimum agar dianggap regresi (di bawahnya noise timer/alokator)
+MIN_WALL_DELTA_S = 0.05
+MIN_RSS_DELTA_MB = 8.0
+
+def chart_builders():
+    """
+    Semua fungsi create_* di charts.py; builder dengan parameter `year` dipanggil per tahun.
+    """
+    return [(name, function) for name, function in inspect.getmembers(charts, inspect.isfunction)
+            if name.startswith("create_") and function.__module__ == charts.__name__]
+
+def target_counts_for(rows):
+    return {label: min(target, int(rows * SMALL_INPUT_FRACTION)) for label, target in DEFAULT_TARGET_COUNTS.items()}
+
+def prepare_input(workdir, rows, year, fillers, seed):
+    """
+    Membuat (atau memakai ulang) XPT dan ZIP sintetis untuk satu ukuran input.
+    """
+    raw_dir = os.path.join(workdir, f"rows-{rows}-fillers-{fillers}-seed-{seed}")
+    os.makedirs(raw_dir, exist_ok=True)
+    xpt_path = os.path.join(raw_dir, f"LLCP{year}.XPT")
+    zip_path = os.path.join(raw_dir, f"LLCP{year}XPT.zip")
+    if not os.path.exists(xpt_path):
+        generate_xpt(xpt_path, rows, year=year, fillers=fillers, seed=seed)
+    if not os.path.exists(zip_path):
+        zip_xpt(xpt_path, zip_path)
+    return xpt_path, zip_path
+
+def _measure(profiler, name, function, rows_in=None):
+    with profiler.stage(name, rows_in=rows_in) as stage, redirect_stdout(io.StringIO()):
+        result = function()
+    return stage, result
+
+def run_size(workdir, rows, year, fillers=DEFAULT_FILLERS, seed=0, chunksize=250_000, reader="xport"):
+    """
+    Mengukur extract_zip, transform_dataset, load_aggregates dan tiap chart builder untuk satu ukuran input.
+    Return: list record (satu per target)
+    """
+    xpt_path, zip_path = prepare_input(workdir, rows, year, fillers, seed)
+    profiler = StageProfiler("benchmark", year)
+    results = []
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        extract_dir = os.path.join(tmp, "raw")
+        processed_dir = os.path.join(tmp, "processed")
+        os.makedirs(extract_dir)
+
+        stage, _ = _measure(profiler, "extract_zip", lambda: extract_zip(zip_path, extract_dir), rows_in=rows)
+        stage["bytes_in"] = os.path.getsize(zip_path)
+        results.append(stage)
+
+        output_path = output_path_for(processed_dir, str(year))
+        stage, record = _measure(profiler, "transform_dataset", lambda: transform_dataset.fn(
+            xpt_path, DEFAULT_FEATURE_MAP_PATH, output_path, str(year), os.path.join(tmp, "missing_features.log"),
+            reader=reader, chunksize=chunksize, metrics_path=None, metrics_db=None, target_counts=target_counts_for(rows),
+        ), rows_in=rows)
+        stage["rows_out"] = record["stages"][-1]["rows_out"] if record["status"] == "ok" else None
+        stage["status"] = record["status"]
+        stage["stages"] = record["stages"]
+        results.append(stage)
+        if record["status"] != "ok":
+            return [dict(result, rows=rows, year=year) for result in results]
+
+        stage, aggregates = _measure(profiler, "load_aggregates", lambda: load_aggregates(processed_dir))
+        loaded_rows = sum(year_aggregates["rows"] for year_aggregates in aggregates.values())
+        stage["rows_out"] = loaded_rows
+        results.append(stage)
+
+        for name, builder in chart_builders():
+            arguments = (aggregates, year) if "year" in inspect.signature(builder).parameters else (aggregates,)
+            stage, _ = _measure(profiler, f"charts.{name}", lambda: builder(*arguments), rows_in=loaded_rows)
+            results.append(stage)
+    return [dict(result, rows=rows, year=year) for result in results]
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Membandingkan hasil dengan baseline per (rows, year, stage).
+    Return: list dict perbandingan; `regression` True jika wall time atau puncak RSS naik melebihi threshold.
+    """
+    previous = {(item["rows"], item["year"], item["stage"]): item for item in baseline["results"]}
+    comparisons = []
+    for item in results["results"]:
+        base = previous.get((item["rows"], item["year"], item["stage"]))
+        if base is None:
+            continue
+        wall_ratio = item["wall_s"] / base["wall_s"] if base["wall_s"] else None
+        wall_regression = item["wall_s"] - base["wall_s"] > max(MIN_WALL_DELTA_S, threshold * base["wall_s"])
+        memory_delta = item["peak_rss_delta_mb"] - base["peak_rss_delta_mb"]
+        memory_regression = memory_delta > max(MIN_RSS_DELTA_MB, threshold * base["peak_rss_delta_mb"])
+        comparisons.append({
+            "rows": item["rows"],
+            "year": item["year"],
+            "stage": item["stage"],
+            "wall_s": item["wall_s"],
+            "baseline_wall_s": base["wall_s"],
+            "wall_ratio": wall_ratio,
+            "peak_rss_delta_mb": item["peak_rss_delta_mb"],
+            "baseline_peak_rss_delta_mb": base["peak_rss_delta_mb"],
+            "regression": bool(wall_regression or memory_regression),
+        })
+    return comparisons
+
+def run_benchmarks(rows_list=DEFAULT_ROWS, year=2015, fillers=DEFAULT_FILLERS, seed=0, workdir=DEFAULT_WORKDIR,
+                   repeat=1, chunksize=250_000, reader="xport"):
+    """
+    Menjalankan semua ukuran input `repeat` kali; per target disimpan run dengan wall time terkecil.
+    """
+    os.makedirs(workdir, exist_ok=True)
+    results = []
+    for rows in rows_list:
+        best = {}
+        for _ in range(repeat):
+            for item in run_size(workdir, rows, year, fillers, seed, chunksize, reader):
+                if item["stage"] not in best or item["wall_s"] < best[item["stage"]]["wall_s"]:
+                    best[item["stage"]] = item
+        results.extend(best.values())
+        for item in best.values():
+            print(f"{rows:>9} baris  {item['stage']:<45} {item['wall_s']:>8.3f} s  "
+                  f"CPU {item['cpu_s']:>8.3f} s  RSS +{item['peak_rss_delta_mb']:>7.1f} MiB")
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "params": {"rows": rows_list, "year": year, "fillers": fillers, "seed": seed, "repeat": repeat,
+                   "chunksize": chunksize, "reader": reader},
+        "results": results,
+    }
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark offline pipeline BRFSS dengan data XPT sintetis")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="Ukuran input (baris)")
+    parser.add_argument("--year", type=int, default=2015)
+    parser.add_argument("--fillers", type=int, default=DEFAULT_FILLERS, help="Jumlah kolom pengisi")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=1, help="Ulangan per ukuran; diambil wall time terkecil")
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    parser.add_argument("--reader", default="xport")
+    parser.add_argument("--workdir", default=DEFAULT_WORKDIR, help="Folder data sintetis (dipakai ulang antar run)")
+    parser.add_argument("--output", help="File JSON hasil (default: <workdir>/results-<waktu>.json)")
+    parser.add_argument("--baseline", help="File JSON hasil sebelumnya untuk dibandingkan")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Kenaikan relatif yang dianggap regresi (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.rows, args.year, args.fillers, args.seed, args.workdir, args.repeat,
+                             args.chunksize, args.reader)
+    output = args.output or os.path.join(args.workdir, f"results-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, default=str)
+    print(f"📁 Hasil benchmark: {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            comparisons = compare(results, json.load(f), args.threshold)
+        for item in comparisons:
+            ratio = f"{item['wall_ratio']:.2f}x" if item["wall_ratio"] is not None else "-"
+            flag = "⚠️ REGRESI" if item["regression"] else ""
+            print(f"{item['rows']:>9} baris  {item['stage']:<45} {ratio:>7}  "
+                  f"RSS {item['baseline_peak_rss_delta_mb']:.1f} -> {item['peak_rss_delta_mb']:.1f} MiB  {flag}")
+        if any(item["regression"] for item in comparisons):
+            raise SystemExit(1)
@@ -0,0 +1,178 @@
+# src/benchmark/synthetic.py
+
+import os
+import time
+import struct
+import zipfile
+import numpy as np
+import yaml
+from src.transform.xport import (LIBRARY_HEADER, MEMBER_HEADER, NAMESTR_FORMAT, NAMESTR_HEADER, OBS_HEADER,
+                                 RECORD_LENGTH, ieee_to_ibm)
+
+DEFAULT_FEATURE_MAP_PATH = "src/transform/feature_map.yaml"
+DEFAULT_FILLERS = 300
+CHUNK_ROWS = 50_000
+NAMESTR_LENGTH = 140
+MISSING = -1  # kode internal untuk nilai hilang SAS ('.')
+
+# Tahun pertama tiap nama variabel baru; alias tanpa entri dianggap sudah ada sejak awal
+VARIABLE_INTRODUCED = {
+    "DIABETE4": 2019,
+    "_RFHYPE6": 2021,
+    "TOLDHI3": 2021,
+    "_FRTLT1A": 2017,
+    "_VEGLT1A": 2017,
+    "SEXVAR": 2018,
+}
+
+# Distribusi kode per fitur, kira-kira seperti BRFSS: (kode, peluang); 7/9 = tidak tahu/menolak
+CODE_DISTRIBUTIONS = {
+    "Diabetes_01": ([1, 2, 3, 4, 7, 9, MISSING], [0.13, 0.01, 0.81, 0.035, 0.01, 0.003, 0.002]),
+    "HighBP": ([1, 2, 9], [0.58, 0.41, 0.01]),
+    "HighChol": ([1, 2, 7, 9, MISSING], [0.36, 0.47, 0.008, 0.002, 0.16]),
+    "Smoker": ([1, 2, 7, 9, MISSING], [0.42, 0.535, 0.006, 0.002, 0.037]),
+    "PhysActivity": ([1, 2, 9], [0.74, 0.25, 0.01]),
+    "Fruits": ([1, 2, 9], [0.60, 0.36, 0.04]),
+    "Veggies": ([1, 2, 9], [0.78, 0.17, 0.05]),
+    "DiffWalk": ([1, 2, 7, 9, MISSING], [0.15, 0.80, 0.003, 0.002, 0.045]),
+    "Sex": ([1, 2, 9], [0.45, 0.549, 0.001]),
+    "Age": (list(range(1, 15)), [0.06, 0.05, 0.06, 0.06, 0.06, 0.07, 0.08, 0.09, 0.10, 0.10, 0.09, 0.07, 0.10, 0.01]),
+}
+BMI_MISSING = 0.08
+
+# Pola kolom pengisi: (kode, peluang) seperti pertanyaan ya/tidak, skala 1-5 dan hitungan hari (88 = tidak ada)
+FILLER_PATTERNS = [
+    ([1, 2, 7, 9, MISSING], [0.30, 0.62, 0.02, 0.01, 0.05]),
+    ([1, 2, 3, 4, 5, 7, 9, MISSING], [0.20, 0.30, 0.25, 0.10, 0.05, 0.02, 0.01, 0.07]),
+    (list(range(1, 31)) + [77, 88, 99, MISSING], [0.01] * 30 + [0.02, 0.55, 0.01, 0.12]),
+]
+
+def _card(text):
+    return text.encode("ascii").ljust(RECORD_LENGTH)
+
+def _choose_variables(feature_map, year):
+    """
+    Nama variabel mentah yang dipakai BRFSS pada `year` untuk tiap fitur standar.
+    """
+    variables = {}
+    for feature, aliases in feature_map.items():
+        available = [alias for alias in aliases if VARIABLE_INTRODUCED.get(alias, 0) <= year]
+        variables[feature] = max(available or aliases, key=lambda alias: VARIABLE_INTRODUCED.get(alias, 0))
+    return variables
+
+def _namestr(name, position, number):
+    raw = struct.pack(NAMESTR_FORMAT, 1, 0, 8, number, name.encode("ascii").ljust(8), b" " * 40, b" " * 8,
+                      0, 0, 0, b"  ", b" " * 8, 0, 0, position, b"\x00" * 52)
+    return raw[:NAMESTR_LENGTH]
+
+def xport_header(names, dataset_name="LLCP"):
+    """
+    Header SAS XPORT v5 (library, member, NAMESTR, OBS) untuk kolom numerik 8 byte.
+    """
+    stamp = time.strftime("%d%b%y:%H:%M:%S").upper()
+    records = [
+        _card(LIBRARY_HEADER.decode() + "0" * 30),
+        _card("SAS     SAS     SASLIB  9.4     X64_10PR" + " " * 24 + stamp),
+        _card(stamp),
+        _card(MEMBER_HEADER.decode() + "000000000000000001600000000" + str(NAMESTR_LENGTH)),
+        _card("HEADER RECORD*******DSCRPTR HEADER RECORD!!!!!!!" + "0" * 30),
+        _card("SAS     " + dataset_name.ljust(8) + "SASDATA 9.4     X64_10PR" + " " * 24 + stamp),
+        _card(stamp + " " * 16 + " " * 40 + " " * 8),
+        _card(NAMESTR_HEADER.decode() + "000000" + f"{len(names):04d}" + "0" * 20),
+    ]
+    block = b"".join(_namestr(name, 8 * i, i + 1) for i, name in enumerate(names))
+    block += b" " * (-len(block) % RECORD_LENGTH)
+    return b"".join(records) + block + _card(OBS_HEADER.decode() + "0" * 30)
+
+def _categorical(rng, codes, probabilities, n):
+    values = rng.choice(np.asarray(codes, dtype=np.float64), size=n, p=np.asarray(probabilities) / sum(probabilities))
+    return np.where(values == MISSING, np.nan, values)
+
+def _feature_columns(rng, n):
+    columns = {feature: _categorical(rng, *distribution, n) for feature, distribution in CODE_DISTRIBUTIONS.items()}
+    # _BMI5: BMI x 100, lognormal sekitar 28 dengan ekor kanan, dibulatkan ke bilangan bulat
+    bmi = np.clip(np.round(rng.lognormal(np.log(2750), 0.21, n)), 1200, 9999)
+    columns["BMI"] = np.where(rng.random(n) < BMI_MISSING, np.nan, bmi)
+    return columns
+
+def _filler_lut(codes, probabilities):
+    """
+    Tabel 256 word IBM: byte acak seragam langsung dipetakan ke kode dengan peluang ~p (resolusi 1/256),
+    jauh lebih murah daripada rng.choice per kolom.
+    """
+    values = np.where(np.asarray(codes) == MISSING, np.nan, np.asarray(codes, dtype=np.float64))
+    edges = np.cumsum(probabilities) / sum(probabilities) * 256
+    positions = np.minimum(np.searchsorted(edges, np.arange(256) + 0.5), len(values) - 1)
+    return ieee_to_ibm(values)[positions]
+
+def generate_xpt(path, rows, year=2015, fillers=DEFAULT_FILLERS, seed=0, feature_map_path=DEFAULT_FEATURE_MAP_PATH):
+    """
+    Menulis file LLCP{year}.XPT sintetis: variabel mentah dari feature_map.yaml (nama sesuai tahun),
+    distribusi kode mirip BRFSS termasuk sentinel 7/9 dan nilai hilang, plus `fillers` kolom pengisi.
+    Ditulis per chunk CHUNK_ROWS baris, sehingga file jutaan baris tidak perlu muat di memori.
+
+    Returns:
+        str: path file yang ditulis
+    """
+    with open(feature_map_path, "r") as f:
+        feature_map = yaml.safe_load(f)["standard_features"]
+    variables = _choose_variables(feature_map, year)
+    filler_names = [f"FILL{i:04d}" for i in range(fillers)]
+    names = list(variables.values())
+    # Variabel fitur diselipkan di antara kolom pengisi, seperti posisinya yang tersebar di file asli
+    layout = filler_names[:]
+    for i, name in enumerate(names):
+        layout.insert(min(len(layout), (i + 1) * (fillers // (len(names) + 1) + 1)), name)
+    index = {name: i for i, name in enumerate(layout)}
+    luts = [_filler_lut(*pattern) for pattern in FILLER_PATTERNS]
+    filler_groups = [np.array([index[name] for name in filler_names[k::len(luts)]], dtype=np.intp)
+                     for k in range(len(luts))]
+
+    rng = np.random.default_rng(seed)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(xport_header(layout))
+        written = 0
+        for start in range(0, rows, CHUNK_ROWS):
+            n = min(CHUNK_ROWS, rows - start)
+            block = np.empty((n, len(layout)), dtype=">u8")
+            for feature, values in _feature_columns(rng, n).items():
+                block[:, index[variables[feature]]] = ieee_to_ibm(values)
+            for lut, positions in zip(luts, filler_groups):
+                if len(positions):
+                    block[:, positions] = lut[rng.integers(0, 256, size=(n, len(positions)), dtype=np.uint8)]
+            written += f.write(memoryview(block).cast("B"))
+        f.write(b" " * (-written % RECORD_LENGTH))
+    os.replace(tmp_path, path)
+    return path
+
+def zip_xpt(xpt_path, zip_path):
+    """
+    Membungkus XPT ke ZIP seperti rilis CDC (nama member diakhiri spasi).
+    """
+    tmp_path = f"{zip_path}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        zf.write(xpt_path, os.path.basename(xpt_path) + " ")
+    os.replace(tmp_path, zip_path)
+    return zip_path
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tulis file BRFSS LLCP{year}.XPT sintetis")
+    parser.add_argument("output_dir")
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--year", type=int, default=2015)
+    parser.add_argument("--fillers", type=int, default=DEFAULT_FILLERS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--zip", action="store_true", help="Tulis juga LLCP{year}XPT.zip")
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.perf_counter()
+    path = generate_xpt(os.path.join(args.output_dir, f"LLCP{args.year}.XPT"), args.rows, args.year,
+                        args.fillers, args.seed)
+    if args.zip:
+        zip_xpt(path, os.path.join(args.output_dir, f"LLCP{args.year}XPT.zip"))
+    print(f"{path}: {args.rows} baris x {args.fillers + len(CODE_DISTRIBUTIONS) + 1} kolom, "
+          f"{os.path.getsize(path) / (1024 * 1024):.0f} MiB dalam {time.perf_counter() - started:.1f} s")
@@ -0,0 +1,68 @@
+# src/extract/cache.py
+
+import os
+import json
+import threading
+
+MANIFEST_FILENAME = "manifest.json"
+
+_manifest_lock = threading.Lock()
+
+def manifest_path(raw_dir):
+    return os.path.join(raw_dir, MANIFEST_FILENAME)
+
+def load_manifest(raw_dir):
+    """
+    Membaca manifest cache data mentah: {tahun: {url, etag, last_modified, size, sha256, path}}.
+    """
+    path = manifest_path(raw_dir)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_manifest(raw_dir, manifest):
+    """
+    Menulis manifest secara atomik (file sementara lalu rename).
+    """
+    path = manifest_path(raw_dir)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def update_manifest(raw_dir, year, entry):
+    with _manifest_lock:
+        manifest = load_manifest(raw_dir)
+        manifest[str(year)] = entry
+        save_manifest(raw_dir, manifest)
+
+def cached_entry(raw_dir, year):
+    """
+    Return: entri manifest untuk `year`, atau None jika belum ada atau file .XPT-nya (dan
+    salinan Parquet staging-nya) sudah hilang.
+    """
+    entry = load_manifest(raw_dir).get(str(year))
+    if entry and (os.path.exists(os.path.join(raw_dir, entry["path"]))
+                  or (entry.get("staged") and os.path.exists(entry["staged"]))):
+        return entry
+    return None
+
+def record_staged(raw_dir, year, staged_path):
+    with _manifest_lock:
+        manifest = load_manifest(raw_dir)
+        if str(year) in manifest:
+            manifest[str(year)]["staged"] = staged_path
+            save_manifest(raw_dir, manifest)
+
+def conditional_headers(entry):
+    """
+    Header If-None-Match / If-Modified-Since dari entri manifest.
+    """
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
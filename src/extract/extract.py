@@ -2,45 +2,433 @@
 # src/extract/extract.py
 
 import os
+import json
+import hashlib
+import time
+import threading
 import yaml
 import requests
+from collections import deque
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import islice
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from zipfile import ZipFile
 from prefect import task, get_run_logger
+from src.flow.instrumentation import DEFAULT_METRICS_PATH, StageProfiler, publish_metrics, write_metrics
+from src.flow.metrics_store import DEFAULT_METRICS_DB, record_metrics
+from src.extract.cache import cached_entry, conditional_headers, update_manifest
+from src.extract.zip_stream import find_member, iter_member_data, member_data_range, read_zip_members
 
 @task
 def load_config(path="config.yaml"):
     with open(path, "r") as f:
         return yaml.safe_load(f)
 
-def download_file(url, save_path):
-    response = requests.get(url, stream=True)
-    if response.status_code == 404:
-        return False
-    
-    total = int(response.headers.get('content-length', 0))
-    with open(save_path, 'wb') as file, tqdm(
+DEFAULT_WORKERS = 4
+DEFAULT_SEGMENT_SIZE = 8 * 1024 * 1024
+CHUNK_SIZE = 256 * 1024
+MAX_RETRIES = 3
+REQUEST_TIMEOUT = 60
+DEFAULT_DISCOVERY_WORKERS = 8
+
+def create_session(pool_size=DEFAULT_WORKERS):
+    """
+    Membuat requests.Session dengan pool koneksi keep-alive sebesar `pool_size`.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def probe_remote(session, url, headers=None):
+    """
+    Mengecek file remote dengan request `Range: bytes=0-0`.
+    Return: (info, response). `response` hanya dikembalikan (masih terbuka) jika server
+    mengabaikan Range dan mengirim seluruh isi file (status 200), agar bisa langsung di-stream.
+    """
+    request_headers = {"Range": "bytes=0-0", **(headers or {})}
+    response = session.get(url, headers=request_headers, stream=True, timeout=REQUEST_TIMEOUT)
+    info = {
+        "status": response.status_code,
+        "size": None,
+        "ranges": False,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+    }
+
+    if response.status_code == 206:
+        total = response.headers.get("Content-Range", "").rpartition("/")[2]
+        if total.isdigit():
+            info["size"] = int(total)
+            info["ranges"] = True
+        response.close()
+        return info, None
+
+    if response.status_code == 200:
+        length = response.headers.get("Content-Length")
+        info["size"] = int(length) if length and length.isdigit() else None
+        return info, response
+
+    response.close()
+    return info, None
+
+def _load_part_state(state_path, info, segment_size):
+    if not os.path.exists(state_path):
+        return set()
+    try:
+        with open(state_path, "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    same_remote = (
+        state.get("size") == info["size"]
+        and state.get("segment_size") == segment_size
+        and state.get("etag") == info["etag"]
+        and state.get("last_modified") == info["last_modified"]
+    )
+    return set(state.get("done", [])) if same_remote else set()
+
+def _save_part_state(state_path, url, info, segment_size, done):
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "url": url,
+            "size": info["size"],
+            "segment_size": segment_size,
+            "etag": info["etag"],
+            "last_modified": info["last_modified"],
+            "done": sorted(done),
+        }, f)
+    os.replace(tmp_path, state_path)
+
+def _fetch_segment(session, url, part_path, start, end, validator, bar):
+    headers = {"Range": f"bytes={start}-{end}"}
+    if validator:
+        headers["If-Range"] = validator
+
+    for attempt in range(1, MAX_RETRIES + 1):
+        written = 0
+        try:
+            with session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                if response.status_code != 206:
+                    raise IOError(f"Range {start}-{end} ditolak server (status {response.status_code})")
+                with open(part_path, "r+b") as file:
+                    file.seek(start)
+                    for data in response.iter_content(chunk_size=CHUNK_SIZE):
+                        written += file.write(data)
+                        bar.update(len(data))
+            if written != end - start + 1:
+                raise IOError(f"Segmen {start}-{end} tidak lengkap: {written} byte")
+            return written
+        except (requests.RequestException, IOError):
+            bar.update(-written)
+            if attempt == MAX_RETRIES:
+                raise
+
+def _download_ranged(session, url, save_path, info, workers, segment_size):
+    part_path = f"{save_path}.part"
+    state_path = f"{part_path}.json"
+    size = info["size"]
+
+    done = _load_part_state(state_path, info, segment_size) if os.path.exists(part_path) else set()
+    if not done:
+        with open(part_path, "wb") as file:
+            file.truncate(size)
+
+    segments = [(i, start, min(start + segment_size, size) - 1)
+                for i, start in enumerate(range(0, size, segment_size))]
+    pending = [seg for seg in segments if seg[0] not in done]
+    resumed_bytes = sum(end - start + 1 for i, start, end in segments if i in done)
+    validator = info["etag"] or info["last_modified"]
+    lock = threading.Lock()
+
+    with tqdm(
         desc=f"Downloading {os.path.basename(save_path)}",
-        total=total,
+        total=size,
+        initial=resumed_bytes,
+        unit='iB',
+        unit_scale=True,
+        unit_divisor=1024,
+    ) as bar, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_fetch_segment, session, url, part_path, start, end, validator, bar): index
+            for index, start, end in pending
+        }
+        for future in as_completed(futures):
+            future.result()
+            with lock:
+                done.add(futures[future])
+                _save_part_state(state_path, url, info, segment_size, done)
+
+    os.replace(part_path, save_path)
+    os.remove(state_path)
+    return size - resumed_bytes, resumed_bytes > 0, len(segments)
+
+def _download_single(response, save_path):
+    part_path = f"{save_path}.part"
+    transferred = 0
+    with response, open(part_path, 'wb') as file, tqdm(
+        desc=f"Downloading {os.path.basename(save_path)}",
+        total=int(response.headers.get('content-length', 0)),
         unit='iB',
         unit_scale=True,
         unit_divisor=1024,
     ) as bar:
-        for data in response.iter_content(chunk_size=1024):
+        for data in response.iter_content(chunk_size=CHUNK_SIZE):
             size = file.write(data)
+            transferred += size
             bar.update(size)
-    return True
+    os.replace(part_path, save_path)
+    return transferred
+
+def download_file(url, save_path, workers=DEFAULT_WORKERS, segment_size=DEFAULT_SEGMENT_SIZE, session=None):
+    """
+    Mengunduh file dengan beberapa segmen HTTP Range secara paralel lewat koneksi keep-alive.
+    Progres disimpan di `<save_path>.part` + `<save_path>.part.json` sehingga unduhan yang
+    terputus dilanjutkan dari segmen terakhir yang selesai. Jika server mengabaikan Range,
+    file diunduh sebagai satu stream.
+    Return: dict statistik unduhan, atau None jika file tidak ditemukan (404).
+    """
+    session = session or create_session(workers)
+    started = time.perf_counter()
+
+    info, response = probe_remote(session, url)
+    if info["status"] == 404:
+        return None
+    if info["status"] not in (200, 206):
+        raise requests.HTTPError(f"Status {info['status']} untuk {url}")
+
+    if info["ranges"] and info["size"]:
+        transferred, resumed, segments = _download_ranged(session, url, save_path, info, workers, segment_size)
+    else:
+        if response is None:
+            response = session.get(url, stream=True, timeout=REQUEST_TIMEOUT)
+            response.raise_for_status()
+        transferred, resumed, segments = _download_single(response, save_path), False, 1
+
+    elapsed = time.perf_counter() - started
+    return {
+        "bytes": os.path.getsize(save_path),
+        "transferred": transferred,
+        "seconds": elapsed,
+        "throughput_mb_s": transferred / elapsed / (1024 * 1024) if elapsed > 0 else 0.0,
+        "ranged": info["ranges"],
+        "resumed": resumed,
+        "segments": segments,
+    }
+
+def is_available(session, url):
+    """
+    Mengecek keberadaan URL dengan HEAD (fallback ke probe Range jika HEAD tidak diizinkan).
+    """
+    response = session.head(url, allow_redirects=True, timeout=REQUEST_TIMEOUT)
+    if response.status_code in (405, 501):
+        info, response = probe_remote(session, url)
+        if response is not None:
+            response.close()
+        return info["status"] in (200, 206)
+    return response.status_code == 200
+
+@task
+def discover_years(url_template: str, start_year: int, window: int = None,
+                   workers: int = DEFAULT_DISCOVERY_WORKERS) -> list:
+    """
+    Mengecek sekumpulan tahun kandidat [start_year, start_year + window) secara paralel
+    lewat HEAD request dalam pool terbatas. Default window sampai tahun berjalan.
+    Return: list tahun yang tersedia, terurut.
+    """
+    logger = get_run_logger()
+    if window is None:
+        window = date.today().year - start_year + 1
+    candidates = list(range(start_year, start_year + max(window, 0)))
+    session = create_session(workers)
+
+    def check(year):
+        url = url_template.format(year=year)
+        try:
+            return is_available(session, url)
+        except requests.RequestException as e:
+            logger.warning(f"⚠️ Gagal mengecek {url}: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(check, candidates))
+
+    years = [year for year, available in zip(candidates, results) if available]
+    logger.info(f"🔎 Tahun tersedia ({len(years)}/{len(candidates)} kandidat): {years}")
+    return years
+
+def read_range(session, url, start, end, headers=None):
+    """
+    Membaca byte [start, end] (inklusif) dari URL dengan HTTP Range, dengan retry.
+    """
+    request_headers = {"Range": f"bytes={start}-{end}", **(headers or {})}
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            response = session.get(url, headers=request_headers, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 206:
+                raise IOError(f"Range {start}-{end} ditolak server (status {response.status_code})")
+            if len(response.content) != end - start + 1:
+                raise IOError(f"Range {start}-{end} tidak lengkap: {len(response.content)} byte")
+            return response.content
+        except (requests.RequestException, IOError):
+            if attempt == MAX_RETRIES:
+                raise
+
+def iter_range_chunks(session, url, start, end, workers=DEFAULT_WORKERS,
+                      segment_size=DEFAULT_SEGMENT_SIZE, headers=None):
+    """
+    Menghasilkan byte [start, end] secara berurutan, sementara hingga `workers` segmen
+    berikutnya sudah diambil paralel di belakang layar (memori <= (workers + 1) segmen).
+    """
+    segments = iter([(offset, min(offset + segment_size, end + 1) - 1)
+                     for offset in range(start, end + 1, segment_size)])
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque(
+            executor.submit(read_range, session, url, seg_start, seg_end, headers)
+            for seg_start, seg_end in islice(segments, workers)
+        )
+        while pending:
+            data = pending.popleft().result()
+            following = next(segments, None)
+            if following:
+                pending.append(executor.submit(read_range, session, url, *following, headers))
+            yield data
+
+def _track(chunks, bar):
+    for data in chunks:
+        bar.update(len(data))
+        yield data
+
+def _write_chunks(chunks, save_path):
+    """
+    Menulis chunk ke `save_path` sambil menghitung SHA-256 di lintasan yang sama.
+    Return: (jumlah byte, hex digest).
+    """
+    part_path = f"{save_path}.part"
+    written, digest = 0, hashlib.sha256()
+    with open(part_path, "wb") as file:
+        for data in chunks:
+            digest.update(data)
+            written += file.write(data)
+    os.replace(part_path, save_path)
+    return written, digest.hexdigest()
+
+def stream_remote_xpt(session, url, info, output_dir, workers=DEFAULT_WORKERS,
+                      segment_size=DEFAULT_SEGMENT_SIZE):
+    """
+    Mengambil member .XPT dari ZIP remote tanpa menyimpan ZIP ke disk: central directory
+    dibaca lewat HTTP Range, lalu hanya data member .XPT yang diunduh dan didekompresi
+    langsung ke file akhirnya dalam satu lintasan. Tidak ada file .part: jika terputus, stream
+    diulang dari awal (gunakan download_file untuk unduhan yang dapat dilanjutkan).
+    `info` adalah hasil `probe_remote` dengan `info["ranges"]` bernilai True.
+    Return: dict statistik (termasuk "path"), atau None jika ZIP tidak berisi .XPT.
+    """
+    started = time.perf_counter()
+    validator = info["etag"] or info["last_modified"]
+    headers = {"If-Range": validator} if validator else None
+
+    def read(start, end):
+        return read_range(session, url, start, end, headers)
+
+    member = find_member(read_zip_members(read, info["size"]), ".xpt")
+    if member is None:
+        return None
+
+    data_start, data_end = member_data_range(read, member)
+    save_path = os.path.join(output_dir, os.path.basename(member["name"].strip()))
+    chunks = iter_range_chunks(session, url, data_start, data_end, workers, segment_size, headers)
+    with tqdm(
+        desc=f"Streaming {os.path.basename(save_path)}",
+        total=member["size"],
+        unit='iB',
+        unit_scale=True,
+        unit_divisor=1024,
+    ) as bar:
+        written, sha256 = _write_chunks(_track(iter_member_data(chunks, member), bar), save_path)
+
+    elapsed = time.perf_counter() - started
+    return {
+        "path": save_path,
+        "sha256": sha256,
+        "bytes": written,
+        "transferred": member["compressed_size"],
+        "seconds": elapsed,
+        "throughput_mb_s": member["compressed_size"] / elapsed / (1024 * 1024) if elapsed > 0 else 0.0,
+        "ranged": True,
+        "resumed": False,
+        "segments": -(-member["compressed_size"] // segment_size),
+    }
 
 def extract_zip(zip_path, extract_to):
+    """
+    Mengekstrak member .XPT dari ZIP lokal langsung ke nama akhirnya (tanpa spasi di ujung),
+    sekaligus menghitung SHA-256-nya.
+    Return: (path ke file .XPT, sha256), atau (None, None) jika ZIP tidak berisi .XPT.
+    """
     with ZipFile(zip_path, 'r') as zip_ref:
-        zip_ref.extractall(extract_to)
+        member = next((m for m in zip_ref.infolist() if m.filename.strip().lower().endswith(".xpt")), None)
+        if member is None:
+            return None, None
+        save_path = os.path.join(extract_to, os.path.basename(member.filename.strip()))
+        with zip_ref.open(member) as source:
+            _, sha256 = _write_chunks(iter(lambda: source.read(CHUNK_SIZE), b""), save_path)
+    return save_path, sha256
+
+def _record_cache(output_dir, year, url, info, path, sha256):
+    update_manifest(output_dir, year, {
+        "url": url,
+        "etag": info["etag"],
+        "last_modified": info["last_modified"],
+        "size": info["size"],
+        "sha256": sha256,
+        "path": os.path.basename(path),
+    })
+
+def _log_transfer(logger, name, stats):
+    logger.info(
+        f"⚡ {name}: {stats['transferred'] / (1024 * 1024):.1f} MiB dalam {stats['seconds']:.1f} s "
+        f"({stats['throughput_mb_s']:.2f} MiB/s, {stats['segments']} segmen"
+        f"{', dilanjutkan' if stats['resumed'] else ''})"
+    )
 
 @task
-def extract_dataset(url: str, output_dir: str) -> str:
+def extract_dataset(url: str, output_dir: str, workers: int = DEFAULT_WORKERS,
+                    segment_size: int = DEFAULT_SEGMENT_SIZE, mode: str = "download",
+                    metrics_path: str = DEFAULT_METRICS_PATH, metrics_db: str = DEFAULT_METRICS_DB) -> str:
     """
     Mengunduh dan mengekstrak satu file ZIP dari URL.
+    Mode "download" (default) mengunduh ZIP ke disk lalu mengekstraknya; unduhan yang terputus
+    dilanjutkan dari segmen terakhir lewat file .part/.part.json.
+    Mode "stream" mendekompresi member .XPT langsung dari ZIP remote (butuh dukungan Range) tanpa
+    menyimpan ZIP, tetapi tidak dapat dilanjutkan: state dekompresi deflate hanya ada di memori,
+    sehingga unduhan yang terputus diulang dari byte pertama member.
+    Jika tahun ini sudah ada di manifest cache, request dikirim dengan If-None-Match /
+    If-Modified-Since dan transfer dilewati saat server menjawab 304.
+    Waktu, CPU dan memori tiap tahap (probe, stream/download, unzip) dicatat ke metrics_path
+    dan ke store SQLite metrics_db.
     Return: path ke file .XPT hasil ekstraksi.
     """
+    year = ''.join(filter(str.isdigit, os.path.basename(url)))
+    profiler = StageProfiler("extract", year)
+    try:
+        path = _extract_stages(profiler, url, output_dir, workers, segment_size, mode)
+        if path is None and profiler.status == "ok":
+            profiler.status = "unavailable"
+        return path
+    except Exception:
+        profiler.status = "error"
+        raise
+    finally:
+        record = profiler.to_record()
+        write_metrics(record, metrics_path)
+        record_metrics(record, metrics_db)
+        publish_metrics([record], key=f"extract-stages-{year}")
+
+def _extract_stages(profiler, url, output_dir, workers, segment_size, mode):
     logger = get_run_logger()
 
     os.makedirs(output_dir, exist_ok=True)
@@ -49,36 +437,81 @@ def extract_dataset(url: str, output_dir: str) -> str:
 
     zip_filename = f"LLCP{year}XPT.zip"
     zip_path = os.path.join(output_dir, zip_filename)
+    session = create_session(workers)
+    entry = cached_entry(output_dir, year)
+
+    try:
+        with profiler.stage("probe"):
+            info, response = probe_remote(session, url, conditional_headers(entry))
+    except requests.RequestException as e:
+        logger.error(f"⚠️ Gagal menghubungi {url}: {e}")
+        profiler.status = "error"
+        return None
+    if response is not None:
+        response.close()
+
+    if info["status"] == 404:
+        logger.warning(f"❌ File tidak ditemukan: {url}")
+        return None
+    if info["status"] == 304:
+        profiler.status = "not_modified"
+        logger.info(f"♻️ Tidak berubah sejak unduhan terakhir: {entry['path']}")
+        return os.path.join(output_dir, entry["path"])
+
+    if mode == "stream" and info["ranges"]:
+        logger.info(f"🌊 Streaming: {url}")
+        try:
+            with profiler.stage("stream") as stage:
+                stats = stream_remote_xpt(session, url, info, output_dir, workers, segment_size)
+                if stats is not None:
+                    stage.update(bytes_in=stats["transferred"], bytes_out=stats["bytes"])
+            if stats is None:
+                logger.warning(f"⚠️ Tidak ada file .xpt ditemukan untuk {year}")
+                return None
+            _log_transfer(logger, os.path.basename(stats["path"]), stats)
+            _record_cache(output_dir, year, url, info, stats["path"], stats["sha256"])
+            return stats["path"]
+        except (requests.RequestException, IOError, ValueError) as e:
+            logger.warning(f"⚠️ Streaming gagal untuk {url}, kembali ke mode download: {e}")
+    elif mode == "stream":
+        logger.info("↩️ Server tidak mendukung Range, kembali ke mode download")
 
     logger.info(f"⬇️  Downloading: {url}")
-    success = download_file(url, zip_path)
+    try:
+        with profiler.stage("download") as stage:
+            stats = download_file(url, zip_path, workers=workers, segment_size=segment_size, session=session)
+            if stats:
+                stage.update(bytes_in=stats["transferred"], bytes_out=stats["transferred"])
+    except requests.RequestException as e:
+        logger.error(f"⚠️ Gagal mengunduh {url}: {e}")
+        profiler.status = "error"
+        return None
 
-    if not success:
+    if not stats:
         logger.warning(f"❌ File tidak ditemukan: {url}")
         return None
 
+    _log_transfer(logger, zip_filename, stats)
+
     try:
         logger.info(f"📦 Extracting: {zip_filename}")
-        extract_zip(zip_path, output_dir)
-
-        for filename in os.listdir(output_dir):
-            new_name = filename.strip()
-            if filename != new_name:
-                os.rename(os.path.join(output_dir, filename), os.path.join(output_dir, new_name))
-                logger.info(f"✏️ Rename: '{filename}' -> '{new_name}'")
+        with profiler.stage("unzip") as stage:
+            stage["bytes_in"] = os.path.getsize(zip_path)
+            xpt_path, sha256 = extract_zip(zip_path, output_dir)
+            stage["bytes_out"] = os.path.getsize(xpt_path) if xpt_path else 0
 
         if os.path.exists(zip_path):
             os.remove(zip_path)
             logger.info(f"🧹 Deleted ZIP: {zip_filename}")
 
-        # Return XPT path
-        xpt_files = [f for f in os.listdir(output_dir) if f.lower().endswith(".xpt") and year in f]
-        if xpt_files:
-            return os.path.join(output_dir, xpt_files[0])
-        else:
+        if xpt_path is None:
             logger.warning(f"⚠️ Tidak ada file .xpt ditemukan untuk {year}")
             return None
 
+        _record_cache(output_dir, year, url, info, xpt_path, sha256)
+        return xpt_path
+
     except Exception as e:
         logger.error(f"⚠️ Gagal mengekstrak {zip_filename}: {e}")
+        profiler.status = "error"
         return None
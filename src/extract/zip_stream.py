@@ -0,0 +1,140 @@
+# src/extract/zip_stream.py
+
+import struct
+import zlib
+
+EOCD_SIGNATURE = b"PK\x05\x06"
+ZIP64_LOCATOR_SIGNATURE = b"PK\x06\x07"
+ZIP64_EOCD_SIGNATURE = b"PK\x06\x06"
+CENTRAL_SIGNATURE = b"PK\x01\x02"
+LOCAL_SIGNATURE = b"PK\x03\x04"
+
+EOCD_SIZE = 22
+ZIP64_LOCATOR_SIZE = 20
+ZIP64_EOCD_SIZE = 56
+CENTRAL_HEADER_SIZE = 46
+LOCAL_HEADER_SIZE = 30
+MAX_COMMENT_SIZE = 0xFFFF
+
+METHOD_STORED = 0
+METHOD_DEFLATED = 8
+
+def _parse_zip64_extra(extra, size, compressed_size, offset):
+    """
+    Mengganti field 32-bit yang bernilai 0xFFFFFFFF dengan nilai dari extra field ZIP64 (id 0x0001).
+    """
+    pos = 0
+    while pos + 4 <= len(extra):
+        header_id, data_size = struct.unpack_from("<HH", extra, pos)
+        if header_id == 0x0001:
+            values = iter(struct.unpack_from(f"<{data_size // 8}Q", extra, pos + 4))
+            if size == 0xFFFFFFFF:
+                size = next(values)
+            if compressed_size == 0xFFFFFFFF:
+                compressed_size = next(values)
+            if offset == 0xFFFFFFFF:
+                offset = next(values)
+            break
+        pos += 4 + data_size
+    return size, compressed_size, offset
+
+def read_zip_members(read_range, size):
+    """
+    Membaca central directory sebuah ZIP hanya lewat pembacaan rentang byte.
+    `read_range(start, end)` mengembalikan byte [start, end] (inklusif), misalnya dari HTTP Range.
+    Return: list dict member (name, method, crc, size, compressed_size, offset).
+    """
+    tail_start = max(0, size - (EOCD_SIZE + MAX_COMMENT_SIZE + ZIP64_LOCATOR_SIZE))
+    tail = read_range(tail_start, size - 1)
+
+    eocd_pos = tail.rfind(EOCD_SIGNATURE)
+    if eocd_pos < 0:
+        raise ValueError("End of central directory ZIP tidak ditemukan")
+    _, _, _, _, entries, cd_size, cd_offset, _ = struct.unpack_from("<4s4HLLH", tail, eocd_pos)
+
+    if 0xFFFFFFFF in (cd_size, cd_offset) or entries == 0xFFFF:
+        locator_pos = eocd_pos - ZIP64_LOCATOR_SIZE
+        if locator_pos < 0 or tail[locator_pos:locator_pos + 4] != ZIP64_LOCATOR_SIGNATURE:
+            raise ValueError("ZIP64 locator tidak ditemukan")
+        _, _, zip64_offset, _ = struct.unpack_from("<4sLQL", tail, locator_pos)
+        record = read_range(zip64_offset, zip64_offset + ZIP64_EOCD_SIZE - 1)
+        if record[:4] != ZIP64_EOCD_SIGNATURE:
+            raise ValueError("ZIP64 end of central directory tidak valid")
+        _, _, _, _, _, _, _, entries, cd_size, cd_offset = struct.unpack_from("<4sQ2H2L4Q", record)
+
+    if cd_offset >= tail_start:
+        directory = tail[cd_offset - tail_start:cd_offset - tail_start + cd_size]
+    else:
+        directory = read_range(cd_offset, cd_offset + cd_size - 1)
+
+    members, pos = [], 0
+    for _ in range(entries):
+        if directory[pos:pos + 4] != CENTRAL_SIGNATURE:
+            raise ValueError("Entri central directory ZIP tidak valid")
+        (_, _, _, flags, method, _, _, crc, compressed_size, size_, name_len, extra_len,
+         comment_len, _, _, _, offset) = struct.unpack_from("<4s6H3L5H2L", directory, pos)
+        name_start = pos + CENTRAL_HEADER_SIZE
+        raw_name = directory[name_start:name_start + name_len]
+        extra = directory[name_start + name_len:name_start + name_len + extra_len]
+        size_, compressed_size, offset = _parse_zip64_extra(extra, size_, compressed_size, offset)
+        members.append({
+            "name": raw_name.decode("utf-8" if flags & 0x800 else "cp437"),
+            "method": method,
+            "crc": crc,
+            "size": size_,
+            "compressed_size": compressed_size,
+            "offset": offset,
+        })
+        pos = name_start + name_len + extra_len + comment_len
+    return members
+
+def find_member(members, suffix):
+    """
+    Mencari member pertama yang namanya (tanpa spasi di ujung) berakhiran `suffix`.
+    """
+    for member in members:
+        if member["name"].strip().lower().endswith(suffix.lower()):
+            return member
+    return None
+
+def member_data_range(read_range, member):
+    """
+    Membaca local file header member.
+    Return: (start, end) rentang byte data terkompresi (inklusif).
+    """
+    header = read_range(member["offset"], member["offset"] + LOCAL_HEADER_SIZE - 1)
+    if header[:4] != LOCAL_SIGNATURE:
+        raise ValueError(f"Local header tidak valid untuk {member['name']!r}")
+    name_len, extra_len = struct.unpack_from("<2H", header, 26)
+    start = member["offset"] + LOCAL_HEADER_SIZE + name_len + extra_len
+    return start, start + member["compressed_size"] - 1
+
+def iter_member_data(chunks, member):
+    """
+    Mendekompresi aliran byte terkompresi milik `member` dalam satu lintasan.
+    CRC32 dan ukuran hasil diverifikasi setelah chunk terakhir.
+    """
+    if member["method"] == METHOD_DEFLATED:
+        decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        decode = decompressor.decompress
+    elif member["method"] == METHOD_STORED:
+        decompressor, decode = None, bytes
+    else:
+        raise ValueError(f"Metode kompresi ZIP {member['method']} tidak didukung")
+
+    crc, size = 0, 0
+    for chunk in chunks:
+        data = decode(chunk)
+        if data:
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+            yield data
+    if decompressor is not None:
+        data = decompressor.flush()
+        if data:
+            crc = zlib.crc32(data, crc)
+            size += len(data)
+            yield data
+
+    if size != member["size"] or crc != member["crc"]:
+        raise ValueError(f"Member {member['name']!r} rusak: ukuran/CRC tidak cocok")
@@ -0,0 +1,196 @@
+# src/flow/instrumentation.py
+
+import os
+import json
+import time
+import resource
+import threading
+from contextlib import contextmanager
+from prefect.context import TaskRunContext, FlowRunContext
+
+DEFAULT_METRICS_PATH = "logs/stage_metrics.jsonl"
+PROC_STATUS = "/proc/self/status"
+PROC_CLEAR_REFS = "/proc/self/clear_refs"
+# Run id di luar flow Prefect (CLI transform, benchmark): satu per proses induk
+LOCAL_RUN_ID = f"local-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+
+# VmHWM berlaku untuk seluruh proses: tahap yang berjalan bersamaan (mis. extract yang di-prefetch
+# di thread worker saat transform berjalan) tidak boleh mereset puncak milik tahap lain
+_active_lock = threading.Lock()
+_active_stages = []
+
+def current_run_id():
+    """
+    Id flow run Prefect yang sedang berjalan (juga dari dalam task), atau LOCAL_RUN_ID.
+    Proses worker backfill tidak punya context Prefect: run id-nya dikirim lewat argumen job.
+    """
+    flow_context = FlowRunContext.get()
+    if flow_context is not None and flow_context.flow_run is not None:
+        return str(flow_context.flow_run.id)
+    task_context = TaskRunContext.get()
+    if task_context is not None and task_context.task_run.flow_run_id:
+        return str(task_context.task_run.flow_run_id)
+    return LOCAL_RUN_ID
+
+def _read_status_kb(*fields):
+    values = {}
+    with open(PROC_STATUS, "rb") as f:
+        for line in f:
+            name, _, rest = line.partition(b":")
+            if name.decode() in fields:
+                values[name.decode()] = int(rest.split()[0])
+    return values
+
+def _reset_peak_rss():
+    # Menulis "5" ke clear_refs mereset VmHWM (Linux >= 4.0) ke RSS saat ini
+    fd = os.open(PROC_CLEAR_REFS, os.O_WRONLY)
+    try:
+        os.write(fd, b"5")
+    finally:
+        os.close(fd)
+
+def _peak_rss_supported():
+    # clear_refs bisa tidak ada atau read-only (kernel tanpa CONFIG_PROC_PAGE_MONITOR, gVisor,
+    # container yang diperketat); dicek tanpa menulis agar tidak mereset puncak tahap lain
+    try:
+        _read_status_kb("VmRSS", "VmHWM")
+    except OSError:
+        return False
+    return os.access(PROC_CLEAR_REFS, os.W_OK)
+
+class StageProfiler:
+    """
+    Mencatat wall time, CPU time, kenaikan puncak RSS dan jumlah baris masuk/keluar per tahap.
+    Biayanya per tahap hanya beberapa syscall, sehingga aman dibiarkan aktif di produksi.
+
+    Puncak RSS diukur per tahap lewat VmHWM yang direset di awal tahap (Linux); tanpa clear_refs
+    yang bisa ditulis atau di platform lain memakai selisih ru_maxrss, yang hanya naik jika tahap itu memecahkan rekor puncak proses.
+    Keduanya berlaku untuk seluruh proses, sehingga tahap yang tumpang tindih dengan tahap lain
+    di thread berbeda ditandai rss_unreliable dan angkanya tidak dipakai untuk budget/regresi.
+    """
+
+    def __init__(self, task, year, run_id=None):
+        self.task = task
+        self.year = str(year)
+        self.run_id = run_id or current_run_id()
+        self.status = "ok"
+        self.stages = []
+        self.details = {}
+        self.peak_rss_mb = 0.0
+        self.rss_unreliable = False
+        self.started = time.perf_counter()
+        self.cpu_started = time.process_time()
+        self._proc = _peak_rss_supported()
+
+    def _rss_mb(self):
+        if self._proc:
+            status = _read_status_kb("VmRSS", "VmHWM")
+            return status["VmRSS"] / 1024, status["VmHWM"] / 1024
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return peak, peak
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Context manager satu tahap. Dict yang di-yield boleh dilengkapi pemanggil
+        (mis. stage["rows_out"] = len(df)) dan ikut tercatat.
+        """
+        record = {"stage": name, "rows_in": rows_in, "rows_out": None}
+        with _active_lock:
+            if _active_stages:
+                # Tahap lain sedang diukur: jangan reset, dan tandai semua tahap yang tumpang tindih
+                for active in _active_stages + [record]:
+                    active["rss_unreliable"] = True
+            elif self._proc:
+                try:
+                    _reset_peak_rss()
+                except OSError:
+                    # Tampak writable tetapi ditolak: VmHWM tidak direset, puncaknya milik proses
+                    record["rss_unreliable"] = True
+            _active_stages.append(record)
+        rss_before, peak_before = self._rss_mb()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            rss_after, peak_after = self._rss_mb()
+            with _active_lock:
+                _active_stages.remove(record)
+            record.setdefault("rss_unreliable", False)
+            self.rss_unreliable = self.rss_unreliable or record["rss_unreliable"]
+            self.peak_rss_mb = max(self.peak_rss_mb, peak_after)
+            record.update({
+                "wall_s": round(time.perf_counter() - wall, 4),
+                "cpu_s": round(time.process_time() - cpu, 4),
+                "peak_rss_delta_mb": round(max(peak_after - (rss_before if self._proc else peak_before), 0.0), 1),
+                "rss_after_mb": round(rss_after, 1),
+            })
+            self.stages.append(record)
+
+    def annotate(self, **details):
+        """
+        Menambahkan field bebas ke record (mis. rencana memori).
+        """
+        self.details.update(details)
+
+    def to_record(self):
+        return {
+            "run_id": self.run_id,
+            "task": self.task,
+            "year": self.year,
+            "status": self.status,
+            "pid": os.getpid(),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "wall_s": round(time.perf_counter() - self.started, 4),
+            "cpu_s": round(time.process_time() - self.cpu_started, 4),
+            # RSS absolut tertinggi yang tercapai selama tahap-tahap terukur
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            # True jika ada tahap yang tumpang tindih dengan tahap lain di proses yang sama
+            "rss_unreliable": self.rss_unreliable,
+            **self.details,
+            "stages": self.stages,
+        }
+
+def write_metrics(record, metrics_path=DEFAULT_METRICS_PATH):
+    """
+    Menambahkan satu record JSON per baris ke metrics_path dengan satu write() ber-O_APPEND,
+    sehingga aman ditulis bersamaan oleh beberapa proses transform.
+    """
+    if not metrics_path:
+        return
+    directory = os.path.dirname(metrics_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd = os.open(metrics_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, (json.dumps(record, sort_keys=True) + "\n").encode("utf-8"))
+    finally:
+        os.close(fd)
+
+def stage_table(records):
+    """
+    Meratakan record menjadi baris tabel (satu baris per tahun x tahap) untuk artifact Prefect.
+    """
+    rows = []
+    for record in records:
+        for stage in record["stages"]:
+            rows.append({"task": record["task"], "year": record["year"], "status": record["status"], **stage})
+    return rows
+
+def publish_metrics(records, key=None):
+    """
+    Mempublikasikan record sebagai table artifact pada flow/task run yang sedang berjalan.
+    Di luar run Prefect (worker process pool, CLI) tidak melakukan apa-apa; record tetap
+    tersedia di file JSONL.
+    """
+    records = [record for record in records if record]
+    if not records or (TaskRunContext.get() is None and FlowRunContext.get() is None):
+        return None
+    from prefect.artifacts import create_table_artifact
+    years = sorted({record["year"] for record in records})
+    tasks = sorted({record["task"] for record in records})
+    return create_table_artifact(
+        table=stage_table(records),
+        key=key,
+        description=f"Waktu & memori per tahap {'/'.join(tasks)}: {', '.join(years)}",
+    )
@@ -0,0 +1,230 @@
+# src/flow/metrics_store.py
+
+import os
+import json
+import time
+import sqlite3
+import statistics
+
+DEFAULT_METRICS_DB = "logs/metrics.db"
+DEFAULT_HISTORY = 5
+DEFAULT_THRESHOLD = 0.20
+# Selisih absolut minimum agar dianggap regresi (di bawahnya noise timer/alokator)
+MIN_WALL_DELTA_S = 0.05
+MIN_RSS_DELTA_MB = 8.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS year_metrics (
+    run_id TEXT NOT NULL,
+    task TEXT NOT NULL,
+    year TEXT NOT NULL,
+    status TEXT NOT NULL,
+    finished_at TEXT NOT NULL,
+    recorded_at REAL NOT NULL,
+    wall_s REAL,
+    cpu_s REAL,
+    peak_rss_mb REAL,
+    rss_unreliable INTEGER NOT NULL DEFAULT 0,
+    rows_read INTEGER,
+    rows_encoded INTEGER,
+    rows_sampled INTEGER,
+    rows_out INTEGER,
+    bytes_in INTEGER,
+    output_bytes INTEGER,
+    validation TEXT,
+    validation_failures INTEGER,
+    record TEXT NOT NULL,
+    PRIMARY KEY (run_id, task, year)
+);
+CREATE TABLE IF NOT EXISTS stage_metrics (
+    run_id TEXT NOT NULL,
+    task TEXT NOT NULL,
+    year TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    wall_s REAL,
+    cpu_s REAL,
+    peak_rss_delta_mb REAL,
+    rows_in INTEGER,
+    rows_out INTEGER,
+    PRIMARY KEY (run_id, task, year, position)
+);
+CREATE INDEX IF NOT EXISTS year_metrics_history ON year_metrics (task, year, recorded_at);
+"""
+
+YEAR_COLUMNS = ["run_id", "task", "year", "status", "finished_at", "recorded_at", "wall_s", "cpu_s", "peak_rss_mb",
+                "rss_unreliable", "rows_read", "rows_encoded", "rows_sampled", "rows_out", "bytes_in", "output_bytes", "validation",
+                "validation_failures", "record"]
+SAMPLE_STAGES = {"read_encode_sample", "encode_sample", "duckdb_encode_sample"}
+STAGE_COLUMNS = ["run_id", "task", "year", "stage", "position", "wall_s", "cpu_s", "peak_rss_delta_mb",
+                 "rows_in", "rows_out"]
+
+def connect(db_path=DEFAULT_METRICS_DB):
+    """
+    Membuka (dan membuat jika belum ada) store SQLite. Mode WAL + busy_timeout membuat beberapa
+    proses transform backfill bisa menulis bergantian tanpa "database is locked".
+    """
+    directory = os.path.dirname(db_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    con = sqlite3.connect(db_path, timeout=30)
+    con.row_factory = sqlite3.Row
+    con.execute("PRAGMA journal_mode=WAL")
+    con.executescript(SCHEMA)
+    # Store dari versi sebelum kolom rss_unreliable ada
+    columns = {row["name"] for row in con.execute("PRAGMA table_info(year_metrics)")}
+    if "rss_unreliable" not in columns:
+        con.execute("ALTER TABLE year_metrics ADD COLUMN rss_unreliable INTEGER NOT NULL DEFAULT 0")
+    return con
+
+def _first(stages, field, names=None):
+    for stage in stages:
+        if (names is None or stage["stage"] in names) and stage.get(field) is not None:
+            return stage[field]
+    return None
+
+def summarize(record):
+    """
+    Meringkas record StageProfiler menjadi satu baris year_metrics.
+    """
+    stages = record.get("stages", [])
+    by_name = {stage["stage"]: stage for stage in stages}
+    if "validate" in by_name:
+        validation = "failed" if record["status"] == "validation_failed" else "passed"
+    else:
+        validation = "skipped" if record["task"] == "transform" else None
+    return {
+        "run_id": record.get("run_id") or record["finished_at"],
+        "task": record["task"],
+        "year": str(record["year"]),
+        "status": record["status"],
+        "finished_at": record["finished_at"],
+        # finished_at hanya beresolusi detik; urutan riwayat memakai waktu pencatatan
+        "recorded_at": time.time(),
+        "wall_s": record.get("wall_s"),
+        "cpu_s": record.get("cpu_s"),
+        "peak_rss_mb": record.get("peak_rss_mb"),
+        "rss_unreliable": int(bool(record.get("rss_unreliable"))),
+        # Baris mentah yang dibaca: keluaran tahap read, atau masukan tahap baca+encode per chunk
+        "rows_read": by_name.get("read", {}).get("rows_out") or _first(stages, "rows_in", SAMPLE_STAGES),
+        "rows_encoded": _first(stages, "rows_encoded"),
+        "rows_sampled": _first(stages, "rows_out", SAMPLE_STAGES),
+        "rows_out": by_name.get("write", {}).get("rows_out"),
+        "bytes_in": _first(stages, "bytes_in"),
+        "output_bytes": by_name.get("write", {}).get("bytes_out") or _first(stages, "bytes_out"),
+        "validation": validation,
+        "validation_failures": record.get("validation_failures"),
+        "record": json.dumps(record, sort_keys=True, default=str),
+    }
+
+def record_metrics(record, db_path=DEFAULT_METRICS_DB):
+    """
+    Menyimpan satu record (per run x task x tahun) beserta tahap-tahapnya. Run yang sama
+    menimpa barisnya sendiri (mis. retry task). No-op jika db_path kosong.
+    """
+    if not db_path or not record:
+        return
+    row = summarize(record)
+    stage_rows = [{"run_id": row["run_id"], "task": row["task"], "year": row["year"], "position": position,
+                   **{column: stage.get(column) for column in STAGE_COLUMNS[3:] if column != "position"}}
+                  for position, stage in enumerate(record.get("stages", []))]
+    con = connect(db_path)
+    try:
+        with con:
+            con.execute(f"INSERT OR REPLACE INTO year_metrics ({', '.join(YEAR_COLUMNS)}) "
+                        f"VALUES ({', '.join('?' * len(YEAR_COLUMNS))})", [row[column] for column in YEAR_COLUMNS])
+            con.execute("DELETE FROM stage_metrics WHERE run_id = ? AND task = ? AND year = ?",
+                        (row["run_id"], row["task"], row["year"]))
+            con.executemany(f"INSERT INTO stage_metrics ({', '.join(STAGE_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * len(STAGE_COLUMNS))})",
+                            [[stage[column] for column in STAGE_COLUMNS] for stage in stage_rows])
+    finally:
+        con.close()
+
+def throughput(row):
+    """
+    Baris per detik (transform) atau byte per detik (extract); None jika tidak terukur.
+    """
+    amount = row["rows_read"] if row["task"] == "transform" else row["bytes_in"]
+    if not amount or not row["wall_s"]:
+        return None
+    return amount / row["wall_s"]
+
+def latest_run(con):
+    row = con.execute("SELECT run_id FROM year_metrics ORDER BY recorded_at DESC LIMIT 1").fetchone()
+    return row["run_id"] if row else None
+
+def detect_regressions(con, run_id=None, history=DEFAULT_HISTORY, threshold=DEFAULT_THRESHOLD):
+    """
+    Membandingkan tiap (task, tahun) pada `run_id` (default: run terakhir) dengan median
+    `history` run sukses sebelumnya untuk task dan tahun yang sama.
+
+    Returns:
+        list: dict per (task, tahun) dengan throughput/puncak RSS saat ini dan median historis;
+        `regression` True jika throughput turun atau puncak RSS naik melebihi threshold. Puncak RSS
+        yang ditandai rss_unreliable (tahap tumpang tindih) tidak ikut dibandingkan.
+    """
+    run_id = run_id or latest_run(con)
+    comparisons = []
+    for row in con.execute("SELECT * FROM year_metrics WHERE run_id = ? ORDER BY task, year", (run_id,)):
+        previous = con.execute(
+            "SELECT * FROM year_metrics WHERE task = ? AND year = ? AND run_id != ? AND status = 'ok' "
+            "AND recorded_at < ? ORDER BY recorded_at DESC LIMIT ?",
+            (row["task"], row["year"], run_id, row["recorded_at"], history)).fetchall()
+        item = {"run_id": run_id, "task": row["task"], "year": row["year"], "status": row["status"],
+                "validation": row["validation"], "history": len(previous), "throughput": throughput(row),
+                "baseline_throughput": None, "peak_rss_mb": row["peak_rss_mb"], "baseline_peak_rss_mb": None,
+                "rss_unreliable": bool(row["rss_unreliable"]),
+                "wall_s": row["wall_s"], "baseline_wall_s": None, "regression": False}
+        if previous and row["status"] == "ok":
+            rates = [rate for rate in map(throughput, previous) if rate]
+            item["baseline_wall_s"] = statistics.median(p["wall_s"] for p in previous)
+            reliable = [p["peak_rss_mb"] for p in previous if not p["rss_unreliable"] and p["peak_rss_mb"] is not None]
+            item["baseline_peak_rss_mb"] = statistics.median(reliable) if reliable else None
+            item["baseline_throughput"] = statistics.median(rates) if rates else None
+            slower = (item["throughput"] and item["baseline_throughput"]
+                      and item["throughput"] < item["baseline_throughput"] * (1 - threshold)
+                      and row["wall_s"] - item["baseline_wall_s"] > MIN_WALL_DELTA_S)
+            heavier = False
+            if item["baseline_peak_rss_mb"] is not None and not row["rss_unreliable"]:
+                memory_delta = row["peak_rss_mb"] - item["baseline_peak_rss_mb"]
+                heavier = memory_delta > max(MIN_RSS_DELTA_MB, threshold * item["baseline_peak_rss_mb"])
+            item["regression"] = bool(slower or heavier)
+        comparisons.append(item)
+    return comparisons
+
+def _rate(value, task):
+    if value is None:
+        return "-"
+    return f"{value:,.0f} baris/s" if task == "transform" else f"{value / 1024 ** 2:,.1f} MiB/s"
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Laporan metrik run pipeline BRFSS dan deteksi regresi")
+    parser.add_argument("--db", default=DEFAULT_METRICS_DB)
+    parser.add_argument("--run", help="run_id yang diperiksa (default: run terakhir)")
+    parser.add_argument("--history", type=int, default=DEFAULT_HISTORY, help="Jumlah run sukses sebelumnya")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Perubahan relatif yang dianggap regresi (0.20 = 20%%)")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        raise SystemExit(f"Store metrik tidak ditemukan: {args.db}")
+    con = connect(args.db)
+    comparisons = detect_regressions(con, args.run, args.history, args.threshold)
+    if not comparisons:
+        raise SystemExit("Belum ada run tercatat")
+    print(f"Run {comparisons[0]['run_id']} dibandingkan dengan median {args.history} run sukses sebelumnya "
+          f"(~ = puncak RSS tumpang tindih dengan tahap lain, tidak dibandingkan)")
+    for item in comparisons:
+        rss = f"{item['peak_rss_mb']:.0f}" if item["peak_rss_mb"] is not None else "-"
+        rss += "~" if item["rss_unreliable"] else ""
+        base_rss = f"{item['baseline_peak_rss_mb']:.0f}" if item["baseline_peak_rss_mb"] is not None else "-"
+        flag = "⚠️ REGRESI" if item["regression"] else ""
+        rate, base_rate = _rate(item["throughput"], item["task"]), _rate(item["baseline_throughput"], item["task"])
+        print(f"{item['task']:<9} {item['year']}  {item['status']:<17} validasi {item['validation'] or '-':<7} "
+              f"{base_rate:>16} -> {rate:<16} "
+              f"RSS {base_rss} -> {rss} MiB  (riwayat {item['history']})  {flag}")
+    if any(item["regression"] for item in comparisons):
+        raise SystemExit(1)
@@ -1,23 +1,35 @@
 import os
 import re
+import socket
 import subprocess
 import sys
+from collections import deque
 from pathlib import Path
 
 from prefect import flow, get_run_logger, task
 
-from src.extract.extract import load_config, extract_dataset
-from src.transform.transform import transform_dataset
+from src.extract.extract import load_config, discover_years, extract_dataset
+from src.extract.cache import cached_entry, record_staged
+from src.load.load import stage_dataset
+from src.flow.instrumentation import DEFAULT_METRICS_PATH, current_run_id
+from src.flow.metrics_store import DEFAULT_METRICS_DB
+from src.transform.memory import parse_memory
+from src.transform.fingerprint import compute_fingerprint, input_hash, output_fingerprint
+from src.transform.transform import append_log, output_path_for, transform_backfill, transform_dataset
+from src.visualization.config import DASHBOARD_PORT
 # from src.visualization.static_charts import save_static_charts
 
-def get_latest_year(raw_dir):
-    files = os.listdir(raw_dir)
-    years = []
-    for f in files:
-        match = re.search(r"LLCP(\d{4})\.XPT", f, re.IGNORECASE)
-        if match:
-            years.append(int(match.group(1)))
-    return max(years) if years else None
+def _prefetched_bytes(extracts):
+    """
+    Ukuran XPT yang sudah selesai diunduh tetapi belum diambil consumer.
+    """
+    total = 0
+    for _, future in extracts:
+        if future.state.is_completed():
+            path = future.result()
+            if path and os.path.exists(path):
+                total += os.path.getsize(path)
+    return total
 
 @task
 def run_dash_server():
@@ -33,8 +45,15 @@ def run_dash_server():
         if not app_path.exists():
             raise FileNotFoundError(f"Dashboard app not found at: {app_path}")
         
+        # Dashboard yang sudah berjalan memuat tahun baru sendiri lewat manifest versi data
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex(("127.0.0.1", DASHBOARD_PORT)) == 0:
+                print(f"Dashboard already running at http://localhost:{DASHBOARD_PORT}; "
+                      "new data is picked up without a restart")
+                return
+
         print("Starting BRFSS Diabetes Dashboard...")
-        print(f"Dashboard will be available at: http://localhost:8050")
+        print(f"Dashboard will be available at: http://localhost:{DASHBOARD_PORT}")
         print("Press Ctrl+C to stop the dashboard")
 
         process = subprocess.Popen([
@@ -75,7 +94,7 @@ def setup_dashboard_environment():
             print(f"⚠️  Warning: Processed data directory not found: {processed_dir}")
             print("   Make sure to run data processing tasks before starting the dashboard")
         else:
-            parquet_files = list(processed_dir.glob("*.parquet"))
+            parquet_files = list(processed_dir.glob("Year=*/*.parquet")) or list(processed_dir.glob("*.parquet"))
             if parquet_files:
                 print(f"✓ Found {len(parquet_files)} processed data files")
             else:
@@ -100,53 +119,153 @@ def elt_pipeline(config_path: str = "config.yaml"):
     url_template = config["dataset"]["url_template"]
     raw_dir = config["dataset"]["raw_dir"]
     processed_dir = config["dataset"]["processed_dir"]
+    staging_dir = config["dataset"].get("staging_dir", "data/staging/")
+    staging_config = config.get("staging", {})
+    download_config = config.get("download", {})
+    workers = download_config.get("workers", 4)
+    segment_size = download_config.get("segment_size_mb", 8) * 1024 * 1024
+    download_mode = download_config.get("mode", "download")
+    discovery_config = config.get("discovery", {})
+    transform_config = config.get("transform", {})
+    metrics_path = config.get("instrumentation", {}).get("metrics_path", DEFAULT_METRICS_PATH)
+    metrics_db = config.get("instrumentation", {}).get("metrics_db", DEFAULT_METRICS_DB)
+    run_id = current_run_id()
     feature_map_path = "src/transform/feature_map.yaml"
     log_file_path = "logs/missing_features.log"
 
     os.makedirs("logs", exist_ok=True)
-    open(log_file_path, 'w').close()
     os.makedirs(processed_dir, exist_ok=True)
+    # Log fitur ditulis ulang tiap run (satu baris per tahun); riwayat antar-run ada di metrics_db
+    open(log_file_path, 'w').close()
+
+    # 2. Discovery: semua tahun kandidat dicek paralel di awal
+    years = discover_years(
+        url_template=url_template,
+        start_year=start_year,
+        window=discovery_config.get("window"),
+        workers=discovery_config.get("workers", 8),
+    )
+    if not years:
+        logger.warning(f"❌ Tidak ada data yang tersedia mulai tahun {start_year}")
 
-    # Deteksi tahun terakhir yang sudah ada
-    latest = get_latest_year(raw_dir)
-    start_year = (latest + 1) if latest else config["dataset"]["start_year"]
-    year = start_year
+    logger.info(f"🚀 Memulai ELT untuk tahun: {years}")
 
-    logger.info(f"🚀 Memulai ELT dari tahun: {year}")
+    transform_workers = transform_config.get("jobs", 1)
+    pipeline_config = config.get("pipeline", {})
 
-    # 2. Extract & Transform Loop
-    while True:
-        url = url_template.format(year=year)
-        logger.info(f"🔍 Mengecek tahun: {year}")
-        path = extract_dataset(url=url, output_dir=raw_dir)
+    def extract(year, **submit):
+        run = extract_dataset.submit if submit else extract_dataset
+        return run(url=url_template.format(year=year), output_dir=raw_dir, workers=workers,
+                   segment_size=segment_size, mode=download_mode, metrics_path=metrics_path,
+                   metrics_db=metrics_db, **submit)
 
+    def prepare(year, path):
+        """
+        Fingerprint + staging satu tahun hasil extract. Return: argumen transform_dataset, atau
+        None jika tahun dilewati.
+        """
         if path is None:
-            logger.warning(f"❌ Tidak ada data untuk tahun {year}, berhenti.")
-            break
+            logger.warning(f"❌ Tidak ada data untuk tahun {year}, dilewati.")
+            return None
 
         match = re.search(r"LLCP(\d{4})", os.path.basename(path), re.IGNORECASE)
         if not match:
             logger.warning(f"⚠️ File tidak cocok pola: {path}")
-            year += 1
-            continue
+            return None
 
         year_str = match.group(1)
-        output_file = os.path.join(processed_dir, f"diabetes_01_health_indicators_BRFSS{year_str}.parquet")
+        output_file = output_path_for(processed_dir, year_str)
 
-        try:
-            transform_dataset(
-                input_path=path,
-                feature_map_path=feature_map_path,
-                output_path=output_file,
+        # Fingerprint: hash XPT, feature_map.yaml, skema output dan versi transform
+        current = cached_entry(raw_dir, year)
+        source_sha256 = current["sha256"] if current else input_hash(path)
+        fingerprint = compute_fingerprint(source_sha256, feature_map_path)
+        if output_fingerprint(output_file) == fingerprint:
+            logger.info(f"⏭️ BRFSS{year_str} tidak berubah, transform dilewati")
+            append_log(log_file_path, f"BRFSS{year_str}: tidak berubah, transform dilewati\n")
+            return None
+
+        if staging_config.get("enabled", True):
+            path = stage_dataset(
+                xpt_path=path,
+                staging_dir=staging_dir,
                 year=year_str,
-                log_file_path=log_file_path
+                source_sha256=source_sha256,
+                delete_raw=staging_config.get("delete_raw", False),
             )
+            record_staged(raw_dir, year, path)
+
+        return {
+            "input_path": path,
+            "feature_map_path": feature_map_path,
+            "output_path": output_file,
+            "year": year_str,
+            "log_file_path": log_file_path,
+            "reader": transform_config.get("reader", "xport"),
+            "chunksize": transform_config.get("chunksize"),
+            "fingerprint": fingerprint,
+            "apply_params": transform_config.get("apply_params", False),
+            "validation": transform_config.get("validation", "compiled"),
+            "validation_sample": transform_config.get("validation_sample"),
+            "engine": transform_config.get("engine", "pandas"),
+            "metrics_path": metrics_path,
+            "metrics_db": metrics_db,
+            "run_id": run_id,
+            "max_memory": transform_config.get("max_memory"),
+        }
+
+    def transform(job):
+        try:
+            transform_dataset(**job)
         except KeyError as e:
             logger.error(str(e))
-            with open(log_file_path, "a") as f:
-                f.write(f"[{year_str}] Transform Error: {e}\n")
+            append_log(log_file_path, f"[{job['year']}] Transform Error: {e}\n")
+
+    # Semua tahun dicek ulang; tahun yang tidak berubah hanya memakan satu request kondisional (304)
+    if pipeline_config.get("enabled", True) and transform_workers <= 1:
+        # 3+4. Pipeline producer/consumer: unduhan tahun berikutnya berjalan (sebagai task yang
+        # di-submit) selama tahun ini di-staging dan di-transform, dibatasi prefetch_years tahun
+        # dan prefetch_disk byte XPT yang sudah terunduh tetapi belum diproses
+        prefetch_years = max(int(pipeline_config.get("prefetch_years", 2)), 1)
+        prefetch_disk = parse_memory(pipeline_config.get("prefetch_disk"))
+        pending, extracts = deque(years), deque()
 
-        year += 1
+        def fill():
+            while pending and len(extracts) < prefetch_years:
+                if extracts and prefetch_disk and _prefetched_bytes(extracts) >= prefetch_disk:
+                    logger.info("⏸️ Batas prefetch_disk tercapai, unduhan berikutnya menunggu transform")
+                    break
+                year = pending.popleft()
+                logger.info(f"🔍 Mengecek tahun: {year}")
+                # Unduhan dirantai satu per satu: bandwidth tidak dibagi, tahun tertua selesai lebih dulu
+                previous = [extracts[-1][1]] if extracts else []
+                extracts.append((year, extract(year, wait_for=previous)))
+
+        fill()
+        while extracts:
+            year, future = extracts.popleft()
+            path = future.result()
+            fill()
+            job = prepare(year, path)
+            if job:
+                transform(job)
+    else:
+        # 3. Extract & Load (staging) Loop
+        transform_jobs = []
+        for year in years:
+            logger.info(f"🔍 Mengecek tahun: {year}")
+            job = prepare(year, extract(year))
+            if job:
+                transform_jobs.append(job)
+
+        # 4. Transform: serial per tahun, atau backfill paralel lewat process pool
+        if transform_workers > 1 and len(transform_jobs) > 1:
+            logger.info(f"⚙️ Backfill {len(transform_jobs)} tahun dengan {transform_workers} proses")
+            transform_backfill(transform_jobs, max_workers=transform_workers,
+                               max_memory=transform_config.get("max_memory"))
+        else:
+            for job in transform_jobs:
+                transform(job)
 
     # Visualization tasks
     setup_dashboard_environment()
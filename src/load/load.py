@@ -0,0 +1,110 @@
+# src/load/load.py
+
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyreadstat
+from prefect import task, get_run_logger
+from src.transform.xport import iter_xport, read_xport_header
+
+SOURCE_HASH_KEY = b"brfss.source_sha256"
+DEFAULT_CHUNKSIZE = 250_000
+
+def staging_path_for(staging_dir, year):
+    return os.path.join(staging_dir, f"LLCP{year}.parquet")
+
+def staged_source_hash(staged_path):
+    """
+    Return: SHA-256 file XPT sumber yang tercatat di metadata Parquet staging, atau None.
+    """
+    if not os.path.exists(staged_path):
+        return None
+    metadata = pq.read_schema(staged_path).metadata or {}
+    value = metadata.get(SOURCE_HASH_KEY)
+    return value.decode() if value else None
+
+def _iter_raw_chunks(xpt_path, chunksize):
+    try:
+        read_xport_header(xpt_path)
+    except ValueError:
+        for chunk, _ in pyreadstat.read_file_in_chunks(pyreadstat.read_xport, xpt_path, chunksize=chunksize):
+            yield chunk
+        return
+    yield from iter_xport(xpt_path, chunksize=chunksize)
+
+def _header_schema(xpt_path):
+    """
+    Skema Arrow dari header XPT saja (untuk file tanpa observasi), sama dengan tipe kolom yang
+    dihasilkan chunk: numerik float64, karakter bytes (xport) atau string (pyreadstat).
+    """
+    try:
+        columns = read_xport_header(xpt_path)["columns"]
+    except ValueError:
+        empty, _ = pyreadstat.read_xport(xpt_path, metadataonly=True)
+        return pa.Schema.from_pandas(empty, preserve_index=False)
+    return pa.schema([(column["name"], pa.float64() if column["type"] == "numeric" else pa.binary())
+                      for column in columns])
+
+def write_staging(xpt_path, staged_path, source_sha256=None, chunksize=DEFAULT_CHUNKSIZE,
+                  compression_level=3):
+    """
+    Mengonversi satu file XPT (semua variabel) menjadi Parquet zstd, satu row group per chunk,
+    ditulis ke file sementara lalu di-rename. XPT tanpa observasi menjadi tabel kosong dengan
+    skema dari header; file sementara dihapus jika penulisan gagal.
+    Return: jumlah baris.
+    """
+    tmp_path = f"{staged_path}.tmp"
+    writer, rows = None, 0
+
+    def open_writer(schema):
+        metadata = {**(schema.metadata or {}), SOURCE_HASH_KEY: (source_sha256 or "").encode()}
+        return pq.ParquetWriter(tmp_path, schema.with_metadata(metadata),
+                                compression="zstd", compression_level=compression_level)
+
+    try:
+        try:
+            for chunk in _iter_raw_chunks(xpt_path, chunksize):
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = open_writer(table.schema)
+                writer.write_table(table)
+                rows += table.num_rows
+            if writer is None:
+                writer = open_writer(_header_schema(xpt_path))
+        finally:
+            if writer is not None:
+                writer.close()
+        os.replace(tmp_path, staged_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return rows
+
+@task
+def stage_dataset(xpt_path: str, staging_dir: str, year: str, source_sha256: str = None,
+                  delete_raw: bool = False, chunksize: int = DEFAULT_CHUNKSIZE) -> str:
+    """
+    Tahap load ELT: menyimpan isi XPT mentah sekali sebagai Parquet kolumnar (zstd) di staging,
+    agar transform dan analisis ad-hoc cukup membaca kolom yang dibutuhkan.
+    Staging yang sudah dibuat dari XPT dengan hash yang sama dipakai ulang.
+    Return: path file Parquet staging.
+    """
+    logger = get_run_logger()
+    os.makedirs(staging_dir, exist_ok=True)
+    staged_path = staging_path_for(staging_dir, year)
+
+    if source_sha256 and staged_source_hash(staged_path) == source_sha256:
+        logger.info(f"♻️ Staging masih terbaru: {staged_path}")
+    else:
+        if not os.path.exists(xpt_path):
+            raise FileNotFoundError(f"File XPT untuk staging tidak ditemukan: {xpt_path}")
+        rows = write_staging(xpt_path, staged_path, source_sha256, chunksize)
+        raw_mb = os.path.getsize(xpt_path) / (1024 * 1024)
+        staged_mb = os.path.getsize(staged_path) / (1024 * 1024)
+        logger.info(f"🗄️ Staging BRFSS{year}: {rows} baris, {raw_mb:.1f} MiB XPT -> {staged_mb:.1f} MiB Parquet")
+
+    if delete_raw and os.path.exists(xpt_path):
+        os.remove(xpt_path)
+        logger.info(f"🧹 Deleted XPT: {os.path.basename(xpt_path)}")
+    return staged_path
@@ -0,0 +1,130 @@
+# src/transform/aggregates.py
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from src.transform.summaries import value_counts
+
+# Naikkan jika isi/format agregat berubah; agregat versi lain dihitung ulang oleh dashboard
+AGGREGATES_VERSION = 1
+FEATURE_COLUMNS = ["Diabetes_01", "HighBP", "HighChol", "BMI", "Smoker", "PhysActivity", "Fruits", "Veggies",
+                   "DiffWalk", "Sex", "Age"]
+COUNT_COLUMNS = [column for column in FEATURE_COLUMNS if column != "BMI"]
+BMI_HISTOGRAM_BINS = 50
+# Kurva KDE BMI seperti gaussian_kde(bw_method=0.3) yang dievaluasi di 1000 titik
+KDE_BANDWIDTH = 0.3
+KDE_POINTS = 1000
+KDE_BLOCK = 128
+
+def aggregates_path_for(output_path):
+    # Awalan "_" membuat file ini diabaikan oleh pembaca dataset Parquet (pyarrow, DuckDB)
+    directory, filename = os.path.split(output_path)
+    return os.path.join(directory, f"_{os.path.splitext(filename)[0]}.aggregates.json")
+
+def _bmi_summary(counts):
+    """
+    Momen, histogram dan kurva KDE BMI dari ringkasan value_counts (nilai unik BMI sedikit),
+    sama dengan menghitungnya dari seluruh baris.
+    """
+    if counts.empty:
+        return {}, None, None
+    values = counts.index.to_numpy(dtype=float)
+    weights = counts.to_numpy(dtype=float)
+    n = weights.sum()
+    mean = (values * weights).sum() / n
+    centered = values - mean
+    m2, m3, m4 = ((weights * centered ** power).sum() / n for power in (2, 3, 4))
+    stats = {
+        "mean": mean,
+        "std": np.sqrt(m2),
+        "skewness": m3 / m2 ** 1.5 if m2 > 0 else 0.0,
+        "kurtosis": m4 / m2 ** 2 - 3 if m2 > 0 else -3.0,
+        "min": values[0],
+        "max": values[-1],
+        "count": int(n),
+    }
+
+    edges = np.linspace(values[0], values[-1], BMI_HISTOGRAM_BINS + 1)
+    histogram, _ = np.histogram(values, bins=edges, weights=weights)
+
+    # gaussian_kde: kovarians sampel (ddof=1) dikali bw_method^2, bobot 1/n per baris
+    x = np.linspace(values[0], values[-1], KDE_POINTS)
+    bandwidth = KDE_BANDWIDTH * np.sqrt((weights * centered ** 2).sum() / (n - 1)) if n > 1 else 0.0
+    if bandwidth > 0:
+        y = np.concatenate([
+            (weights * np.exp(-0.5 * ((block[:, None] - values) / bandwidth) ** 2)).sum(axis=1)
+            for block in np.array_split(x, max(len(x) // KDE_BLOCK, 1))
+        ]) / (n * bandwidth * np.sqrt(2 * np.pi))
+    else:
+        y = np.zeros_like(x)
+    return ({key: float(value) if key != "count" else value for key, value in stats.items()},
+            {"edges": edges.tolist(), "counts": histogram.astype(np.int64).tolist()},
+            {"x": x.tolist(), "y": y.tolist()})
+
+def _is_categorical(counts):
+    codes = set(counts)
+    return codes <= {0, 1} or codes <= set(range(1, 14))
+
+def compute_aggregates(df, year, output_bytes=None):
+    """
+    Agregat per tahun untuk dashboard: value counts fitur kategorik (termasuk Sex, Age dan
+    Diabetes_01), momen + histogram + kurva KDE BMI, matriks korelasi Spearman dan statistik
+    deskriptif dataset. Ukurannya tetap, tidak bergantung jumlah baris survei.
+
+    Returns:
+        dict: siap ditulis sebagai JSON
+    """
+    columns = [column for column in FEATURE_COLUMNS if column in df.columns]
+    df = df[columns]
+    counts = {column: [[int(code), int(count)] for code, count in df[column].value_counts().sort_index().items()]
+              for column in COUNT_COLUMNS if column in columns}
+    bmi = value_counts(df["BMI"].astype("float64")) if "BMI" in columns else pd.Series(dtype=float)
+    bmi_stats, bmi_histogram, bmi_kde = _bmi_summary(bmi)
+
+    complete = df.dropna()
+    correlation = complete.corr(method="spearman") if len(complete) and len(columns) >= 2 else None
+
+    total_missing = int(df.isnull().sum().sum())
+    categorical = [column for column in columns
+                   if _is_categorical(dict(counts[column]) if column in counts else dict.fromkeys(bmi.index))]
+    return {
+        "year": int(year),
+        "aggregates_version": AGGREGATES_VERSION,
+        "rows": len(df),
+        "counts": counts,
+        "bmi": {"stats": bmi_stats, "histogram": bmi_histogram, "kde": bmi_kde},
+        "correlation": None if correlation is None else {
+            "columns": list(correlation.columns),
+            "matrix": correlation.to_numpy().tolist(),
+        },
+        "statistics": {
+            "total_rows": len(df),
+            "total_columns": len(columns),
+            "total_missing": total_missing,
+            "missing_percentage": total_missing / (len(df) * len(columns)) * 100 if len(df) and columns else 0.0,
+            "numeric_columns": 1,
+            "categorical_columns": len(categorical),
+            "duplicate_rows": int(df.duplicated().sum()),
+            "output_bytes": output_bytes,
+        },
+    }
+
+def save_aggregates(path, aggregates):
+    """
+    Menulis agregat ke file sementara lalu rename.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(aggregates, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+def load_aggregates_file(path):
+    """
+    Return: dict agregat, atau None jika file belum ada atau versinya berbeda.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        aggregates = json.load(f)
+    return aggregates if aggregates.get("aggregates_version") == AGGREGATES_VERSION else None
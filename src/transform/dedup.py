@@ -0,0 +1,107 @@
+# src/transform/dedup.py
+
+import numpy as np
+import pandas as pd
+
+MAX_KEY_BITS = 64
+MAX_INTEGRAL_RANGE = 2 ** 32
+
+def _column_codes(values):
+    """
+    Kode uint64 per nilai (nilai sama <=> kode sama) beserta lebar bit-nya, atau None jika
+    kolom tidak bisa dikodekan (mis. object/string).
+    """
+    if values.dtype.kind in "biu":
+        values = values.astype(np.int64)
+        low, high = (values.min(), values.max()) if len(values) else (0, 0)
+        return (values - low).astype(np.uint64), int(high - low).bit_length()
+    if values.dtype.kind != "f":
+        return None
+
+    missing = np.isnan(values)
+    if missing.all():
+        return np.zeros(len(values), dtype=np.uint64), 0
+    low, high = np.nanmin(values), np.nanmax(values)
+    if high - low < MAX_INTEGRAL_RANGE:
+        # Kode kecil yang disimpan sebagai float (kolom XPT mentah, BMI x 100): offset dari minimum
+        # mulai 1; fmax mengubah NaN menjadi 0 yang dicadangkan untuk nilai hilang
+        shifted = np.fmax(values - (low - 1), 0.0)
+        codes = shifted.astype(np.uint64)
+        if np.array_equal(codes, shifted):
+            return codes, int(high - low + 1).bit_length()
+    if values.dtype == np.float32:
+        # +0.0 menyamakan -0.0 dengan 0.0; semua NaN diganti satu pola bit yang sama
+        values = np.where(missing, np.float32(np.nan), values + np.float32(0.0)).astype(np.float32)
+        return values.view(np.uint32).astype(np.uint64), 32
+    uniques, inverse = np.unique(values, return_inverse=True)
+    return inverse.astype(np.uint64).ravel(), max(len(uniques) - 1, 0).bit_length()
+
+def pack_rows(df):
+    """
+    Mengemas tiap baris menjadi satu kunci uint64: kode tiap kolom digeser ke slot bit masing-masing.
+    Dua baris sama persis <=> kuncinya sama (dalam satu DataFrame; lebar slot diturunkan dari datanya).
+    Return: array uint64, atau None jika total lebar melebihi 64 bit.
+    """
+    keys = np.zeros(len(df), dtype=np.uint64)
+    shift = 0
+    for column in df.columns:
+        encoded = _column_codes(df[column].to_numpy())
+        if encoded is None:
+            return None
+        codes, width = encoded
+        if shift + width > MAX_KEY_BITS:
+            return None
+        if width:
+            keys |= codes << np.uint64(shift)
+        shift += width
+    return keys
+
+def duplicated(df):
+    """
+    Seperti DataFrame.duplicated(keep='first'), tetapi hash table cukup dibangun atas satu
+    array kunci baris terkemas (bila muat 64 bit).
+    """
+    keys = pack_rows(df)
+    if keys is None:
+        return df.duplicated().to_numpy()
+    return pd.Index(keys).duplicated()
+
+def drop_duplicates(df):
+    """
+    Seperti DataFrame.drop_duplicates(): baris pertama dipertahankan, urutan dan index tetap.
+    """
+    return df[~duplicated(df)]
+
+def has_duplicates(df):
+    """
+    Apakah ada baris duplikat, tanpa membangun mask per baris.
+    """
+    keys = pack_rows(df)
+    if keys is None:
+        return bool(df.duplicated().any())
+    return not pd.Index(keys).is_unique
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from src.transform.transform import load_feature_mapping, read_features
+
+    # Benchmark vs pandas: python -m src.transform.dedup data/raw/LLCP2015.XPT [output.parquet]
+    df, _ = read_features(sys.argv[1], load_feature_mapping("src/transform/feature_map.yaml"))
+    frames = [("raw", df)]
+    if len(sys.argv) > 2:
+        frames.append(("output", pd.read_parquet(sys.argv[2])))
+
+    for name, frame in frames:
+        started = time.perf_counter()
+        expected = frame.drop_duplicates()
+        pandas_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        actual = drop_duplicates(frame)
+        packed_seconds = time.perf_counter() - started
+
+        pd.testing.assert_frame_equal(actual, expected)
+        assert has_duplicates(frame) == frame.duplicated().any()
+        print(f"{name:>6}: {len(frame)} -> {len(actual)} baris, pandas {pandas_seconds:.3f} s, "
+              f"packed {packed_seconds:.3f} s ({pandas_seconds / packed_seconds:.1f}x)")
@@ -0,0 +1,194 @@
+# src/transform/duckdb_engine.py
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+from src.transform.sampling import check_sample_counts, row_keys
+
+DUCKDB_TYPES = {
+    "int8": "TINYINT",
+    "int16": "SMALLINT",
+    "int32": "INTEGER",
+    "int64": "BIGINT",
+    "float32": "FLOAT",
+    "float64": "DOUBLE",
+}
+RAW_LABEL = "_raw_label"
+SOURCE_VIEW = "brfss_raw"
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _literals(values):
+    return ", ".join(repr(float(value)) for value in values)
+
+def compile_encoding_sql(columns, kernel):
+    """
+    Menerjemahkan kernel hasil compile_encoding menjadi SQL: kondisi WHERE (nilai kosong,
+    kode valid, kode sentinel) dan ekspresi SELECT per kolom (remap LUT, pembagian, cast),
+    dengan semantik yang sama seperti apply_encoding.
+    Return: (list kondisi, list ekspresi "... AS kolom")
+    """
+    conditions, expressions = [], []
+    for column in columns:
+        quoted = _quote(column)
+        conditions.append(f"{quoted} IS NOT NULL AND NOT isnan({quoted})")
+        rule = kernel.get(column)
+        expression = quoted
+        if rule is not None:
+            if rule["valid"] is not None:
+                conditions.append(f"{quoted} IN ({_literals(rule['valid'])})")
+            if rule["drop"] is not None:
+                conditions.append(f"{quoted} NOT IN ({_literals(rule['drop'])})")
+            if rule["lut"] is not None:
+                cases = " ".join(f"WHEN {code} THEN {value}" for code, value in enumerate(rule["lut"]) if code != value)
+                expression = f"CASE {expression} {cases} ELSE {expression} END"
+            if rule["divide"]:
+                expression = f"({expression}) / {rule['divide']}"
+            if rule["dtype"]:
+                if rule["dtype"].startswith("int"):
+                    # astype() pada float memotong ke arah nol, CAST DuckDB membulatkan
+                    expression = f"trunc({expression})"
+                expression = f"CAST({expression} AS {DUCKDB_TYPES[rule['dtype']]})"
+        expressions.append(f"{expression} AS {quoted}")
+    return conditions, expressions
+
+def _register_row_keys(con, columns, dtypes, random_state):
+    """
+    UDF Arrow yang menghitung sampling.row_keys per vektor DuckDB, dengan dtype dan urutan
+    kolom yang sama seperti engine pandas, sehingga prioritas sampelnya identik.
+    Kolom dikirim sebagai satu STRUCT karena UDF Python harus punya jumlah parameter tetap.
+    """
+    def keys(rows):
+        rows = rows.combine_chunks() if isinstance(rows, pa.ChunkedArray) else rows
+        frame = pd.DataFrame({column: rows.field(column).to_numpy(zero_copy_only=False).astype(dtypes[column])
+                              for column in columns})
+        return pa.array(row_keys(frame, random_state), type=pa.uint64())
+
+    row_type = con.struct_type({column: DUCKDB_TYPES[dtypes[column]] for column in columns})
+    con.create_function("brfss_row_key", keys, [row_type], "UBIGINT", type="arrow")
+
+def _register_source(con, input_path, reader, rename_dict, chunksize):
+    if reader == "parquet":
+        select = ", ".join(f"{_quote(source)} AS {_quote(target)}" for source, target in rename_dict.items())
+        path = input_path.replace("'", "''")
+        con.execute(f"CREATE VIEW {SOURCE_VIEW} AS SELECT {select} FROM read_parquet('{path}')")
+        return
+    # XPT tidak bisa dibaca DuckDB: chunk dari decoder dialirkan sebagai RecordBatchReader Arrow
+    from src.transform.transform import iter_features
+    feature_map = {target: [source] for source, target in rename_dict.items()}
+    chunks, _ = iter_features(input_path, feature_map, chunksize, reader=reader)
+    schema = pa.schema([(target, pa.float64()) for target in rename_dict.values()])
+    batches = (pa.RecordBatch.from_pandas(chunk.astype("float64"), schema=schema, preserve_index=False)
+               for chunk in chunks)
+    con.register(SOURCE_VIEW, pa.RecordBatchReader.from_batches(schema, batches))
+
+def encode_and_sample_duckdb(input_path, feature_map, target_counts, kernel, reader="xport", chunksize=250_000,
+                             label="Diabetes_01", random_state=42, threads=None, memory_limit=None, counts=None):
+    """
+    Engine DuckDB untuk encode, deduplikasi global dan undersampling bertingkat: semuanya berjalan
+    sebagai SQL out-of-core dan multi-thread atas Parquet staging (atau aliran chunk XPT), dan hanya
+    sampel akhir yang kembali ke pandas. Prioritas sampel memakai row_keys yang sama dengan engine
+    pandas, sehingga hasilnya identik dengan encode_and_sample.
+    counts (dict, optional): diisi rows_encoded, jumlah baris unik setelah encode.
+
+    Returns:
+        tuple: (DataFrame sampel atau None, fitur yang hilang)
+    """
+    from src.transform.transform import _resolve_reader
+    reader, _, rename_dict, missing = _resolve_reader(input_path, feature_map, reader)
+    if missing:
+        return None, missing
+
+    con = duckdb.connect()
+    try:
+        if threads:
+            con.execute(f"SET threads = {int(threads)}")
+        if memory_limit:
+            con.execute(f"SET memory_limit = '{memory_limit}'")
+        _register_source(con, input_path, reader, rename_dict, chunksize)
+
+        columns = list(rename_dict.values())
+        conditions, expressions = compile_encoding_sql(columns, kernel)
+        expressions.append(f"{_quote(label)} AS {RAW_LABEL}")
+        key_columns = columns + [RAW_LABEL]
+        dtypes = {column: (kernel.get(column) or {}).get("dtype") or "float64" for column in columns}
+        dtypes[RAW_LABEL] = "float64"
+        _register_row_keys(con, key_columns, dtypes, random_state)
+
+        targets = " ".join(f"WHEN {value} THEN {target}" for value, target in target_counts.items()
+                           if target is not None)
+        limit = f"CASE {_quote(label)} {targets} ELSE NULL END" if targets else "NULL"
+        selected = ", ".join(_quote(column) for column in columns)
+        query = f"""
+            WITH encoded AS (
+                SELECT DISTINCT {", ".join(expressions)}
+                FROM {SOURCE_VIEW}
+                WHERE {" AND ".join(conditions)}
+            ),
+            prioritized AS (
+                SELECT *, brfss_row_key(struct_pack({", ".join(_quote(column) for column in key_columns)})) AS _priority,
+                    COUNT(*) OVER () AS _encoded_rows
+                FROM encoded
+            )
+            SELECT {selected}, _encoded_rows
+            FROM prioritized
+            QUALIFY {limit} IS NULL
+                OR row_number() OVER (PARTITION BY {_quote(label)} ORDER BY _priority) <= {limit}
+            ORDER BY {_quote(label)}, _priority
+        """
+        df = con.execute(query).df()
+    finally:
+        con.close()
+
+    encoded_rows = df.pop("_encoded_rows")
+    if counts is not None:
+        counts["rows_encoded"] = int(encoded_rows.iloc[0]) if len(encoded_rows) else 0
+
+    check_sample_counts(df[label].value_counts().to_dict(), target_counts, label)
+    return df, missing
+
+if __name__ == "__main__":
+    import json
+    import os
+    import resource
+    import subprocess
+    import sys
+    import tempfile
+    import time
+
+    # Benchmark pandas vs DuckDB (waktu & puncak RSS, tiap engine di proses terpisah):
+    # python -m src.transform.duckdb_engine data/staging/LLCP2015.parquet [chunksize]
+    input_path = sys.argv[1]
+    chunksize = int(sys.argv[2]) if len(sys.argv) > 2 else 250_000
+
+    if len(sys.argv) > 3:
+        from src.transform.transform import (DEFAULT_FEATURE_MAP_PATH, default_encoding_kernel, encode_and_sample,
+                                             iter_features, load_feature_mapping)
+        engine, output = sys.argv[3], sys.argv[4]
+        feature_map = load_feature_mapping(DEFAULT_FEATURE_MAP_PATH)
+        started = time.perf_counter()
+        if engine == "duckdb":
+            df, _ = encode_and_sample_duckdb(input_path, feature_map, {0: 70000}, default_encoding_kernel(),
+                                             chunksize=chunksize)
+        else:
+            chunks, _ = iter_features(input_path, feature_map, chunksize)
+            df = encode_and_sample(chunks, {0: 70000}, default_encoding_kernel())
+        seconds = time.perf_counter() - started
+        df.to_parquet(output, index=False)
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(json.dumps({"seconds": seconds, "peak_rss_mb": peak_mb, "rows": len(df)}))
+        raise SystemExit(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for engine in ("pandas", "duckdb"):
+            output = os.path.join(tmp, f"{engine}.parquet")
+            run = subprocess.run([sys.executable, "-m", "src.transform.duckdb_engine", input_path, str(chunksize),
+                                  engine, output], capture_output=True, text=True, check=True)
+            results[engine] = json.loads(run.stdout.strip().splitlines()[-1])
+            print(f"{engine:>6}: {results[engine]['seconds']:.2f} s, puncak RSS {results[engine]['peak_rss_mb']:.0f} MiB, "
+                  f"{results[engine]['rows']} baris")
+        pd.testing.assert_frame_equal(pd.read_parquet(os.path.join(tmp, "duckdb.parquet")),
+                                      pd.read_parquet(os.path.join(tmp, "pandas.parquet")))
+        print("Output identik")
@@ -0,0 +1,122 @@
+# src/transform/encoding.py
+
+import yaml
+import numpy as np
+import pandas as pd
+
+def load_encoding_rules(config_path):
+    with open(config_path, 'r') as f:
+        config = yaml.safe_load(f)
+    return config['encoding']
+
+def compile_encoding(rules):
+    """
+    Mengompilasi aturan `encoding` dari feature_map.yaml menjadi kernel: daftar kode valid/drop
+    sebagai array NumPy dan tabel lookup (LUT) untuk remap kode integer kecil.
+    """
+    kernel = {}
+    for column, rule in rules.items():
+        lut = None
+        if rule.get('map'):
+            mapping = {int(k): v for k, v in rule['map'].items()}
+            lut = np.arange(max(mapping) + 1, dtype=np.int64)
+            lut[list(mapping)] = list(mapping.values())
+        kernel[column] = {
+            'valid': np.array(rule['valid'], dtype=float) if 'valid' in rule else None,
+            'drop': np.array(rule['drop'], dtype=float) if 'drop' in rule else None,
+            'lut': lut,
+            'divide': rule.get('divide'),
+            'dtype': rule.get('dtype'),
+        }
+    return kernel
+
+def _remap(values, lut):
+    codes = values.astype(np.int64)
+    hit = (codes == values) & (codes >= 0) & (codes < len(lut))
+    return np.where(hit, lut[np.where(hit, codes, 0)], values)
+
+def apply_encoding(df, kernel):
+    """
+    Satu mask boolean gabungan (nilai kosong, kode valid, kode sentinel) lalu remap lewat LUT,
+    tanpa membuat frame antara per filter. Kolom tanpa aturan diteruskan apa adanya.
+    Return: DataFrame baru dengan index 0..n-1.
+    """
+    mask = df.notna().all(axis=1).to_numpy(copy=True)
+    for column, rule in kernel.items():
+        values = df[column].to_numpy()
+        if rule['valid'] is not None:
+            mask &= np.isin(values, rule['valid'])
+        if rule['drop'] is not None:
+            mask &= ~np.isin(values, rule['drop'])
+
+    encoded = {}
+    for column in df.columns:
+        values = df[column].to_numpy()[mask]
+        rule = kernel.get(column)
+        if rule is not None:
+            if rule['lut'] is not None:
+                values = _remap(values, rule['lut'])
+            if rule['divide']:
+                values = values / rule['divide']
+            if rule['dtype']:
+                values = values.astype(rule['dtype'])
+        encoded[column] = values
+    return pd.DataFrame(encoded)
+
+def encode_sequential(df, kernel):
+    """
+    Referensi: encode lama berbasis filter berurutan (satu frame antara per fitur). Dipakai
+    benchmark __main__ dan test kesetaraan untuk memastikan apply_encoding tidak menggeser nilai.
+    """
+    df = df.dropna()
+    df = df[df['Diabetes_01'].isin([1, 2, 3, 4])]
+    df['Diabetes_01'] = df['Diabetes_01'].replace({1: 1, 2: 0, 3: 0, 4: 0})
+    replacements = {
+        'HighBP': ({9}, {1: 0, 2: 1}),
+        'HighChol': ({7, 9}, {2: 0}),
+        'Smoker': ({7, 9}, {2: 0}),
+        'PhysActivity': ({9}, {2: 0}),
+        'Fruits': ({9}, {2: 0}),
+        'Veggies': ({9}, {2: 0}),
+        'DiffWalk': ({7, 9}, {2: 0}),
+        'Sex': ({7, 9}, {2: 0}),
+    }
+    for col, (drop_vals, rep_map) in replacements.items():
+        df = df[~df[col].isin(drop_vals)]
+        df[col] = df[col].replace(rep_map)
+    df['BMI'] = df['BMI'] / 100
+    df = df[df['Age'] != 14]
+    # Dtype hasil mengikuti aturan `dtype` di feature_map.yaml, sama seperti kernel
+    df = df.astype({col: rule['dtype'] for col, rule in kernel.items() if rule['dtype']})
+    return df.reset_index(drop=True)
+
+if __name__ == "__main__":
+    import sys
+    import time
+    import tracemalloc
+    from src.transform.transform import load_feature_mapping, read_features
+
+    # Benchmark kernel vs encode berbasis filter berurutan (setelah drop_duplicates yang sama):
+    # python -m src.transform.encoding data/raw/LLCP2015.XPT
+    feature_map_path = "src/transform/feature_map.yaml"
+    kernel = compile_encoding(load_encoding_rules(feature_map_path))
+    df, _ = read_features(sys.argv[1], load_feature_mapping(feature_map_path))
+    df = df.drop_duplicates()
+
+    results = {}
+    for name, func in [("sequential", lambda d: encode_sequential(d, kernel)),
+                       ("kernel", lambda d: apply_encoding(d, kernel))]:
+        data = df.copy()
+        started = time.perf_counter()
+        results[name] = func(data)
+        seconds = time.perf_counter() - started
+
+        data = df.copy()
+        tracemalloc.start()
+        func(data)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{name:>10}: {seconds:.3f} s, puncak alokasi {peak / (1024 * 1024):.1f} MiB")
+
+    pd.testing.assert_frame_equal(results["kernel"], results["sequential"])
+    print("Output identik")
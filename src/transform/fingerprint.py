@@ -0,0 +1,86 @@
+# src/transform/fingerprint.py
+
+import os
+import json
+import hashlib
+import pyarrow.parquet as pq
+from src.extract.cache import load_manifest
+from src.load.load import staged_source_hash
+from src.transform.schema import OUTPUT_DTYPES, diabetes_schema
+
+# Naikkan setiap kali logika transform berubah sehingga output lama harus dibuat ulang
+TRANSFORM_VERSION = "4"
+FINGERPRINT_KEY = b"brfss.fingerprint"
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def input_hash(input_path):
+    """
+    SHA-256 isi XPT sumber tanpa membaca ulang file jika sudah tercatat:
+    metadata Parquet staging, lalu manifest cache di folder yang sama, baru hash file.
+    """
+    if input_path.lower().endswith(".parquet"):
+        recorded = staged_source_hash(input_path)
+        if recorded:
+            return recorded
+    else:
+        name = os.path.basename(input_path)
+        for entry in load_manifest(os.path.dirname(input_path)).values():
+            if entry.get("path") == name and entry.get("sha256"):
+                return entry["sha256"]
+    return file_sha256(input_path)
+
+def schema_signature():
+    return {
+        "dtypes": OUTPUT_DTYPES,
+        "columns": {name: str(column.dtype) for name, column in diabetes_schema.columns.items()},
+    }
+
+def compute_fingerprint(source_sha256, feature_map_path):
+    """
+    Fingerprint output satu tahun: hash input, isi feature_map.yaml, skema output dan versi transform.
+    """
+    with open(feature_map_path, "rb") as f:
+        feature_map_sha256 = hashlib.sha256(f.read()).hexdigest()
+    payload = {
+        "input": source_sha256,
+        "feature_map": feature_map_sha256,
+        "schema": schema_signature(),
+        "version": TRANSFORM_VERSION,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def output_fingerprint(output_path):
+    """
+    Return: fingerprint yang tercatat di metadata Parquet output, atau None.
+    """
+    if not os.path.exists(output_path):
+        return None
+    metadata = pq.read_schema(output_path).metadata or {}
+    value = metadata.get(FINGERPRINT_KEY)
+    return value.decode() if value else None
+
+def plan_jobs(jobs):
+    """
+    Membandingkan fingerprint tiap job dengan output yang sudah ada.
+    Return: list dict year, action ('run' / 'skip') dan reason.
+    """
+    plan = []
+    for job in jobs:
+        recorded = output_fingerprint(job["output_path"])
+        if not os.path.exists(job["output_path"]):
+            action, reason = "run", "output belum ada"
+        elif recorded is None:
+            action, reason = "run", "output tanpa fingerprint"
+        elif recorded != job.get("fingerprint"):
+            action, reason = "run", "fingerprint berubah"
+        else:
+            action, reason = "skip", "terbaru"
+        plan.append({"year": job["year"], "action": action, "reason": reason})
+    return plan
@@ -0,0 +1,113 @@
+# src/transform/memory.py
+
+import re
+import resource
+import pyarrow.parquet as pq
+
+UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "kib": 1024, "m": 1024 ** 2, "mb": 1024 ** 2, "mib": 1024 ** 2,
+         "g": 1024 ** 3, "gb": 1024 ** 3, "gib": 1024 ** 3, "t": 1024 ** 4, "tb": 1024 ** 4, "tib": 1024 ** 4}
+MIN_CHUNK_ROWS = 10_000
+CHUNK_ROUNDING = 10_000
+# Kelas tanpa target sampel (Diabetes_01 = 1) disimpan seluruhnya: diasumsikan paling banyak 20% baris
+UNTARGETED_SHARE = 0.2
+# Byte per nilai float64 per baris chunk, termasuk salinan sementara saat decode, encode dan hashing.
+# Dikalibrasi dari puncak RSS tahap read_encode_sample pada beberapa ukuran chunk.
+COPY_FACTOR = {"xport": 2, "parquet": 6, "pyreadstat": 4}
+SAMPLE_COPY_FACTOR = 4
+
+def parse_memory(value):
+    """
+    "4GiB", "512M", "1.5g" atau jumlah byte (int) -> byte. None/"" -> None (tanpa batas).
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.fullmatch(r"\s*([\d.]+)\s*([a-zA-Z]*)\s*", str(value))
+    if not match or match.group(2).lower() not in UNITS:
+        raise ValueError(f"Format max_memory tidak dikenali: {value!r} (contoh: '4GiB', '512MB')")
+    return int(float(match.group(1)) * UNITS[match.group(2).lower()])
+
+def format_memory(size):
+    return f"{size / 1024 ** 2:.0f} MiB"
+
+def current_rss():
+    """
+    RSS proses saat ini dalam byte (VmRSS), atau puncaknya jika /proc tidak tersedia.
+    """
+    try:
+        with open("/proc/self/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def input_profile(input_path, n_columns, reader, header=None):
+    """
+    Jumlah baris dan biaya memori per baris chunk, hanya dari header/metadata input.
+    Pembacaan XPT lewat memory-map menyentuh seluruh record baris (semua kolom), sehingga
+    panjang record ikut dihitung; Parquet hanya mendekode kolom terpilih.
+    """
+    if reader == "parquet":
+        nobs = pq.ParquetFile(input_path).metadata.num_rows
+        row_bytes = n_columns * 8 * COPY_FACTOR["parquet"]
+    elif header is not None:
+        nobs = header["nobs"]
+        row_bytes = header["row_length"] + n_columns * 8 * COPY_FACTOR["xport"]
+    else:
+        import pyreadstat
+        _, meta = pyreadstat.read_xport(input_path, metadataonly=True)
+        nobs = meta.number_rows or 0
+        row_bytes = n_columns * 8 * COPY_FACTOR["pyreadstat"]
+    return {"rows": nobs, "row_bytes": row_bytes, "columns": n_columns}
+
+def _fixed_footprint(profile, target_counts):
+    # Reservoir sampel + `seen` di encode_and_sample (8 byte per baris unik, disalin saat union1d)
+    rows = profile["rows"]
+    sample_rows = sum(target for target in target_counts.values() if target) + UNTARGETED_SHARE * rows
+    return int(sample_rows * profile["columns"] * 8 * SAMPLE_COPY_FACTOR + rows * 8 * 2)
+
+def estimate_footprint(profile, chunksize, target_counts):
+    """
+    Perkiraan memori puncak transform (di atas RSS awal proses) untuk ukuran chunk tertentu
+    (None = seluruh tahun): chunk yang sedang didekode + reservoir sampel + array kunci deduplikasi.
+    """
+    chunk_rows = profile["rows"] if chunksize is None else min(chunksize, profile["rows"])
+    return int(chunk_rows * profile["row_bytes"]) + _fixed_footprint(profile, target_counts)
+
+def plan_chunksize(profile, max_memory, target_counts, chunksize=None, baseline=None):
+    """
+    Memilih ukuran chunk terbesar (kelipatan CHUNK_ROUNDING, tidak melebihi `chunksize` yang
+    dikonfigurasi) yang perkiraan puncaknya muat di `max_memory` dikurangi RSS awal proses.
+    Seluruh tahun sekaligus (chunksize None) dipertahankan jika memang muat.
+
+    Returns:
+        dict: chunksize, estimate (byte, termasuk baseline), budget, baseline, fits
+    """
+    baseline = current_rss() if baseline is None else baseline
+    available = max_memory - baseline
+    fixed = _fixed_footprint(profile, target_counts)
+    if chunksize is None and fixed + profile["rows"] * profile["row_bytes"] <= available:
+        planned = None
+    else:
+        rows = (available - fixed) // profile["row_bytes"] if available > fixed else 0
+        rows = rows // CHUNK_ROUNDING * CHUNK_ROUNDING
+        planned = max(MIN_CHUNK_ROWS, min(rows, chunksize or rows, max(profile["rows"], MIN_CHUNK_ROWS)))
+    estimate = baseline + estimate_footprint(profile, planned, target_counts)
+    return {"chunksize": planned, "estimate": estimate, "budget": max_memory, "baseline": baseline,
+            "fits": estimate <= max_memory}
+
+def plan_workers(profiles, max_memory, max_workers, target_counts, baseline=None):
+    """
+    Jumlah proses paralel terbesar (<= max_workers) sehingga tiap tahun masih muat di
+    max_memory / workers dengan chunk minimal. Return: jumlah worker (minimal 1).
+    """
+    baseline = current_rss() if baseline is None else baseline
+    for workers in range(max(max_workers, 1), 1, -1):
+        share = max_memory // workers
+        if all(plan_chunksize(profile, share, target_counts, MIN_CHUNK_ROWS, baseline)["fits"]
+               for profile in profiles):
+            return workers
+    return 1
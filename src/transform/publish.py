@@ -0,0 +1,66 @@
+# src/transform/publish.py
+
+import os
+import json
+import time
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows: hanya kunci antar-thread
+    fcntl = None
+
+# Awalan "_" membuat file ini diabaikan oleh pembaca dataset Parquet (pyarrow, DuckDB)
+DATA_MANIFEST_FILENAME = "_data_version.json"
+
+_publish_lock = threading.Lock()
+
+def data_manifest_path(processed_dir):
+    return os.path.join(processed_dir, DATA_MANIFEST_FILENAME)
+
+def load_data_manifest(processed_dir):
+    """
+    Membaca manifest versi data processed: {version, updated_at, years: {tahun: {version, fingerprint,
+    rows, size, path, updated_at}}}. `version` naik setiap kali satu tahun dipublikasikan.
+    """
+    path = data_manifest_path(processed_dir)
+    if not os.path.exists(path):
+        return {"version": 0, "years": {}}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def _save_data_manifest(processed_dir, manifest):
+    path = data_manifest_path(processed_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def publish_year(processed_dir, year, output_path, fingerprint=None, rows=None):
+    """
+    Mencatat output satu tahun di manifest versi data setelah file Parquet-nya di-rename ke tempatnya.
+    Manifest ditulis ke file sementara lalu rename, sehingga dashboard tidak pernah membaca manifest
+    setengah jadi; kunci file menjaga read-modify-write dari beberapa proses backfill sekaligus.
+
+    Returns:
+        int: versi data baru
+    """
+    os.makedirs(processed_dir, exist_ok=True)
+    with _publish_lock, open(os.path.join(processed_dir, f"{DATA_MANIFEST_FILENAME}.lock"), "w") as lock:
+        if fcntl:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        manifest = load_data_manifest(processed_dir)
+        version = manifest.get("version", 0) + 1
+        updated_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        manifest["version"] = version
+        manifest["updated_at"] = updated_at
+        manifest.setdefault("years", {})[str(year)] = {
+            "version": version,
+            "fingerprint": fingerprint,
+            "rows": rows,
+            "size": os.path.getsize(output_path),
+            "path": os.path.relpath(output_path, processed_dir),
+            "updated_at": updated_at,
+        }
+        _save_data_manifest(processed_dir, manifest)
+    return version
@@ -0,0 +1,68 @@
+# src/transform/sampling.py
+
+import numpy as np
+import pandas as pd
+
+PRIORITY_COLUMN = "_priority"
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+UINT64_MASK = (1 << 64) - 1
+
+def _splitmix64(values):
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+def row_keys(df, random_state=42):
+    """
+    Hash 64-bit ber-seed dari isi tiap baris. Dipakai sebagai kunci deduplikasi sekaligus
+    prioritas acak: nilainya hanya bergantung pada isi baris dan seed, bukan posisi atau
+    ukuran chunk. Seed dicampur lewat finalizer splitmix64 (bijektif, jadi kunci tetap unik).
+    """
+    hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    return _splitmix64(hashes + np.uint64(random_state * GOLDEN_GAMMA & UINT64_MASK))
+
+def update_reservoirs(reservoirs, chunk, priority, target_counts, label="Diabetes_01"):
+    """
+    Bottom-k sampling per kelas: tiap reservoir menyimpan `target_counts[kelas]` baris dengan
+    prioritas terkecil yang pernah dilihat. Kelas tanpa target disimpan seluruhnya.
+    """
+    chunk = chunk.assign(**{PRIORITY_COLUMN: priority})
+    for value, group in chunk.groupby(label, sort=False):
+        kept = pd.concat([reservoirs[value], group]) if value in reservoirs else group
+        target = target_counts.get(value)
+        if target is not None and len(kept) > target:
+            kept = kept.nsmallest(target, PRIORITY_COLUMN, keep="first")
+        reservoirs[value] = kept
+    return reservoirs
+
+def check_sample_counts(counts, target_counts, label="Diabetes_01"):
+    """
+    Seperti DataFrame.sample(n=...), kelas yang barisnya kurang dari target menimbulkan ValueError.
+    `counts`: jumlah baris tersampel per kelas.
+    """
+    for value, target in target_counts.items():
+        available = counts.get(value, 0)
+        if target is not None and available < target:
+            raise ValueError(f"Kelas {label}={value}: hanya {available} baris, target sampel {target}")
+
+def finalize_reservoirs(reservoirs, target_counts, label="Diabetes_01"):
+    """
+    Menggabungkan reservoir (urut kelas lalu prioritas) menjadi satu DataFrame.
+    """
+    check_sample_counts({value: len(kept) for value, kept in reservoirs.items()}, target_counts, label)
+    if not reservoirs:
+        return pd.DataFrame()
+    sampled = [reservoirs[value].sort_values(PRIORITY_COLUMN, kind="stable") for value in sorted(reservoirs)]
+    return pd.concat(sampled, ignore_index=True).drop(columns=PRIORITY_COLUMN)
+
+def stratified_sample(chunks, target_counts, label="Diabetes_01", random_state=42):
+    """
+    Undersampling satu lintasan atas aliran chunk DataFrame. Hasilnya deterministik untuk
+    seed yang sama dan identik berapa pun ukuran chunk-nya.
+    """
+    reservoirs = {}
+    for chunk in chunks:
+        update_reservoirs(reservoirs, chunk, row_keys(chunk, random_state), target_counts, label)
+    return finalize_reservoirs(reservoirs, target_counts, label)
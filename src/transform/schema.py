@@ -1,27 +1,47 @@
 import pandera.pandas as pa
 from pandera.pandas import Column, DataFrameSchema
 from pandera import Check
+from src.transform.dedup import has_duplicates
+
+# Tipe kolom output Parquet: int8 untuk kode kecil, float32 untuk BMI hasil standarisasi
+OUTPUT_DTYPES = {
+    "Diabetes_01": "int8",
+    "HighBP": "int8",
+    "HighChol": "int8",
+    "BMI": "float32",
+    "Smoker": "int8",
+    "PhysActivity": "int8",
+    "Fruits": "int8",
+    "Veggies": "int8",
+    "DiffWalk": "int8",
+    "Sex": "int8",
+    "Age": "int8",
+}
 
 def check_no_duplicate_rows(df):
-    return not df.duplicated().any()
+    return not has_duplicates(df)
 
 diabetes_schema = DataFrameSchema({
-    "Diabetes_01": Column(int, Check.isin([0, 1])),
-    "HighBP": Column(int, Check.isin([0, 1])),
-    "HighChol": Column(int, Check.isin([0, 1])),
+    "Diabetes_01": Column("int8", Check.isin([0, 1])),
+    "HighBP": Column("int8", Check.isin([0, 1])),
+    "HighChol": Column("int8", Check.isin([0, 1])),
     "BMI": Column(
-        float,
+        "float32",
         checks=[
-            Check(lambda x: x.mean() >= -0.1 and x.mean() <= 0.1, error="Mean BMI not approx 0"),
-            Check(lambda x: x.std() >= 0.9 and x.std() <= 1.1, error="Std BMI not approx 1"),
+            # name + statistics memungkinkan validator terkompilasi (validation.py) menghitung ulang
+            # cek momen ini tanpa memanggil lambda
+            Check(lambda x: x.mean() >= -0.1 and x.mean() <= 0.1, name="mean_in_range",
+                  statistics={"min_value": -0.1, "max_value": 0.1}, error="Mean BMI not approx 0"),
+            Check(lambda x: x.std() >= 0.9 and x.std() <= 1.1, name="std_in_range",
+                  statistics={"min_value": 0.9, "max_value": 1.1}, error="Std BMI not approx 1"),
             Check.in_range(-5, 5)
         ]
     ),
-    "Smoker": Column(int, Check.isin([0, 1])),
-    "PhysActivity": Column(int, Check.isin([0, 1])),
-    "Fruits": Column(int, Check.isin([0, 1])),
-    "Veggies": Column(int, Check.isin([0, 1])),
-    "DiffWalk": Column(int, Check.isin([0, 1])),
-    "Sex": Column(int, Check.isin([0, 1])),
-    "Age": Column(int, Check.ge(0))
+    "Smoker": Column("int8", Check.isin([0, 1])),
+    "PhysActivity": Column("int8", Check.isin([0, 1])),
+    "Fruits": Column("int8", Check.isin([0, 1])),
+    "Veggies": Column("int8", Check.isin([0, 1])),
+    "DiffWalk": Column("int8", Check.isin([0, 1])),
+    "Sex": Column("int8", Check.isin([0, 1])),
+    "Age": Column("int8", Check.ge(0))
 }, checks=[Check(check_no_duplicate_rows, error="Duplicate rows found!")])
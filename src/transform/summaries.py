@@ -0,0 +1,109 @@
+# src/transform/summaries.py
+
+import numpy as np
+import pandas as pd
+from scipy import optimize, special
+
+def value_counts(values):
+    """
+    Ringkasan yang bisa digabung (mergeable): jumlah kemunculan tiap nilai, terurut.
+    BMI hanya punya dua desimal sehingga jumlah nilai uniknya kecil, dan ringkasan ini
+    memberi kuantil, momen dan lambda Box-Cox yang persis sama dengan data lengkapnya.
+    """
+    return pd.Series(values).dropna().value_counts().sort_index()
+
+def merge_counts(*counts):
+    merged = pd.concat(counts).groupby(level=0).sum()
+    return merged.sort_index()
+
+def map_counts(counts, func):
+    """
+    Menerapkan fungsi nilai-ke-nilai pada ringkasan (mis. clip atau Box-Cox) lalu menggabung
+    nilai yang menjadi sama.
+    """
+    mapped = pd.Series(counts.to_numpy(), index=func(counts.index.to_numpy(dtype=float)))
+    return mapped.groupby(level=0).sum().sort_index()
+
+def quantile(counts, q):
+    """
+    Kuantil interpolasi linear (seperti Series.quantile) dari ringkasan value_counts.
+    `q` boleh berupa list; semua kuantil diambil dari satu cumsum.
+    """
+    values = counts.index.to_numpy(dtype=float)
+    cumulative = np.cumsum(counts.to_numpy())
+    position = (cumulative[-1] - 1) * np.asarray(q, dtype=float)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, cumulative[-1] - 1)
+    a = values[np.searchsorted(cumulative, lower, side="right")]
+    b = values[np.searchsorted(cumulative, upper, side="right")]
+    t = position - lower
+    result = np.where(t < 0.5, a + (b - a) * t, b - (b - a) * (1 - t))
+    return result.tolist() if result.ndim else float(result)
+
+def moments(counts):
+    """
+    Return: dict n, mean, std (ddof=0, seperti StandardScaler) dan skew (bias, seperti scipy.stats.skew).
+    """
+    values = counts.index.to_numpy(dtype=float)
+    weights = counts.to_numpy(dtype=float)
+    n = weights.sum()
+    mean = (values * weights).sum() / n
+    centered = values - mean
+    m2 = (weights * centered ** 2).sum() / n
+    m3 = (weights * centered ** 3).sum() / n
+    return {
+        "n": int(n),
+        "mean": mean,
+        "std": np.sqrt(m2),
+        "skew": m3 / m2 ** 1.5 if m2 > 0 else 0.0,
+    }
+
+def boxcox_lambda(counts):
+    """
+    Lambda Box-Cox MLE (brent, bracket (-2, 2), seperti scipy.stats.boxcox) dari ringkasan.
+    """
+    values = counts.index.to_numpy(dtype=float)
+    weights = counts.to_numpy(dtype=float)
+    n = weights.sum()
+    log_sum = (weights * np.log(values)).sum()
+
+    def negative_llf(lmbda):
+        transformed = special.boxcox(values, lmbda)
+        mean = (weights * transformed).sum() / n
+        variance = (weights * (transformed - mean) ** 2).sum() / n
+        return -((lmbda - 1) * log_sum - n / 2 * np.log(variance))
+
+    return optimize.brent(negative_llf, brack=(-2.0, 2.0))
+
+def fit_numeric_params(counts, skew_threshold=0.75):
+    """
+    Menghitung parameter clipping IQR, Box-Cox dan standarisasi dari ringkasan, dengan urutan
+    clipping Q1/Q3 +- 1.5 IQR -> Box-Cox jika |skew| > skew_threshold -> standarisasi (ddof=0).
+    Semua nilai berupa float Python sehingga bisa langsung disimpan sebagai JSON.
+    """
+    q1, q3 = quantile(counts, [0.25, 0.75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    counts = map_counts(counts, lambda x: np.clip(x, low, high))
+
+    params = {"iqr_bounds": [low, high], "skew": float(moments(counts)["skew"]), "boxcox": None}
+    if abs(params["skew"]) > skew_threshold:
+        lmbda = float(boxcox_lambda(counts))
+        counts = map_counts(counts, lambda x: special.boxcox(x, lmbda))
+        stats = moments(counts)
+        params["boxcox"] = {"lambda": lmbda, "mean": float(stats["mean"]), "std": float(stats["std"] or 1.0)}
+        counts = map_counts(counts, lambda x: (x - stats["mean"]) / (stats["std"] or 1.0))
+
+    stats = moments(counts)
+    params["scaler"] = {"mean": float(stats["mean"]), "std": float(stats["std"] or 1.0)}
+    return params
+
+def apply_numeric_params(values, params):
+    """
+    Menerapkan parameter dari fit_numeric_params pada sebuah Series.
+    """
+    low, high = params["iqr_bounds"]
+    values = values.clip(low, high)
+    if params["boxcox"]:
+        boxcox = params["boxcox"]
+        values = (special.boxcox(values, boxcox["lambda"]) - boxcox["mean"]) / boxcox["std"]
+    return (values - params["scaler"]["mean"]) / params["scaler"]["std"]
@@ -1,172 +1,560 @@
 import os
+import json
+import logging
 import yaml
 import pandas as pd
 import numpy as np
 import re
-import pandera.pandas as pa
+import pyreadstat
+import pyarrow
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from glob import glob
-from sklearn.preprocessing import MinMaxScaler, StandardScaler, PowerTransformer
-from src.transform.schema import diabetes_schema
+from src.flow.instrumentation import (DEFAULT_METRICS_PATH, LOCAL_RUN_ID, StageProfiler, publish_metrics,
+                                     write_metrics)
+from src.flow.metrics_store import DEFAULT_METRICS_DB, record_metrics
+from src.transform.aggregates import aggregates_path_for, compute_aggregates, save_aggregates
+from src.transform.publish import publish_year
+from src.transform.memory import format_memory, input_profile, parse_memory, plan_chunksize, plan_workers
+from src.transform.fingerprint import FINGERPRINT_KEY, TRANSFORM_VERSION, compute_fingerprint, input_hash, plan_jobs
+from src.transform.dedup import drop_duplicates
+from src.transform.duckdb_engine import encode_and_sample_duckdb
+from src.transform.encoding import apply_encoding, compile_encoding, load_encoding_rules
+from src.transform.sampling import finalize_reservoirs, row_keys, update_reservoirs
+from src.transform.schema import OUTPUT_DTYPES
+from src.transform.summaries import apply_numeric_params, fit_numeric_params, value_counts
+from src.transform.validation import validate_dataset
+from src.transform.xport import read_xport, read_xport_header
 from prefect import task, get_run_logger
-from scipy.stats import skew
+from prefect.exceptions import MissingContextError
+
+def get_logger():
+    """
+    Logger Prefect jika berjalan di dalam flow/task run, selain itu logger biasa
+    (mis. di worker ProcessPoolExecutor atau saat modul dijalankan langsung).
+    """
+    try:
+        return get_run_logger()
+    except MissingContextError:
+        return logging.getLogger("brfss.transform")
+
+def append_log(log_path, message):
+    """
+    Menambahkan pesan ke file log dengan satu write() ber-O_APPEND, sehingga baris dari
+    beberapa proses transform paralel tidak saling menimpa atau tercampur.
+    """
+    fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, message.encode("utf-8"))
+    finally:
+        os.close(fd)
 
 def load_feature_mapping(config_path):
     with open(config_path, 'r') as f:
         config = yaml.safe_load(f)
     return config['standard_features']
 
-def select_and_rename_columns(df, feature_map):
-    rename_dict, selected_cols = {}, []
+def resolve_feature_columns(columns, feature_map):
+    rename_dict = {}
     for std_col, possible_names in feature_map.items():
         for name in possible_names:
-            if name in df.columns:
+            if name in columns:
                 rename_dict[name] = std_col
-                selected_cols.append(name)
                 break
     missing = set(feature_map.keys()) - set(rename_dict.values())
-    df_selected = df[selected_cols].rename(columns=rename_dict)
-    return df_selected, missing
-
-def encode(df):
-    df = df.drop_duplicates().dropna()
-    df = df[df['Diabetes_01'].isin([1, 2, 3, 4])]
-    df['Diabetes_01'] = df['Diabetes_01'].replace({1: 1, 2: 0, 3: 0, 4: 0})
-
-    replacements = {
-        'HighBP': ({9}, {1: 0, 2: 1}),
-        'HighChol': ({7,9}, {2: 0}),
-        'Smoker': ({7,9}, {2: 0}),
-        'PhysActivity': ({9}, {2: 0}),
-        'Fruits': ({9}, {2: 0}),
-        'Veggies': ({9}, {2: 0}),
-        'DiffWalk': ({7,9}, {2: 0}),
-        'Sex': ({7,9}, {2: 0}),
-    }
-
-    for col, (drop_vals, rep_map) in replacements.items():
-        if drop_vals:
-            df = df[~df[col].isin(drop_vals)]
-        df[col] = df[col].replace(rep_map)
-
-    df['BMI'] = df['BMI'] / 100
-    df = df[df['Age'] != 14]
-
-    int_cols = ['Diabetes_01', 'HighBP', 'HighChol', 'Smoker', 'PhysActivity',
-                'Fruits', 'Veggies', 'DiffWalk', 'Sex', 'Age']
-    df[int_cols] = df[int_cols].astype(int)
-    return df.reset_index(drop=True)
-
-def undersampling(df, target_counts, label='Diabetes_01', random_state=42):
-    sampled = [g.sample(n=target_counts.get(v, len(g)), random_state=random_state)
-               for v, g in df.groupby(label)]
-    return pd.concat(sampled, ignore_index=True)
-
-def compute_iqr_bounds(df, columns):
-    return {
-        col: (
-            df[col].quantile(0.25) - 1.5 * (df[col].quantile(0.75) - df[col].quantile(0.25)),
-            df[col].quantile(0.75) + 1.5 * (df[col].quantile(0.75) - df[col].quantile(0.25))
-        ) for col in columns
-    }
-
-def apply_iqr_clipping(df, columns, bounds):
-    for col, (low, high) in bounds.items():
-        df[col] = df[col].clip(low, high)
-    return df
-
-def scale_features(df, columns, method='minmax'):
-    scaler = MinMaxScaler() if method == 'minmax' else StandardScaler()
-    df[columns] = scaler.fit_transform(df[columns])
-    return df
-
-def transform_numerical_features(df, columns, method, skew_threshold=0.75):
-    # Cek skewness untuk setiap kolom
-    for column in columns:
-        column_skew = skew(df[column].dropna())
-        
-        # Jika skewness lebih besar dari threshold, lakukan transformasi
-        if abs(column_skew) > skew_threshold:
-            print(f"Skewness untuk kolom {column}: {column_skew}. Melakukan transformasi...")
-
-            if method == 'log':
-                df[column] = np.log(df[column] + 1)  # Menambahkan 1 untuk menghindari log(0)
-            
-            elif method in ['box-cox', 'yeo-johnson']:
-                transformer = PowerTransformer(method=method)
-                df[column] = transformer.fit_transform(df[[column]])
-            
-            else:
-                raise ValueError("Metode tidak dikenali. Pilih antara 'log', 'box-cox', atau 'yeo-johnson'.")
-        else:
-            print(f"Skewness untuk kolom {column}: {column_skew}. Tidak melakukan transformasi.")
-    
-    return df
+    return rename_dict, missing
+
+def _resolve_reader(input_path, feature_map, reader):
+    if input_path.lower().endswith('.parquet'):
+        columns = set(pq.read_schema(input_path).names)
+        return 'parquet', None, *resolve_feature_columns(columns, feature_map)
+    if reader == 'xport':
+        try:
+            header = read_xport_header(input_path)
+            columns = {column['name'] for column in header['columns']}
+            return reader, header, *resolve_feature_columns(columns, feature_map)
+        except ValueError:
+            reader = 'pyreadstat'
+    _, meta = pyreadstat.read_xport(input_path, metadataonly=True)
+    return reader, None, *resolve_feature_columns(set(meta.column_names), feature_map)
+
+def read_features(input_path, feature_map, reader='xport'):
+    """
+    Membaca header XPT, mencocokkan alias di feature_map, lalu hanya mendekode kolom itu.
+    reader='xport' memakai decoder NumPy memory-mapped (src/transform/xport.py) dan kembali
+    ke pyreadstat untuk file yang bukan XPORT v5; reader='pyreadstat' memaksa pyreadstat.
+    File .parquet (staging) selalu dibaca langsung per kolom.
+    Return: (df dengan nama kolom standar, fitur yang hilang). df bernilai None jika ada
+    fitur yang hilang, karena datanya tidak akan dipakai.
+    """
+    reader, header, rename_dict, missing = _resolve_reader(input_path, feature_map, reader)
+    if missing:
+        return None, missing
+
+    if reader == 'parquet':
+        df = pd.read_parquet(input_path, columns=list(rename_dict))
+    elif reader == 'xport':
+        df = read_xport(input_path, columns=list(rename_dict), header=header)
+    else:
+        df, _ = pyreadstat.read_xport(input_path, usecols=list(rename_dict))
+    return df[list(rename_dict)].rename(columns=rename_dict), missing
+
+def iter_features(input_path, feature_map, chunksize, reader='xport'):
+    """
+    Seperti read_features, tetapi mengembalikan generator chunk berisi `chunksize` baris.
+    """
+    reader, header, rename_dict, missing = _resolve_reader(input_path, feature_map, reader)
+    if missing:
+        return None, missing
+
+    if reader == 'parquet':
+        batches = pq.ParquetFile(input_path).iter_batches(batch_size=chunksize, columns=list(rename_dict))
+        chunks = (batch.to_pandas() for batch in batches)
+    elif reader == 'xport':
+        chunks = (read_xport(input_path, list(rename_dict), start, start + chunksize, header=header)
+                  for start in range(0, header['nobs'], chunksize))
+    else:
+        chunks = (chunk for chunk, _ in pyreadstat.read_file_in_chunks(
+            pyreadstat.read_xport, input_path, chunksize=chunksize, usecols=list(rename_dict)))
+    return (chunk[list(rename_dict)].rename(columns=rename_dict) for chunk in chunks), missing
+
+DEFAULT_FEATURE_MAP_PATH = Path(__file__).parent / 'feature_map.yaml'
+
+@lru_cache(maxsize=None)
+def default_encoding_kernel():
+    return compile_encoding(load_encoding_rules(DEFAULT_FEATURE_MAP_PATH))
+
+def encode(df, kernel=None):
+    """
+    Deduplikasi lalu encoding lewat kernel hasil kompilasi aturan `encoding` di feature_map.yaml.
+    """
+    return apply_encoding(drop_duplicates(df), kernel or default_encoding_kernel())
+
+def encode_and_sample(chunks, target_counts, kernel=None, label='Diabetes_01', random_state=42, counts=None):
+    """
+    Satu lintasan atas chunk mentah: encode, deduplikasi global, lalu undersampling lewat
+    reservoir per kelas, sehingga data bersih satu tahun penuh tidak pernah ada di memori.
+    Kode mentah Diabetes_01 ikut dibawa sementara karena 2/3/4 sama-sama menjadi 0, sedangkan
+    encode() mendeduplikasi nilai mentah. Hash baris (ber-seed) menjadi kunci deduplikasi dan
+    prioritas sampel, sehingga hasilnya sama untuk satu DataFrame utuh maupun per chunk.
+    counts (dict, optional): diisi rows_encoded, jumlah baris unik setelah encode.
+    """
+    reservoirs, seen = {}, np.empty(0, dtype=np.uint64)
+    for chunk in chunks:
+        encoded = encode(chunk.assign(_raw_label=chunk[label]), kernel)
+        keys = row_keys(encoded, random_state)
+        # `seen`: array kunci terurut (8 byte per baris unik), dicek lewat searchsorted
+        position = np.minimum(np.searchsorted(seen, keys), max(len(seen) - 1, 0))
+        known = seen[position] == keys if len(seen) else np.zeros(len(keys), dtype=bool)
+        fresh = ~pd.Index(keys).duplicated() & ~known
+        seen = np.union1d(seen, keys[fresh])
+        update_reservoirs(reservoirs, encoded[fresh].drop(columns='_raw_label'), keys[fresh],
+                          target_counts, label)
+    if counts is not None:
+        counts["rows_encoded"] = len(seen)
+    return finalize_reservoirs(reservoirs, target_counts, label)
+
+PROCESSED_FILENAME = "diabetes_01_health_indicators.parquet"
+SORT_COLUMNS = ["Diabetes_01", "Age"]
+ROW_GROUP_SIZE = 65_536
+
+def output_path_for(processed_dir, year):
+    """
+    Lokasi output satu tahun di dataset ber-partisi Hive: processed_dir/Year=<tahun>/<file>.
+    """
+    return os.path.join(processed_dir, f"Year={year}", PROCESSED_FILENAME)
+
+def params_path_for(output_path):
+    # Awalan "_" membuat file ini diabaikan oleh pembaca dataset Parquet (pyarrow, DuckDB)
+    directory, filename = os.path.split(output_path)
+    return os.path.join(directory, f"_{os.path.splitext(filename)[0]}.params.json")
+
+def save_params(params_path, params, year):
+    """
+    Menyimpan parameter hasil fit (IQR, Box-Cox, scaler per kolom) di samping file Parquet,
+    ditulis ke file sementara lalu rename.
+    """
+    artifact = {"year": str(year), "transform_version": TRANSFORM_VERSION, "columns": params}
+    tmp_path = f"{params_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(artifact, f, indent=2)
+    os.replace(tmp_path, params_path)
+
+def load_params(params_path):
+    """
+    Return: dict kolom -> parameter dari artifact save_params.
+    """
+    if not os.path.exists(params_path):
+        raise FileNotFoundError(f"Artifact parameter tidak ditemukan: {params_path}")
+    with open(params_path, "r") as f:
+        return json.load(f)["columns"]
+
+def write_output(df, output_path, fingerprint=None):
+    """
+    Menulis Parquet output ke file sementara lalu rename, dengan fingerprint di metadata,
+    sehingga output setengah jadi tidak pernah dianggap terbaru.
+    Baris diurutkan menurut SORT_COLUMNS dan dipecah per ROW_GROUP_SIZE dengan statistik kolom
+    dan page index, sehingga filter Diabetes_01/Age bisa melewati row group dan page (predicate
+    pushdown). Semua kolom (termasuk BMI, yang nilai uniknya sedikit) memakai dictionary encoding
+    dan zstd.
+    """
+    df = df.sort_values(SORT_COLUMNS, kind="stable", ignore_index=True)
+    table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    if fingerprint:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}),
+                                               FINGERPRINT_KEY: fingerprint.encode()})
+    directory, filename = os.path.split(output_path)
+    tmp_path = os.path.join(directory, f".{filename}.tmp")
+    pq.write_table(
+        table, tmp_path,
+        compression="zstd",
+        row_group_size=ROW_GROUP_SIZE,
+        use_dictionary=True,
+        write_statistics=True,
+        write_page_index=True,
+        sorting_columns=pq.SortingColumn.from_ordering(table.schema, [(c, "ascending") for c in SORT_COLUMNS]),
+    )
+    os.replace(tmp_path, output_path)
+
+# 70.000 sampel kelas 0; kelas 1 (tanpa target) disimpan seluruhnya
+DEFAULT_TARGET_COUNTS = {0: 70000}
+
+def _plan_memory(profiler, input_path, feature_map, reader, max_memory, target_counts, chunksize, year):
+    """
+    Perkiraan footprint dari header input (baris x kolom terpilih) -> ukuran chunk yang muat di
+    max_memory. Return: (chunksize, memory_limit DuckDB).
+    """
+    logger = get_logger()
+    resolved, header, rename_dict, missing = _resolve_reader(input_path, feature_map, reader)
+    if missing:
+        return chunksize, None
+    plan = plan_chunksize(input_profile(input_path, len(rename_dict), resolved, header), max_memory,
+                          target_counts, chunksize)
+    profiler.annotate(memory_plan={**plan, "configured_chunksize": chunksize})
+    message = (f"🧮 BRFSS{year}: batas {format_memory(max_memory)}, perkiraan puncak {format_memory(plan['estimate'])}, "
+               f"chunk {plan['chunksize'] or 'seluruh tahun'}")
+    if plan["fits"]:
+        logger.info(message)
+    else:
+        logger.warning(f"{message} (melebihi batas bahkan dengan chunk minimum)")
+    # DuckDB mengelola memorinya sendiri (spill ke disk): beri sisa anggaran setelah RSS proses
+    return plan["chunksize"], f"{max(max_memory - plan['baseline'], 64 * 1024 ** 2) // 1024 ** 2}MB"
+
+def _count_rows(chunks, stage):
+    # Menghitung baris mentah yang lewat tanpa mematerialisasi aliran chunk
+    stage["rows_in"] = 0
+    for chunk in chunks:
+        stage["rows_in"] += len(chunk)
+        yield chunk
 
 @task
-def transform_dataset(input_path, feature_map_path, output_path, year, log_file_path):
-    logger = get_run_logger()
-    df = pd.read_sas(input_path)
+def transform_dataset(input_path, feature_map_path, output_path, year, log_file_path, reader='xport',
+                      chunksize=None, fingerprint=None, apply_params=False, validation='compiled',
+                      validation_sample=None, engine='pandas', metrics_path=DEFAULT_METRICS_PATH,
+                      target_counts=None, max_memory=None, metrics_db=DEFAULT_METRICS_DB, run_id=None):
+    """
+    Transform satu tahun. Setiap tahap diukur (wall/CPU time, kenaikan puncak RSS, baris
+    masuk/keluar); record-nya ditulis sebagai satu baris JSON ke metrics_path, disimpan di store
+    SQLite metrics_db (per run_id, default flow run Prefect), dipublikasikan sebagai table
+    artifact Prefect, dan dikembalikan.
+    target_counts: target undersampling per kelas (default DEFAULT_TARGET_COUNTS).
+    max_memory: batas memori proses ("4GiB", byte); ukuran chunk dipilih dari perkiraan
+    footprint berdasarkan header input, dan puncak RSS yang tercapai dicatat di record.
+    """
+    profiler = StageProfiler("transform", year, run_id)
+    budget = parse_memory(max_memory)
+    try:
+        _transform_stages(profiler, input_path, feature_map_path, output_path, year, log_file_path, reader,
+                          chunksize, fingerprint, apply_params, validation, validation_sample, engine,
+                          target_counts or DEFAULT_TARGET_COUNTS, budget)
+    except Exception:
+        profiler.status = "error"
+        raise
+    finally:
+        record = profiler.to_record()
+        # Puncak RSS yang tumpang tindih dengan extract di thread lain bukan milik tahun ini
+        if budget and not record["rss_unreliable"]:
+            record["over_budget"] = record["peak_rss_mb"] * 1024 ** 2 > budget
+            if record["over_budget"]:
+                get_logger().warning(f"⚠️ BRFSS{year}: puncak RSS {record['peak_rss_mb']:.0f} MiB melebihi "
+                                     f"max_memory {format_memory(budget)}")
+        write_metrics(record, metrics_path)
+        record_metrics(record, metrics_db)
+        publish_metrics([record], key=f"transform-stages-{year}")
+    return record
+
+def _transform_stages(profiler, input_path, feature_map_path, output_path, year, log_file_path, reader,
+                      chunksize, fingerprint, apply_params, validation, validation_sample, engine, target_counts,
+                      budget):
+    logger = get_logger()
     feature_map = load_feature_mapping(feature_map_path)
+    kernel = compile_encoding(load_encoding_rules(feature_map_path))
 
-    df, missing_features = select_and_rename_columns(df, feature_map)
+    memory_limit = None
+    if budget:
+        chunksize, memory_limit = _plan_memory(profiler, input_path, feature_map, reader, budget,
+                                               target_counts, chunksize, year)
+
+    if engine == 'duckdb':
+        # Encode, deduplikasi dan sampling sebagai SQL DuckDB; hanya sampel yang kembali ke pandas
+        with profiler.stage("duckdb_encode_sample") as stage:
+            df, missing_features = encode_and_sample_duckdb(input_path, feature_map, target_counts, kernel,
+                                                            reader=reader, chunksize=chunksize or 250_000,
+                                                            memory_limit=memory_limit, counts=stage)
+            stage["rows_out"] = None if df is None else len(df)
+            if df is not None:
+                # Baris mentah tidak kembali dari DuckDB: diambil dari header/metadata input
+                resolved, header, rename_dict, _ = _resolve_reader(input_path, feature_map, reader)
+                stage["rows_in"] = input_profile(input_path, len(rename_dict), resolved, header)["rows"]
+    elif chunksize:
+        chunks, missing_features = iter_features(input_path, feature_map, chunksize, reader=reader)
+    else:
+        with profiler.stage("read") as stage:
+            df, missing_features = read_features(input_path, feature_map, reader=reader)
+            stage["rows_out"] = None if df is None else len(df)
+        chunks = [df]
 
     if missing_features:
+        profiler.status = "missing_features"
         msg = f"❌ Fitur tidak lengkap untuk {year}: {sorted(list(missing_features))}"
-        with open(log_file_path, 'a') as log_file:
-            log_file.write(f"{msg}\n")
+        append_log(log_file_path, f"{msg}\n")
         logger.error(msg)
         return
     else:
-        with open(log_file_path, 'a') as log_file:
-            log_file.write(f"BRFSS{year}: fitur lengkap\n")
-
-    df = encode(df)
-
-    target_counts = {0.0: 70000, 1.0: df['Diabetes_01'].value_counts().get(1.0, 0)}
-    df = undersampling(df, target_counts)
-
-    bounds = compute_iqr_bounds(df, ['BMI'])
-    df = apply_iqr_clipping(df, ['BMI'], bounds)
+        append_log(log_file_path, f"BRFSS{year}: fitur lengkap\n")
 
-    df = transform_numerical_features(df, ['BMI'], method='box-cox')
+    if engine != 'duckdb':
+        # Pada mode chunk, pembacaan XPT/Parquet terjadi di dalam tahap ini
+        with profiler.stage("read_encode_sample" if chunksize else "encode_sample") as stage:
+            df = encode_and_sample(_count_rows(chunks, stage), target_counts=target_counts, kernel=kernel,
+                                   counts=stage)
+            stage["rows_out"] = len(df)
 
-    df = scale_features(df, ['BMI'], method='standard')
+    params_path = params_path_for(output_path)
+    with profiler.stage("fit_params", rows_in=len(df)) as stage:
+        if apply_params:
+            # Apply-only: pakai ulang parameter yang sudah tersimpan, tanpa optimasi lambda
+            params = load_params(params_path)
+            logger.info(f"♻️ Memakai parameter tersimpan: {params_path}")
+        else:
+            # Fit dari ringkasan value_counts: satu lintasan kuantil, lambda Box-Cox dan momen
+            params = {"BMI": fit_numeric_params(value_counts(df['BMI']))}
+            print(f"Skewness untuk kolom BMI: {params['BMI']['skew']}. "
+                  f"{'Melakukan transformasi...' if params['BMI']['boxcox'] else 'Tidak melakukan transformasi.'}")
+        stage["rows_out"] = len(df)
+    with profiler.stage("apply_params", rows_in=len(df)) as stage:
+        for column, column_params in params.items():
+            df[column] = apply_numeric_params(df[column], column_params)
+        stage["rows_out"] = len(df)
 
-    df = df.drop_duplicates()
+    # Cast dulu: BMI float64 yang berbeda bisa menjadi float32 yang sama
+    with profiler.stage("cast_dedup", rows_in=len(df)) as stage:
+        df = drop_duplicates(df.astype(OUTPUT_DTYPES))
+        stage["rows_out"] = len(df)
 
-    try:
-        diabetes_schema.validate(df, lazy=True)
-        logger.info(f"✅ Validasi sukses: BRFSS{year}")
-    except pa.errors.SchemaErrors as err:
+    with profiler.stage("validate", rows_in=len(df)) as stage:
+        failure_cases = validate_dataset(df, method=validation, sample=validation_sample)
+        stage["rows_out"] = len(df)
+    profiler.annotate(validation_failures=len(failure_cases))
+    if len(failure_cases):
+        profiler.status = "validation_failed"
         validation_log = os.path.join("logs", "validation_summary.log")
-        with open(validation_log, "a") as f:
-            f.write(f"[GAGAL] BRFSS{year} - {output_path}:\n{err.failure_cases.to_string(index=False)}\n\n")
+        append_log(validation_log,
+                   f"[GAGAL] BRFSS{year} - {output_path}:\n{failure_cases.to_string(index=False)}\n\n")
         logger.error(f"❌ Validasi Pandera gagal untuk {year}")
         return
+    logger.info(f"✅ Validasi sukses: BRFSS{year}")
+
+    with profiler.stage("write", rows_in=len(df)) as stage:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        write_output(df, output_path, fingerprint)
+        if not apply_params:
+            save_params(params_path, params, year)
+        stage["rows_out"] = len(df)
+        stage["bytes_out"] = os.path.getsize(output_path)
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    df.to_parquet(output_path, index=False)
+    # Agregat dashboard (value counts, momen/histogram/KDE BMI, korelasi) ditulis sebelum
+    # tahun ini dipublikasikan, sehingga dashboard tidak perlu membaca baris survei
+    with profiler.stage("aggregates", rows_in=len(df)) as aggregates_stage:
+        save_aggregates(aggregates_path_for(output_path), compute_aggregates(df, year, stage["bytes_out"]))
+        aggregates_stage["rows_out"] = len(df)
+    partition_dir = os.path.dirname(output_path)
+    if os.path.basename(partition_dir).startswith("Year="):
+        data_version = publish_year(os.path.dirname(partition_dir), year, output_path, fingerprint, len(df))
+        profiler.annotate(data_version=data_version)
     logger.info(f"📁 Disimpan: {output_path}")
 
+def _run_transform_job(job):
+    return transform_dataset.fn(**job)
+
+def _plan_parallelism(jobs, max_workers, max_memory):
+    """
+    Mengurangi jumlah proses paralel sampai tiap tahun muat di max_memory / workers,
+    lalu membagikan anggaran per proses ke tiap job.
+    """
+    logger = get_logger()
+    profiles = []
+    for job in jobs:
+        feature_map = load_feature_mapping(job["feature_map_path"])
+        reader, header, rename_dict, missing = _resolve_reader(job["input_path"], feature_map,
+                                                               job.get("reader", "xport"))
+        if not missing:
+            profiles.append(input_profile(job["input_path"], len(rename_dict), reader, header))
+    workers = plan_workers(profiles, max_memory, max_workers, DEFAULT_TARGET_COUNTS)
+    if workers < max_workers:
+        logger.warning(f"🧮 max_memory {format_memory(max_memory)}: proses paralel dikurangi "
+                       f"{max_workers} -> {workers}")
+    share = max_memory // workers
+    return [{**job, "max_memory": share} for job in jobs], workers
+
+def run_transform_jobs(jobs, max_workers=1, max_memory=None):
+    """
+    Menjalankan transform_dataset untuk banyak tahun. Dengan max_workers > 1 tiap tahun
+    dikerjakan di proses terpisah (ProcessPoolExecutor); tiap tahun independen dan
+    random_state tetap, sehingga output sama dengan eksekusi serial.
+
+    Args:
+        jobs (list): List dict argumen transform_dataset
+        max_workers (int): Jumlah proses paralel
+        max_memory (str/int, optional): Batas memori total; jumlah proses dan ukuran chunk
+            tiap tahun dipilih agar perkiraan puncaknya muat
+
+    Returns:
+        dict: tahun -> pesan error (None jika sukses)
+    """
+    logger = get_logger()
+    max_memory = parse_memory(max_memory)
+    if max_memory and jobs:
+        jobs, max_workers = _plan_parallelism(jobs, max_workers, max_memory)
+    results = {}
+    if max_workers <= 1:
+        for job in jobs:
+            try:
+                _run_transform_job(job)
+                results[job["year"]] = None
+            except Exception as e:
+                results[job["year"]] = str(e)
+    else:
+        records = []
+        # Bukan ProcessPoolTaskRunner Prefect 3: runner itu berlaku untuk seluruh flow (juga extract
+        # yang di-prefetch di thread), tidak tersedia di CLI tanpa flow, dan jumlah prosesnya tetap,
+        # sedangkan di sini jumlah proses dipilih saat run dari max_memory (_plan_parallelism)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_run_transform_job, job): job for job in jobs}
+            for future in as_completed(futures):
+                year = futures[future]["year"]
+                try:
+                    records.append(future.result())
+                    results[year] = None
+                except Exception as e:
+                    results[year] = str(e)
+        # Worker tidak punya konteks run Prefect: artifact dibuat di proses induk
+        publish_metrics(sorted(records, key=lambda record: record["year"]), key="transform-stages-backfill")
+
+    for job in jobs:
+        error = results[job["year"]]
+        if error is not None:
+            logger.error(f"[{job['year']}] Transform Error: {error}")
+            append_log(job["log_file_path"], f"[{job['year']}] Transform Error: {error}\n")
+    return results
+
+@task
+def transform_backfill(jobs, max_workers=1, max_memory=None):
+    """
+    Task Prefect untuk backfill banyak tahun sekaligus lewat process pool.
+    """
+    return run_transform_jobs(jobs, max_workers=max_workers, max_memory=max_memory)
+
+def list_inputs(raw_dir, staging_dir=None):
+    """
+    Input transform per tahun dari raw_dir (*.XPT) dan staging_dir (*.parquet). XPT mentah
+    diutamakan; Parquet staging dipakai untuk tahun yang XPT-nya sudah dihapus
+    (staging.delete_raw). Fingerprint keduanya sama karena hash XPT tersimpan di metadata staging.
+
+    Returns:
+        dict: tahun (str) -> path input
+    """
+    inputs = {}
+    sources = [(raw_dir, "*.XPT", r"LLCP(\d{4}).?XPT")]
+    if staging_dir:
+        sources.append((staging_dir, "*.parquet", r"LLCP(\d{4})\.parquet"))
+    for directory, pattern, regex in sources:
+        for file_path in sorted(glob(os.path.join(directory, pattern))):
+            match = re.search(regex, os.path.basename(file_path).strip(), re.IGNORECASE)
+            if not match:
+                print(f"⚠️ File dilewati: {file_path}")
+                continue
+            inputs.setdefault(match.group(1), file_path)
+    return inputs
+
 if __name__ == "__main__":
+    import argparse
+
     with open("config.yaml", "r") as f:
         config = yaml.safe_load(f)
+    transform_config = config.get("transform", {})
+
+    parser = argparse.ArgumentParser(description="Transform (backfill) semua tahun di raw_dir dan staging_dir")
+    parser.add_argument("command", nargs="?", choices=["run", "plan"], default="run",
+                        help="run: transform tahun yang berubah; plan: hanya tampilkan yang akan dijalankan. "
+                             "Hash input diambil dari metadata staging atau manifest.json; XPT yang tidak "
+                             "tercatat di keduanya di-hash penuh (SHA-256 seluruh file) di setiap pemanggilan")
+    parser.add_argument("--jobs", type=int, default=transform_config.get("jobs", 1),
+                        help="Jumlah tahun yang ditransform paralel")
+    parser.add_argument("--force", action="store_true", help="Abaikan fingerprint, transform semua tahun")
+    parser.add_argument("--apply-params", action="store_true", default=transform_config.get("apply_params", False),
+                        help="Pakai ulang artifact *.params.json yang ada alih-alih fit ulang")
+    parser.add_argument("--max-memory", default=transform_config.get("max_memory"),
+                        help="Batas memori total, mis. 4GiB; menentukan ukuran chunk dan jumlah proses")
+    args = parser.parse_args()
 
+    logging.basicConfig(level=logging.INFO)
     raw_dir = config["dataset"]["raw_dir"]
     processed_dir = config["dataset"]["processed_dir"]
     feature_map_path = "src/transform/feature_map.yaml"
     log_file_path = "logs/missing_features.log"
 
     os.makedirs("logs", exist_ok=True)
-    open(log_file_path, 'w').close()
     os.makedirs(processed_dir, exist_ok=True)
 
-    for file_path in glob(os.path.join(raw_dir, "*.XPT")):
-        match = re.search(r"LLCP(\d{4}).?XPT", os.path.basename(file_path).strip(), re.IGNORECASE)
-        if not match:
-            print(f"⚠️ File dilewati: {file_path}")
-            continue
-        year = match.group(1)
-        output_file = os.path.join(processed_dir, f"diabetes_01_health_indicators_BRFSS{year}.parquet")
-        transform_dataset.fn(file_path, feature_map_path, output_file, year, log_file_path)
+    jobs = []
+    for year, file_path in list_inputs(raw_dir, config["dataset"].get("staging_dir", "data/staging/")).items():
+        output_file = output_path_for(processed_dir, year)
+        jobs.append({
+            "input_path": file_path,
+            "feature_map_path": feature_map_path,
+            "output_path": output_file,
+            "year": year,
+            "log_file_path": log_file_path,
+            "reader": transform_config.get("reader", "xport"),
+            "chunksize": transform_config.get("chunksize"),
+            "fingerprint": compute_fingerprint(input_hash(file_path), feature_map_path),
+            "apply_params": args.apply_params,
+            "validation": transform_config.get("validation", "compiled"),
+            "validation_sample": transform_config.get("validation_sample"),
+            "engine": transform_config.get("engine", "pandas"),
+            "metrics_path": config.get("instrumentation", {}).get("metrics_path", DEFAULT_METRICS_PATH),
+            "max_memory": transform_config.get("max_memory"),
+            "metrics_db": config.get("instrumentation", {}).get("metrics_db", DEFAULT_METRICS_DB),
+            "run_id": LOCAL_RUN_ID,
+        })
+
+    plan = plan_jobs(sorted(jobs, key=lambda job: job["year"]))
+    for item in plan:
+        if args.force and item["action"] == "skip":
+            item.update(action="run", reason="forced")
+        print(f"{item['year']}: {item['action']:<4} ({item['reason']})")
+    if args.command == "plan":
+        raise SystemExit(0)
+
+    # Log fitur ditulis ulang tiap run (satu baris per tahun); riwayat antar-run ada di metrics_db
+    open(log_file_path, "w").close()
+    for item in plan:
+        if item["action"] == "skip":
+            append_log(log_file_path, f"BRFSS{item['year']}: tidak berubah, transform dilewati\n")
+
+    rerun = {item["year"] for item in plan if item["action"] == "run"}
+    run_transform_jobs([job for job in jobs if job["year"] in rerun], max_workers=args.jobs,
+                       max_memory=args.max_memory)
@@ -1,7 +1,7 @@
 # src/visualization/app.py
 
-from dash import Dash, Input, Output, html
-from .data_loader import load_data, get_available_years
+from dash import Dash, Input, Output, State, html, no_update
+from .data_loader import DataStore
 from .layout import create_main_layout, format_bmi_statistics_table, format_data_statistics_table
 from .charts import (
     create_diabetes_trend_chart,
@@ -41,22 +41,13 @@ app.index_string = """
 # Initialize the Dash app
 app.title = DASHBOARD_TITLE
 
-# Load data
+# Load data; later pipeline runs are picked up through the data-version manifest
+store = DataStore()
 try:
-    df = load_data()
-    available_years = get_available_years(df)
-    print(f"Dashboard initialized with data from years: {available_years}")
+    store.load()
+    print(f"Dashboard initialized with data from years: {store.years} (data version {store.version})")
 except Exception as e:
     print(f"Error loading data: {e}")
-    df = None
-    available_years = []
-
-# Set up the layout
-if df is not None and available_years:
-    app.layout = create_main_layout(available_years)
-else:
-    # Error layout if data cannot be loaded
-    app.layout = create_error_layout()
 
 def create_error_layout():
     """Create an error layout when data cannot be loaded."""
@@ -66,114 +57,164 @@ def create_error_layout():
                style={'textAlign': 'center', 'color': 'black', 'fontSize': '1.2em'})
     ], style=CONTAINER_STYLE)
 
+def serve_layout():
+    """Build the layout per page load, so a browser refresh also shows years published since startup."""
+    try:
+        store.refresh() if store.years else store.load()
+    except Exception as e:
+        print(f"Error loading data: {e}")
+    if not store.years:
+        # Error layout if data cannot be loaded
+        return create_error_layout()
+    return create_main_layout(store.years, store.version)
+
+# Set up the layout
+app.layout = serve_layout
+
+# Callback for picking up newly published years without restarting the server
+@app.callback(
+    Output("year-dropdown", "options"),
+    Output("year-dropdown", "value"),
+    Output("data-version", "data"),
+    Input("data-refresh-interval", "n_intervals"),
+    State("year-dropdown", "value"),
+    State("data-version", "data")
+)
+def refresh_data(_, year, version):
+    """Reload changed years when the data version moves and update the year dropdown."""
+    store.refresh()
+    if store.version == version:
+        return no_update, no_update, no_update
+    years = store.years
+    options = [{"label": str(y), "value": y} for y in years]
+    return options, year if year in years else (years[-1] if years else None), store.version
+
 # Callback for diabetes trend chart
 @app.callback(
     Output("trend-diabetes-graph", "figure"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_diabetes_trend(_):
+def update_diabetes_trend(*_):
     """Update diabetes trend chart (shows all years regardless of selected year)."""
-    if df is None:
+    aggregates = store.aggregates
+    if not aggregates:
         return {}
-    return create_diabetes_trend_chart(df)
+    return create_diabetes_trend_chart(aggregates)
 
 # NEW: Callback for data statistics table
 @app.callback(
     Output("data-stats-table", "children"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_data_statistics(year):
+def update_data_statistics(year, _):
     """Update data statistics table for selected year."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return "No data available"
     
-    stats = create_data_statistics_table(df, year)
+    stats = create_data_statistics_table(aggregates, year)
     return format_data_statistics_table(stats)
 
 # NEW: Callback for diabetes comparison bar chart
 @app.callback(
     Output("diabetes-comparison-graph", "figure"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_diabetes_comparison(year):
+def update_diabetes_comparison(year, _):
     """Update diabetes comparison bar chart for selected year."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return {}
-    return create_diabetes_comparison_chart(df, year)
+    return create_diabetes_comparison_chart(aggregates, year)
 
 # Callback for binary features distribution
 @app.callback(
     Output("dist-pie-graph", "figure"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_distribution_pie(year):
+def update_distribution_pie(year, _):
     """Update binary features distribution chart."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return {}
-    return create_binary_features_chart(df, year)
+    return create_binary_features_chart(aggregates, year)
 
 # Callback for sex distribution
 @app.callback(
     Output("sex-pie-graph", "figure"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_sex_pie(year):
+def update_sex_pie(year, _):
     """Update sex distribution pie chart."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return {}
-    return create_sex_pie_chart(df, year)
+    return create_sex_pie_chart(aggregates, year)
 
 # Callback for age distribution
 @app.callback(
     Output("age-pie-graph", "figure"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_age_pie(year):
+def update_age_pie(year, _):
     """Update age distribution pie chart."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return {}
-    return create_age_pie_chart(df, year)
+    return create_age_pie_chart(aggregates, year)
 
 # Callback for BMI density chart
 @app.callback(
     Output("bmi-density-graph", "figure"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_bmi_density(year):
+def update_bmi_density(year, _):
     """Update BMI density chart."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return {}
-    fig, _ = create_bmi_density_chart(df, year)
+    fig, _ = create_bmi_density_chart(aggregates, year)
     return fig
 
 # Callback for BMI statistics table
 @app.callback(
     Output("bmi-stats-table", "children"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_bmi_statistics(year):
+def update_bmi_statistics(year, _):
     """Update BMI statistics table."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return "No data available"
     
-    _, stats = create_bmi_density_chart(df, year)
+    _, stats = create_bmi_density_chart(aggregates, year)
     return format_bmi_statistics_table(stats)
 
 # Callback for correlation heatmap
 @app.callback(
     Output("correlation-heatmap", "figure"),
-    Input("year-dropdown", "value")
+    Input("year-dropdown", "value"),
+    Input("data-version", "data")
 )
-def update_correlation(year):
+def update_correlation(year, _):
     """Update correlation heatmap."""
-    if df is None or year is None:
+    aggregates = store.aggregates
+    if year not in aggregates:
         return {}
-    return create_correlation_heatmap(df, year)
+    return create_correlation_heatmap(aggregates, year)
 
 if __name__ == "__main__":
-    if df is not None:
+    if store.years:
         print(f"Starting dashboard on port {DASHBOARD_PORT}")
-        print(f"Available years: {available_years}")
+        print(f"Available years: {store.years}")
         app.run(debug=True, port=DASHBOARD_PORT)
     else:
         print("Cannot start dashboard: No data loaded")
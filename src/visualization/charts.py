@@ -3,18 +3,19 @@
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
-import numpy as np
-from scipy.stats import gaussian_kde
-from .utils import calculate_bmi_statistics, format_age_labels, format_correlation_values, calculate_data_statistics
+import pandas as pd
+from .utils import format_age_labels, format_correlation_values, year_counts
 from .config import BINARY_FEATURES
-import os
 
-def create_diabetes_trend_chart(df):
+def create_diabetes_trend_chart(aggregates):
     """
     Create diabetes trend chart showing cases per year with line chart.
     """
-    # Group by year and calculate diabetes cases
-    diabetes_trend = df.groupby("Year")["Diabetes_01"].sum().reset_index()
+    # Diabetes cases per year from the per-year Diabetes_01 counts
+    diabetes_trend = pd.DataFrame({
+        "Year": sorted(aggregates),
+        "Diabetes_01": [year_counts(aggregates, year, "Diabetes_01").get(1, 0) for year in sorted(aggregates)],
+    })
     
     # Only show years that have data
     diabetes_trend = diabetes_trend[diabetes_trend["Diabetes_01"] > 0]
@@ -56,25 +57,21 @@ def create_diabetes_trend_chart(df):
     
     return fig
 
-def create_data_statistics_table(df, year):
+def create_data_statistics_table(aggregates, year):
     """
     Create comprehensive data statistics for the selected year.
     """
-    dff = df[df["Year"] == year]
-    parquet_path = os.path.join(
-        "data", "processed", f"diabetes_01_health_indicators_BRFSS{year}.parquet"
-    )
-    stats = calculate_data_statistics(dff, parquet_path=parquet_path)
+    stats = dict(aggregates[year]["statistics"])
+    output_bytes = stats.pop("output_bytes", None)
+    stats["file_size_mb"] = output_bytes / 1024 if output_bytes is not None else None
     return stats
 
-def create_diabetes_comparison_chart(df, year):
+def create_diabetes_comparison_chart(aggregates, year):
     """
     Create bar chart comparing diabetes vs non-diabetes cases for selected year.
     """
-    dff = df[df["Year"] == year]
-    
     # Count diabetes cases
-    diabetes_counts = dff["Diabetes_01"].value_counts().sort_index()
+    diabetes_counts = year_counts(aggregates, year, "Diabetes_01")
     labels = ["Tidak Diabetes", "Diabetes"]
     values = [diabetes_counts.get(0, 0), diabetes_counts.get(1, 0)]
     colors = ['#2E86AB', '#A23B72']  # Blue for non-diabetes, Red for diabetes
@@ -124,12 +121,10 @@ def create_diabetes_comparison_chart(df, year):
     
     return fig
 
-def create_binary_features_chart(df, year):
+def create_binary_features_chart(aggregates, year):
     """
     Create binary features distribution chart with multiple rows and larger pie charts.
     """
-    dff = df[df["Year"] == year]
-    
     # Calculate number of rows and columns for subplot arrangement
     n_features = len(BINARY_FEATURES)
     n_cols = 3  # 3 columns per row
@@ -149,7 +144,7 @@ def create_binary_features_chart(df, year):
         row = i // n_cols + 1
         col_pos = i % n_cols + 1
         
-        counts = dff[col].value_counts().to_dict()
+        counts = year_counts(aggregates, year, col)
         labels = ["Tidak", "Ya"]
         values = [counts.get(0, 0), counts.get(1, 0)]
         
@@ -178,12 +173,11 @@ def create_binary_features_chart(df, year):
     
     return fig
 
-def create_sex_pie_chart(df, year):
+def create_sex_pie_chart(aggregates, year):
     """
     Create sex distribution pie chart.
     """
-    dff = df[df["Year"] == year]
-    counts = dff["Sex"].value_counts()
+    counts = pd.Series(year_counts(aggregates, year, "Sex")).sort_values(ascending=False)
     labels = ["Pria" if val == 1 else "Wanita" for val in counts.index]
     
     fig = px.pie(
@@ -203,12 +197,11 @@ def create_sex_pie_chart(df, year):
     
     return fig
 
-def create_age_pie_chart(df, year):
+def create_age_pie_chart(aggregates, year):
     """
     Create age distribution pie chart with proper labels.
     """
-    dff = df[df["Year"] == year]
-    counts = dff["Age"].value_counts()
+    counts = pd.Series(year_counts(aggregates, year, "Age"))
     
     # Format labels with descriptions
     labels, values = format_age_labels(counts)
@@ -237,23 +230,21 @@ def create_age_pie_chart(df, year):
     
     return fig
 
-def create_bmi_density_chart(df, year):
+def create_bmi_density_chart(aggregates, year):
     """
     Create BMI density chart with KDE curve and statistics.
     """
-    dff = df[df["Year"] == year]
-    bmi_data = dff["BMI"].dropna()
+    bmi = aggregates[year]["bmi"]
     
-    if len(bmi_data) == 0:
+    if not bmi["stats"]:
         # Return empty figure if no data
         fig = go.Figure()
         fig.update_layout(title=f"No BMI data available for {year}")
         return fig, {}
     
-    # Calculate KDE
-    kde = gaussian_kde(bmi_data, bw_method=0.3)
-    x_values = np.linspace(bmi_data.min(), bmi_data.max(), 1000)
-    y_values = kde(x_values)
+    # KDE curve (bw_method=0.3, 1000 points) precomputed at transform time
+    x_values = bmi["kde"]["x"]
+    y_values = bmi["kde"]["y"]
     
     # Create the plot
     fig = go.Figure()
@@ -280,31 +271,23 @@ def create_bmi_density_chart(df, year):
         yaxis=dict(gridcolor='rgba(128,128,128,0.3)')
     )
     
-    # Calculate statistics
-    stats = calculate_bmi_statistics(bmi_data)
+    # Statistics precomputed from the BMI value counts
+    stats = bmi["stats"]
     
     return fig, stats
 
-def create_correlation_heatmap(df, year):
+def create_correlation_heatmap(aggregates, year):
     """
     Create correlation heatmap with appropriate correlation method for mixed data types.
     Uses Spearman correlation which is suitable for:
     - Numeric data (BMI)
     - Ordinal categorical data (Age: 1-13)
     - Binary categorical data (HighBP, HighChol, etc.: 0,1)
+    The matrix over the 11 features (complete cases only) is precomputed at transform time.
     """
-    dff = df[df["Year"] == year]
-    
-    # Define the 11 features explicitly
-    feature_columns = [
-        'Diabetes_01', 'HighBP', 'HighChol', 'BMI', 'Smoker', 
-        'PhysActivity', 'Fruits', 'Veggies', 'DiffWalk', 'Sex', 'Age'
-    ]
+    correlation = aggregates[year]["correlation"]
     
-    # Filter to only include available columns
-    available_cols = [col for col in feature_columns if col in dff.columns]
-    
-    if len(available_cols) < 2:
+    if correlation is None and aggregates[year]["statistics"]["total_columns"] < 2:
         # Return empty figure if insufficient data
         fig = go.Figure()
         fig.update_layout(
@@ -316,13 +299,7 @@ def create_correlation_heatmap(df, year):
         )
         return fig
     
-    # Select data for correlation analysis
-    corr_data = dff[available_cols].copy()
-    
-    # Remove rows with any missing values for correlation calculation
-    corr_data = corr_data.dropna()
-    
-    if len(corr_data) == 0:
+    if correlation is None:
         # Return empty figure if no complete cases
         fig = go.Figure()
         fig.update_layout(
@@ -336,7 +313,7 @@ def create_correlation_heatmap(df, year):
     
     # Calculate Spearman correlation (appropriate for mixed ordinal/binary/continuous data)
     try:
-        corr = corr_data.corr(method='spearman')
+        corr = pd.DataFrame(correlation["matrix"], index=correlation["columns"], columns=correlation["columns"])
         corr_formatted = format_correlation_values(corr)
         
         # Create better feature labels for display
@@ -2,10 +2,30 @@
 
 # Path configurations
 PROCESSED_DIR = "data/processed"
+# Processed layer: Hive-partitioned dataset, one file per Year=<year> partition
+PROCESSED_FILENAME = "diabetes_01_health_indicators.parquet"
 
 # Dashboard configurations
 DASHBOARD_TITLE = "BRFSS Diabetes Dashboard"
 DASHBOARD_PORT = 8050
+# How often the open dashboard checks the data version for newly published years
+DATA_REFRESH_INTERVAL_MS = 10_000
+
+# Compact dtypes for the combined multi-year dataset (matches the transform output schema)
+COLUMN_DTYPES = {
+    "Diabetes_01": "int8",
+    "HighBP": "int8",
+    "HighChol": "int8",
+    "BMI": "float32",
+    "Smoker": "int8",
+    "PhysActivity": "int8",
+    "Fruits": "int8",
+    "Veggies": "int8",
+    "DiffWalk": "int8",
+    "Sex": "int8",
+    "Age": "int8",
+    "Year": "int16",
+}
 
 # Feature configurations
 BINARY_FEATURES = ["HighBP", "HighChol", "Smoker", "PhysActivity", "Fruits", "Veggies", "DiffWalk"]
@@ -1,24 +1,187 @@
 # src/visualization/data_loader.py
 
 import os
+import threading
+import numpy as np
 import pandas as pd
-from .config import PROCESSED_DIR
+import pyarrow.dataset as ds
+from src.transform.aggregates import aggregates_path_for, compute_aggregates, load_aggregates_file
+from src.transform.publish import data_manifest_path, load_data_manifest
+from .config import PROCESSED_DIR, PROCESSED_FILENAME, COLUMN_DTYPES
 
-def load_data(processed_dir=PROCESSED_DIR):
+def load_data(processed_dir=PROCESSED_DIR, years=None, columns=None):
     """
-    Load and combine all BRFSS data files from the processed directory.
+    Load and combine BRFSS data from the processed directory.
+
+    The processed layer is a Hive-partitioned Parquet dataset (Year=2015/...), so only the
+    requested year partitions and columns are read; row groups are pruned via column statistics.
     
     Args:
         processed_dir (str): Path to the directory containing processed parquet files
+        years (list, optional): Years to load (default: all partitions)
+        columns (list, optional): Columns to load besides Year (default: all)
         
     Returns:
         pd.DataFrame: Combined dataframe with all years of data
     """
-    data_frames = []
-    
     if not os.path.exists(processed_dir):
         raise FileNotFoundError(f"Processed data directory not found: {processed_dir}")
-    
+
+    partitions = [d for d in os.listdir(processed_dir) if d.startswith("Year=")]
+    if not partitions:
+        return _load_flat_files(processed_dir)
+
+    dataset = ds.dataset(processed_dir, format="parquet", partitioning="hive")
+    dataset_filter = ds.field("Year").is_valid()  # skips flat files left from older layouts
+    if years is not None:
+        dataset_filter &= ds.field("Year").isin([int(year) for year in years])
+    if columns is not None:
+        columns = [column for column in columns if column != "Year"] + ["Year"]
+
+    table = dataset.to_table(columns=columns, filter=dataset_filter)
+    if table.num_rows == 0:
+        raise ValueError("No valid data files could be loaded")
+    combined_df = table.to_pandas()
+    combined_df = combined_df.astype({col: dtype for col, dtype in COLUMN_DTYPES.items() if col in combined_df.columns})
+
+    for year, count in combined_df["Year"].value_counts().sort_index().items():
+        print(f"Loaded data for year {year}: {count} records")
+    memory_mb = combined_df.memory_usage(deep=True).sum() / (1024 * 1024)
+    print(f"Total combined data: {len(combined_df)} records across {combined_df['Year'].nunique()} years ({memory_mb:.1f} MB)")
+    return combined_df
+
+def load_aggregates(processed_dir=PROCESSED_DIR, years=None):
+    """
+    Load the per-year aggregates written next to each processed partition at transform time.
+
+    Dashboard startup and callbacks therefore do not scale with the number of survey rows.
+    Years without (current) aggregates, e.g. outputs from before they existed, fall back to
+    computing them once from the Parquet rows.
+
+    Args:
+        processed_dir (str): Path to the processed dataset
+        years (list, optional): Years to load (default: all partitions)
+
+    Returns:
+        dict: Mapping year -> aggregates dict
+    """
+    if not os.path.exists(processed_dir):
+        raise FileNotFoundError(f"Processed data directory not found: {processed_dir}")
+
+    partitions = sorted(d for d in os.listdir(processed_dir) if d.startswith("Year="))
+    if not partitions:
+        df = _load_flat_files(processed_dir)
+        return {int(year): compute_aggregates(frame, year) for year, frame in df.groupby("Year", sort=True)
+                if years is None or int(year) in years}
+
+    aggregates = {}
+    for partition in partitions:
+        year = int(partition.split("=", 1)[1])
+        if years is not None and year not in years:
+            continue
+        output_path = os.path.join(processed_dir, partition, PROCESSED_FILENAME)
+        year_aggregates = load_aggregates_file(aggregates_path_for(output_path))
+        if year_aggregates is None:
+            print(f"No aggregates for year {year}, computing them from the Parquet rows")
+            df = load_data(processed_dir, years=[year])
+            year_aggregates = compute_aggregates(df, year, os.path.getsize(output_path))
+        aggregates[year] = year_aggregates
+        print(f"Loaded aggregates for year {year}: {year_aggregates['rows']} records")
+    if not aggregates and years is None:
+        raise ValueError("No valid data files could be loaded")
+    return aggregates
+
+class DataStore:
+    """
+    In-memory per-year aggregates of the processed dataset that follow the pipeline's
+    data-version manifest.
+
+    refresh() is cheap when nothing changed (one stat of the manifest). When the version moves,
+    only the years whose entry changed are read, and the new per-year aggregates are swapped in
+    as one snapshot, so callbacks never see a half-updated dataset.
+    """
+
+    def __init__(self, processed_dir=PROCESSED_DIR):
+        self.processed_dir = processed_dir
+        self._refresh_lock = threading.Lock()
+        self._manifest_stamp = None
+        self._snapshot = {"version": 0, "loaded": {}, "aggregates": {}, "years": []}
+
+    def snapshot(self):
+        """Current snapshot dict (version, loaded, aggregates, years); never mutated once published."""
+        return self._snapshot
+
+    @property
+    def aggregates(self):
+        return self._snapshot["aggregates"]
+
+    @property
+    def years(self):
+        return self._snapshot["years"]
+
+    @property
+    def version(self):
+        return self._snapshot["version"]
+
+    def _manifest_stat(self):
+        try:
+            stat = os.stat(data_manifest_path(self.processed_dir))
+            # The manifest is replaced by rename, so a new inode also marks a new version
+            return stat.st_ino, stat.st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        """Load every year currently on disk."""
+        with self._refresh_lock:
+            self._manifest_stamp = self._manifest_stat()
+            manifest = load_data_manifest(self.processed_dir)
+            aggregates = load_aggregates(self.processed_dir)
+            loaded = {year: manifest["years"].get(str(year), {}).get("version") for year in aggregates}
+            self._publish(manifest["version"], loaded, aggregates)
+        return self.aggregates
+
+    def refresh(self):
+        """
+        Reload the years that changed since the last load.
+
+        Returns:
+            list: Years that were (re)loaded; empty if the data version did not move
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return []  # another request is already refreshing
+        try:
+            stamp = self._manifest_stat()
+            if stamp is None or stamp == self._manifest_stamp:
+                return []
+            self._manifest_stamp = stamp
+            manifest = load_data_manifest(self.processed_dir)
+            current = self._snapshot
+            if manifest["version"] == current["version"]:
+                return []
+
+            published = {int(year): entry["version"] for year, entry in manifest["years"].items()}
+            changed = sorted(year for year, version in published.items() if current["loaded"].get(year) != version)
+            aggregates, loaded = dict(current["aggregates"]), dict(current["loaded"])
+            if changed:
+                for year, year_aggregates in load_aggregates(self.processed_dir, years=changed).items():
+                    aggregates[year] = year_aggregates
+                    loaded[year] = published[year]
+            self._publish(manifest["version"], loaded, aggregates)
+            print(f"Data version {current['version']} -> {manifest['version']}: reloaded years {changed}")
+            return changed
+        finally:
+            self._refresh_lock.release()
+
+    def _publish(self, version, loaded, aggregates):
+        # One reference assignment: readers holding the previous snapshot keep a consistent view
+        self._snapshot = {"version": version, "loaded": loaded, "aggregates": aggregates, "years": sorted(aggregates)}
+
+def _load_flat_files(processed_dir):
+    """
+    Older layout: one flat diabetes_01_health_indicators_BRFSS{year}.parquet file per year.
+    """
+    data_frames = []
     parquet_files = [f for f in os.listdir(processed_dir) if f.endswith(".parquet")]
     
     if not parquet_files:
@@ -29,7 +192,9 @@ def load_data(processed_dir=PROCESSED_DIR):
             df = pd.read_parquet(os.path.join(processed_dir, file))
             # Extract year from filename (assuming format like 'BRFSS2015.parquet')
             year = int(file.split("BRFSS")[-1].split(".")[0])
-            df["Year"] = year
+            df["Year"] = np.full(len(df), year, dtype=COLUMN_DTYPES["Year"])
+            # Older files were written with int64/float64 columns
+            df = df.astype({col: dtype for col, dtype in COLUMN_DTYPES.items() if col in df.columns})
             data_frames.append(df)
             print(f"Loaded data for year {year}: {len(df)} records")
         except Exception as e:
@@ -40,7 +205,8 @@ def load_data(processed_dir=PROCESSED_DIR):
         raise ValueError("No valid data files could be loaded")
     
     combined_df = pd.concat(data_frames, ignore_index=True)
-    print(f"Total combined data: {len(combined_df)} records across {len(data_frames)} years")
+    memory_mb = combined_df.memory_usage(deep=True).sum() / (1024 * 1024)
+    print(f"Total combined data: {len(combined_df)} records across {len(data_frames)} years ({memory_mb:.1f} MB)")
     
     return combined_df
 
@@ -1,7 +1,7 @@
 # src/visualization/layout.py
 
 from dash import dcc, html, dash_table
-from .config import DASHBOARD_TITLE, FEATURE_DESCRIPTIONS, CONTAINER_STYLE, CARD_STYLE
+from .config import DASHBOARD_TITLE, FEATURE_DESCRIPTIONS, CONTAINER_STYLE, CARD_STYLE, DATA_REFRESH_INTERVAL_MS
 from .utils import create_feature_description_table
 
 def create_header():
@@ -129,11 +129,15 @@ def create_centered_chart_card(chart_id):
         dcc.Graph(id=chart_id)
     ], style=CARD_STYLE)
 
-def create_main_layout(available_years):
+def create_main_layout(available_years, data_version=0):
     """Create the main dashboard layout."""
     return html.Div([
         create_header(),
         create_year_selector(available_years),
+
+        # Data version of the snapshot this page renders; bumped when the pipeline publishes a year
+        dcc.Store(id="data-version", data=data_version),
+        dcc.Interval(id="data-refresh-interval", interval=DATA_REFRESH_INTERVAL_MS),
         
         # Charts in cards
         create_chart_card("trend-diabetes-graph"),
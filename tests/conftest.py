@@ -0,0 +1,117 @@
+# tests/conftest.py
+
+import os
+import re
+import hashlib
+import threading
+import email.utils
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+import pytest
+from src.benchmark.synthetic import generate_xpt
+
+class StandInServer:
+    """
+    Server HTTP lokal pengganti CDC yang menyajikan file dari `root`: ETag/Last-Modified,
+    HEAD, Range dan If-Range. Perilakunya bisa diubah per test:
+
+    - ranges: False membuat server mengabaikan Range (selalu 200 + seluruh isi)
+    - head_allowed: False membuat HEAD dijawab 405
+    - fail_from: offset byte; request Range yang dimulai di/atas offset ini dijawab 503
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.ranges = True
+        self.head_allowed = True
+        self.fail_from = None
+        self.requests = []
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def url(self, name):
+        return f"{self.base_url}/{name}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _empty(self, status, headers=()):
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def _serve(self, head):
+                server.requests.append((self.command, self.path, self.headers.get("Range")))
+                path = os.path.join(server.root, os.path.basename(self.path))
+                if not os.path.isfile(path):
+                    return self._empty(404)
+                with open(path, "rb") as f:
+                    data = f.read()
+                etag = f'"{hashlib.md5(data).hexdigest()}"'
+                headers = [("ETag", etag),
+                           ("Last-Modified", email.utils.formatdate(os.path.getmtime(path), usegmt=True))]
+
+                match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+                if_range = self.headers.get("If-Range")
+                if server.ranges and match and (if_range is None or if_range == etag):
+                    start = int(match.group(1))
+                    end = min(int(match.group(2)) if match.group(2) else len(data) - 1, len(data) - 1)
+                    if server.fail_from is not None and start >= server.fail_from:
+                        return self._empty(503)
+                    status = 206
+                    headers += [("Content-Range", f"bytes {start}-{end}/{len(data)}")]
+                else:
+                    start, end, status = 0, len(data) - 1, 200
+                if server.ranges:
+                    headers.append(("Accept-Ranges", "bytes"))
+
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(end - start + 1))
+                self.end_headers()
+                if not head:
+                    self.wfile.write(data[start:end + 1])
+
+            def do_GET(self):
+                self._serve(head=False)
+
+            def do_HEAD(self):
+                if not server.head_allowed:
+                    server.requests.append((self.command, self.path, None))
+                    return self._empty(405, [("Allow", "GET")])
+                self._serve(head=True)
+
+        return Handler
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+@pytest.fixture
+def stand_in_server(tmp_path):
+    root = tmp_path / "remote"
+    root.mkdir()
+    server = StandInServer(str(root)).start()
+    yield server
+    server.stop()
+
+@pytest.fixture(scope="session")
+def synthetic_xpt(tmp_path_factory):
+    """
+    XPT sintetis LLCP2015 kecil (20 ribu baris, kode 7/9 dan nilai hilang seperti BRFSS).
+    """
+    return generate_xpt(str(tmp_path_factory.mktemp("synthetic") / "LLCP2015.XPT"), rows=20_000, fillers=4)
@@ -0,0 +1,78 @@
+# tests/test_aggregates.py
+
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from src.transform.aggregates import (AGGREGATES_VERSION, BMI_HISTOGRAM_BINS, COUNT_COLUMNS, FEATURE_COLUMNS,
+                                      KDE_POINTS, aggregates_path_for, compute_aggregates, load_aggregates_file,
+                                      save_aggregates)
+
+def processed_frame(rows=6_000, seed=0):
+    # Bentuk seperti output transform: kode biner/kategorik dan BMI terstandarisasi float32
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({column: rng.integers(0, 2, rows).astype(np.int8) for column in COUNT_COLUMNS})
+    df["Age"] = rng.integers(1, 14, rows).astype(np.int8)
+    df["Sex"] = rng.integers(0, 2, rows).astype(np.int8)
+    bmi = np.round(rng.lognormal(np.log(27.5), 0.21, rows), 2)
+    df["BMI"] = ((bmi - bmi.mean()) / bmi.std()).astype(np.float32)
+    df.loc[rng.random(rows) < 0.03, "BMI"] = np.nan
+    return df
+
+@pytest.fixture(scope="module")
+def frame():
+    return processed_frame()
+
+@pytest.fixture(scope="module")
+def aggregates(frame):
+    return compute_aggregates(frame, 2015, output_bytes=1234)
+
+def test_counts_match_rows(frame, aggregates):
+    assert set(aggregates["counts"]) == set(COUNT_COLUMNS)
+    for column, pairs in aggregates["counts"].items():
+        assert dict(pairs) == frame[column].value_counts().to_dict()
+
+def test_bmi_summary_matches_rows(frame, aggregates):
+    bmi = frame["BMI"].astype("float64").dropna()
+    summary = aggregates["bmi"]
+
+    assert summary["stats"]["count"] == len(bmi)
+    assert summary["stats"]["mean"] == pytest.approx(bmi.mean(), rel=1e-12, abs=1e-12)
+    assert summary["stats"]["std"] == pytest.approx(bmi.std(ddof=0), rel=1e-12)
+    assert summary["stats"]["skewness"] == pytest.approx(stats.skew(bmi), rel=1e-9)
+    assert summary["stats"]["kurtosis"] == pytest.approx(stats.kurtosis(bmi), rel=1e-9)
+    assert (summary["stats"]["min"], summary["stats"]["max"]) == (bmi.min(), bmi.max())
+
+    counts, edges = np.histogram(bmi, bins=BMI_HISTOGRAM_BINS, range=(bmi.min(), bmi.max()))
+    np.testing.assert_allclose(summary["histogram"]["edges"], edges, rtol=1e-12)
+    assert summary["histogram"]["counts"] == counts.tolist()
+
+    x = np.linspace(bmi.min(), bmi.max(), KDE_POINTS)
+    np.testing.assert_allclose(summary["kde"]["x"], x)
+    np.testing.assert_allclose(summary["kde"]["y"], stats.gaussian_kde(bmi, bw_method=0.3)(x), rtol=1e-7)
+
+def test_correlation_and_statistics_match_rows(frame, aggregates):
+    expected = frame[FEATURE_COLUMNS].dropna().corr(method="spearman")
+
+    assert aggregates["correlation"]["columns"] == list(expected.columns)
+    np.testing.assert_allclose(aggregates["correlation"]["matrix"], expected.to_numpy(), rtol=1e-12)
+    statistics = aggregates["statistics"]
+    assert statistics["total_rows"] == aggregates["rows"] == len(frame)
+    assert statistics["total_missing"] == int(frame.isnull().sum().sum())
+    assert statistics["duplicate_rows"] == int(frame.duplicated().sum())
+    assert statistics["output_bytes"] == 1234
+
+def test_save_and_load(tmp_path, aggregates):
+    output_path = str(tmp_path / "Year=2015" / "diabetes_01_health_indicators.parquet")
+    path = aggregates_path_for(output_path)
+    assert path.endswith("_diabetes_01_health_indicators.aggregates.json")
+    (tmp_path / "Year=2015").mkdir()
+
+    assert load_aggregates_file(path) is None
+    save_aggregates(path, aggregates)
+    assert load_aggregates_file(path) == json.loads(json.dumps(aggregates))
+
+    # Agregat versi lain dianggap tidak ada (dashboard menghitung ulang)
+    save_aggregates(path, {**aggregates, "aggregates_version": AGGREGATES_VERSION + 1})
+    assert load_aggregates_file(path) is None
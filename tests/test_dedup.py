@@ -0,0 +1,51 @@
+# tests/test_dedup.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.dedup import drop_duplicates, has_duplicates, pack_rows
+
+def frame(rows=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    bmi = np.round(rng.normal(27.5, 5.0, rows), 2).astype(np.float32)
+    bmi[rng.random(rows) < 0.05] = np.nan
+    bmi[rng.random(rows) < 0.02] = -0.0
+    bmi[rng.random(rows) < 0.02] = 0.0
+    codes = rng.choice([1.0, 2.0, 7.0, 9.0, np.nan], rows)
+    return pd.DataFrame({
+        "Diabetes_012": rng.integers(0, 3, rows).astype(np.int8),
+        "HighBP": codes,
+        "BMI": bmi,
+        "Ratio": rng.choice([0.1, 0.25, 1e-9, np.nan, 3.5e12], rows),
+    }, index=pd.RangeIndex(100, 100 + rows))
+
+@pytest.mark.parametrize("columns", [
+    ["Diabetes_012"],
+    ["HighBP"],
+    ["BMI"],
+    ["Ratio"],
+    ["Diabetes_012", "HighBP", "BMI"],
+    ["Diabetes_012", "HighBP", "Ratio"],
+])
+def test_matches_pandas(columns):
+    df = frame()[columns]
+
+    pd.testing.assert_frame_equal(drop_duplicates(df), df.drop_duplicates())
+    assert has_duplicates(df) == df.duplicated().any()
+    assert not has_duplicates(df.drop_duplicates())
+
+def test_wide_and_object_frames_fall_back_to_pandas():
+    df = frame()
+    wide = pd.concat([df.add_suffix(f"_{i}") for i in range(3)], axis=1)
+    labels = df.assign(Label=df["Diabetes_012"].map({0: "no", 1: "pre", 2: "yes"}))
+
+    assert pack_rows(wide) is None and pack_rows(labels) is None
+    pd.testing.assert_frame_equal(drop_duplicates(wide), wide.drop_duplicates())
+    pd.testing.assert_frame_equal(drop_duplicates(labels), labels.drop_duplicates())
+
+def test_empty_and_all_missing():
+    empty = frame().iloc[:0]
+    missing = pd.DataFrame({"HighBP": [np.nan] * 3, "BMI": np.array([np.nan] * 3, dtype=np.float32)})
+
+    assert len(drop_duplicates(empty)) == 0 and not has_duplicates(empty)
+    pd.testing.assert_frame_equal(drop_duplicates(missing), missing.iloc[:1])
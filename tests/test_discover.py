@@ -0,0 +1,37 @@
+# tests/test_discover.py
+
+import os
+import pytest
+from prefect.logging import disable_run_logger
+from src.extract.extract import discover_years
+
+@pytest.fixture
+def remote_years(stand_in_server):
+    # 2013 sengaja tidak ada: celah di tengah rentang kandidat
+    for year in (2011, 2012, 2014, 2015):
+        with open(os.path.join(stand_in_server.root, f"LLCP{year}XPT.zip"), "wb") as f:
+            f.write(b"PK" + bytes(64))
+    return stand_in_server.url("LLCP{year}XPT.zip")
+
+def discover(*args, **kwargs):
+    # .fn menjalankan fungsi task tanpa server Prefect; logger run dimatikan
+    with disable_run_logger():
+        return discover_years.fn(*args, **kwargs)
+
+def test_candidate_years_are_configurable(remote_years):
+    assert discover(remote_years, 2011, window=2) == [2011, 2012]
+    assert discover(remote_years, 2014, window=5, workers=2) == [2014, 2015]
+    assert discover(remote_years, 2011, window=0) == []
+
+def test_missing_year_in_the_middle_is_skipped(remote_years, stand_in_server):
+    assert discover(remote_years, 2010, window=8) == [2011, 2012, 2014, 2015]
+    # Setiap kandidat dicek, tidak berhenti di 404 pertama
+    checked = {path for _, path, _ in stand_in_server.requests}
+    assert {f"/LLCP{year}XPT.zip" for year in range(2010, 2018)} <= checked
+
+def test_head_not_allowed_falls_back_to_range_get(remote_years, stand_in_server):
+    stand_in_server.head_allowed = False
+
+    assert discover(remote_years, 2011, window=5) == [2011, 2012, 2014, 2015]
+    requests = [(method, header) for method, path, header in stand_in_server.requests if path == "/LLCP2011XPT.zip"]
+    assert requests == [("HEAD", None), ("GET", "bytes=0-0")]
@@ -0,0 +1,69 @@
+# tests/test_download.py
+
+import os
+import hashlib
+import pytest
+from src.extract.extract import download_file
+
+SEGMENT_SIZE = 64 * 1024
+
+def md5(path):
+    with open(path, "rb") as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+@pytest.fixture
+def remote_file(stand_in_server):
+    path = os.path.join(stand_in_server.root, "LLCP2015XPT.zip")
+    with open(path, "wb") as f:
+        # Bukan kelipatan SEGMENT_SIZE agar segmen terakhir lebih pendek
+        f.write(os.urandom(20 * SEGMENT_SIZE + 1234))
+    return path
+
+def test_segmented_download_matches_source(stand_in_server, remote_file, tmp_path):
+    save_path = str(tmp_path / "LLCP2015XPT.zip")
+
+    stats = download_file(stand_in_server.url("LLCP2015XPT.zip"), save_path, workers=4, segment_size=SEGMENT_SIZE)
+
+    assert md5(save_path) == md5(remote_file)
+    assert stats["ranged"] and not stats["resumed"]
+    assert stats["segments"] == 21
+    assert stats["bytes"] == stats["transferred"] == os.path.getsize(remote_file)
+    assert not os.path.exists(f"{save_path}.part") and not os.path.exists(f"{save_path}.part.json")
+
+def test_single_stream_when_range_ignored(stand_in_server, remote_file, tmp_path):
+    stand_in_server.ranges = False
+    save_path = str(tmp_path / "LLCP2015XPT.zip")
+
+    stats = download_file(stand_in_server.url("LLCP2015XPT.zip"), save_path, workers=4, segment_size=SEGMENT_SIZE)
+
+    assert md5(save_path) == md5(remote_file)
+    assert not stats["ranged"]
+    assert stats["segments"] == 1
+    # Body 200 dari probe langsung di-stream, tanpa request kedua
+    assert len(stand_in_server.requests) == 1
+
+def test_resume_from_part_state(stand_in_server, remote_file, tmp_path):
+    save_path = str(tmp_path / "LLCP2015XPT.zip")
+    url = stand_in_server.url("LLCP2015XPT.zip")
+    stand_in_server.fail_from = 12 * SEGMENT_SIZE
+
+    # Satu worker: segmen selesai berurutan sehingga titik putusnya pasti
+    with pytest.raises(IOError):
+        download_file(url, save_path, workers=1, segment_size=SEGMENT_SIZE)
+    assert not os.path.exists(save_path)
+    assert os.path.exists(f"{save_path}.part") and os.path.exists(f"{save_path}.part.json")
+
+    stand_in_server.fail_from = None
+    stand_in_server.requests.clear()
+    stats = download_file(url, save_path, workers=4, segment_size=SEGMENT_SIZE)
+
+    assert md5(save_path) == md5(remote_file)
+    assert stats["resumed"]
+    # Hanya segmen yang belum selesai (mulai dari offset gagal) yang diunduh ulang
+    assert stats["transferred"] == os.path.getsize(remote_file) - 12 * SEGMENT_SIZE
+    fetched = [int(header.split("=")[1].split("-")[0]) for _, _, header in stand_in_server.requests[1:]]
+    assert min(fetched) == 12 * SEGMENT_SIZE
+    assert not os.path.exists(f"{save_path}.part.json")
+
+def test_missing_file_returns_none(stand_in_server, tmp_path):
+    assert download_file(stand_in_server.url("LLCP1999XPT.zip"), str(tmp_path / "missing.zip")) is None
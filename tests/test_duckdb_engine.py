@@ -0,0 +1,52 @@
+# tests/test_duckdb_engine.py
+
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+from src.load.load import write_staging
+from src.transform.duckdb_engine import encode_and_sample_duckdb
+from src.transform.transform import (DEFAULT_FEATURE_MAP_PATH, default_encoding_kernel, encode_and_sample,
+                                     iter_features, load_feature_mapping, output_path_for, transform_dataset)
+
+TARGET_COUNTS = {0: 1_500}
+
+@pytest.fixture(scope="module")
+def staged_parquet(synthetic_xpt, tmp_path_factory):
+    staged_path = str(tmp_path_factory.mktemp("staging") / "LLCP2015.parquet")
+    write_staging(synthetic_xpt, staged_path, chunksize=6_000)
+    return staged_path
+
+def ordered(df):
+    return df.sort_values(list(df.columns), kind="stable").reset_index(drop=True)
+
+@pytest.mark.parametrize("source", ["xpt", "parquet"])
+@pytest.mark.parametrize("chunksize", [4_000, 250_000])
+def test_duckdb_sample_matches_pandas(source, chunksize, synthetic_xpt, staged_parquet):
+    input_path = synthetic_xpt if source == "xpt" else staged_parquet
+    feature_map = load_feature_mapping(str(DEFAULT_FEATURE_MAP_PATH))
+    kernel = default_encoding_kernel()
+
+    pandas_counts, duckdb_counts = {}, {}
+    chunks, _ = iter_features(input_path, feature_map, chunksize)
+    expected = encode_and_sample(chunks, TARGET_COUNTS, kernel, counts=pandas_counts)
+    actual, missing = encode_and_sample_duckdb(input_path, feature_map, TARGET_COUNTS, kernel,
+                                               chunksize=chunksize, counts=duckdb_counts)
+
+    assert not missing
+    pd.testing.assert_frame_equal(ordered(actual), ordered(expected))
+    assert duckdb_counts["rows_encoded"] == pandas_counts["rows_encoded"]
+
+@pytest.mark.parametrize("source", ["xpt", "parquet"])
+def test_duckdb_transform_output_matches_pandas(source, synthetic_xpt, staged_parquet, tmp_path):
+    input_path = synthetic_xpt if source == "xpt" else staged_parquet
+    outputs = {}
+    for engine in ("pandas", "duckdb"):
+        outputs[engine] = output_path_for(str(tmp_path / engine), 2015)
+        record = transform_dataset.fn(input_path, str(DEFAULT_FEATURE_MAP_PATH), outputs[engine], "2015",
+                                      str(tmp_path / "missing_features.log"), chunksize=5_000, engine=engine,
+                                      target_counts=TARGET_COUNTS, metrics_path=None, metrics_db=None)
+        assert record["status"] == "ok"
+
+    pd.testing.assert_frame_equal(ordered(pd.read_parquet(outputs["duckdb"])),
+                                  ordered(pd.read_parquet(outputs["pandas"])))
+    assert pq.read_schema(outputs["duckdb"]).equals(pq.read_schema(outputs["pandas"]), check_metadata=False)
@@ -0,0 +1,63 @@
+# tests/test_encoding.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.encoding import apply_encoding, compile_encoding, encode_sequential, load_encoding_rules
+from src.transform.schema import OUTPUT_DTYPES
+from src.transform.transform import DEFAULT_FEATURE_MAP_PATH, load_feature_mapping, read_features
+
+COLUMNS = ["Diabetes_01", "HighBP", "HighChol", "BMI", "Smoker", "PhysActivity", "Fruits", "Veggies",
+           "DiffWalk", "Sex", "Age"]
+
+@pytest.fixture(scope="module")
+def kernel():
+    return compile_encoding(load_encoding_rules(DEFAULT_FEATURE_MAP_PATH))
+
+def edge_frame():
+    # Kode di luar aturan (dipertahankan apa adanya), sentinel 7/9/14, NaN di berbagai kolom,
+    # kode pecahan dan negatif yang tidak boleh ikut ter-remap
+    rows = [
+        [1, 1, 1, 2750, 1, 1, 1, 1, 1, 1, 1],
+        [2, 2, 2, 1851, 2, 2, 2, 2, 2, 2, 13],
+        [3, 3, 3, 9999, 3, 3, 3, 3, 3, 3, 5],      # 3: tidak dipetakan kecuali Diabetes_01
+        [4, 1, 5, 1200, 6, 8, 1, 2, 5, 4, 15],     # kode tak dikenal
+        [5, 1, 1, 2750, 1, 1, 1, 1, 1, 1, 1],      # Diabetes_01 tidak valid
+        [7, 1, 1, 2750, 1, 1, 1, 1, 1, 1, 1],
+        [1, 9, 1, 2750, 1, 1, 1, 1, 1, 1, 1],      # sentinel HighBP
+        [1, 1, 7, 2750, 1, 1, 1, 1, 1, 1, 1],
+        [1, 1, 1, 2750, 1, 1, 1, 1, 7, 9, 1],
+        [1, 1, 1, 2750, 1, 1, 1, 1, 1, 1, 14],     # Age 14 dibuang
+        [1, 1, 1, np.nan, 1, 1, 1, 1, 1, 1, 1],
+        [np.nan, 1, 1, 2750, 1, 1, 1, 1, 1, 1, 1],
+        [1, 1, 1, 2750, 1, 1, 1, 1, 1, np.nan, 1],
+        [2, 2.5, -2, 3333, 2, 2, 2, 2, 2, 2, 2],
+        [1, 2, 2, 1, 2, 2, 2, 2, 2, 2, 2],
+    ]
+    return pd.DataFrame(rows, columns=COLUMNS, dtype="float64")
+
+def test_kernel_matches_sequential_on_edge_codes(kernel):
+    df = edge_frame()
+    expected = encode_sequential(df.copy(), kernel)
+
+    actual = apply_encoding(df, kernel)
+    pd.testing.assert_frame_equal(actual, expected)
+    assert len(actual) == 6
+    assert actual.loc[2, "HighBP"] == 3 and actual.loc[3, "Age"] == 15
+
+def test_kernel_matches_sequential_on_synthetic(synthetic_xpt, kernel):
+    df, _ = read_features(synthetic_xpt, load_feature_mapping(str(DEFAULT_FEATURE_MAP_PATH)))
+    df = df.drop_duplicates()
+
+    pd.testing.assert_frame_equal(apply_encoding(df, kernel), encode_sequential(df.copy(), kernel))
+
+def test_bmi_float32_path(kernel):
+    # Staging/pyreadstat bisa memberi BMI float32; hasilnya tetap sama setelah cast ke skema output
+    df = edge_frame().astype({"BMI": "float32"})
+    actual = apply_encoding(df, kernel)
+    expected = encode_sequential(df.copy(), kernel)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert actual["BMI"].dtype == np.float64
+    pd.testing.assert_frame_equal(actual.astype(OUTPUT_DTYPES), expected.astype(OUTPUT_DTYPES))
+    np.testing.assert_allclose(actual["BMI"], edge_frame().pipe(apply_encoding, kernel)["BMI"], rtol=1e-6)
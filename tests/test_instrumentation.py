@@ -0,0 +1,72 @@
+# tests/test_instrumentation.py
+
+import threading
+from src.flow import instrumentation
+from src.flow.instrumentation import StageProfiler
+
+SPIKE_MB = 64
+
+def allocate(mb):
+    block = bytearray(mb * 1024 ** 2)
+    block[::4096] = b"x" * len(block[::4096])  # sentuh tiap halaman agar benar-benar masuk RSS
+    return len(block)
+
+def test_stage_records_peak_and_rows():
+    profiler = StageProfiler("transform", 2015, run_id="test")
+    with profiler.stage("read", rows_in=10) as stage:
+        allocate(SPIKE_MB)
+        stage["rows_out"] = 7
+
+    record = profiler.to_record()
+    assert record["run_id"] == "test" and record["year"] == "2015"
+    assert record["stages"][0]["rows_in"] == 10 and record["stages"][0]["rows_out"] == 7
+    assert not record["rss_unreliable"]
+    if profiler._proc:
+        assert record["stages"][0]["peak_rss_delta_mb"] >= SPIKE_MB * 0.9
+
+def test_overlapping_stages_are_unreliable():
+    inside, release = threading.Event(), threading.Event()
+
+    def background():
+        other = StageProfiler("extract", 2016, run_id="test")
+        with other.stage("download"):
+            inside.set()
+            release.wait(10)
+
+    thread = threading.Thread(target=background)
+    thread.start()
+    inside.wait(10)
+    profiler = StageProfiler("transform", 2015, run_id="test")
+    with profiler.stage("read"):
+        allocate(SPIKE_MB)
+    release.set()
+    thread.join()
+
+    assert profiler.to_record()["rss_unreliable"]
+    assert profiler.stages[0]["rss_unreliable"]
+    # Setelah tahap lain selesai, pengukuran kembali andal
+    with profiler.stage("write"):
+        pass
+    assert not profiler.stages[1]["rss_unreliable"]
+
+def test_stage_works_without_clear_refs(monkeypatch):
+    monkeypatch.setattr(instrumentation, "PROC_CLEAR_REFS", "/nonexistent/clear_refs")
+    profiler = StageProfiler("extract", 2015, run_id="test")
+    assert not profiler._proc
+
+    with profiler.stage("download") as stage:
+        stage["rows_out"] = 1
+    assert profiler.stages[0]["peak_rss_delta_mb"] >= 0
+
+def test_rejected_reset_marks_stage_unreliable(monkeypatch):
+    profiler = StageProfiler("extract", 2015, run_id="test")
+    profiler._proc = True
+
+    def rejected():
+        raise PermissionError("clear_refs")
+
+    monkeypatch.setattr(instrumentation, "_reset_peak_rss", rejected)
+    monkeypatch.setattr(profiler, "_rss_mb", lambda: (100.0, 120.0))
+    with profiler.stage("download"):
+        pass
+    assert profiler.stages[0]["rss_unreliable"]
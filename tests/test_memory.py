@@ -0,0 +1,63 @@
+# tests/test_memory.py
+
+import pytest
+from src.transform.memory import (CHUNK_ROUNDING, MIN_CHUNK_ROWS, estimate_footprint, parse_memory,
+                                  plan_chunksize, plan_workers)
+
+MiB = 1024 ** 2
+BASELINE = 200 * MiB
+TARGET_COUNTS = {0: 70_000}
+PROFILE = {"rows": 400_000, "row_bytes": 1_000, "columns": 23}
+
+def whole_year():
+    return BASELINE + estimate_footprint(PROFILE, None, TARGET_COUNTS)
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None), ("", None), (1024, 1024), ("512M", 512 * MiB), ("4GiB", 4 * 1024 * MiB),
+    (" 1.5 g ", int(1.5 * 1024 * MiB)), ("100kb", 100 * 1024),
+])
+def test_parse_memory(value, expected):
+    assert parse_memory(value) == expected
+
+@pytest.mark.parametrize("value", ["4 lots", "GiB", "1.2.3M"])
+def test_parse_memory_rejects_unknown_format(value):
+    with pytest.raises(ValueError):
+        parse_memory(value)
+
+def test_whole_year_kept_when_it_fits():
+    plan = plan_chunksize(PROFILE, whole_year(), TARGET_COUNTS, baseline=BASELINE)
+
+    assert plan["chunksize"] is None and plan["fits"]
+    assert plan["estimate"] == whole_year()
+
+def test_largest_rounded_chunk_within_budget():
+    budget = whole_year() - 1
+
+    plan = plan_chunksize(PROFILE, budget, TARGET_COUNTS, baseline=BASELINE)
+
+    assert plan["chunksize"] % CHUNK_ROUNDING == 0 and plan["chunksize"] < PROFILE["rows"]
+    assert plan["fits"] and plan["estimate"] <= budget
+    # Satu kelipatan lagi sudah melebihi budget
+    larger = BASELINE + estimate_footprint(PROFILE, plan["chunksize"] + CHUNK_ROUNDING, TARGET_COUNTS)
+    assert larger > budget
+
+def test_configured_chunksize_is_an_upper_bound():
+    plan = plan_chunksize(PROFILE, whole_year() * 2, TARGET_COUNTS, chunksize=50_000, baseline=BASELINE)
+    assert plan["chunksize"] == 50_000 and plan["fits"]
+
+    plan = plan_chunksize(PROFILE, whole_year() * 2, TARGET_COUNTS, chunksize=10 ** 7, baseline=BASELINE)
+    assert plan["chunksize"] == PROFILE["rows"]
+
+def test_budget_below_fixed_footprint_does_not_fit():
+    plan = plan_chunksize(PROFILE, BASELINE + MiB, TARGET_COUNTS, baseline=BASELINE)
+
+    assert plan["chunksize"] == MIN_CHUNK_ROWS
+    assert not plan["fits"] and plan["estimate"] > plan["budget"]
+
+def test_plan_workers_splits_budget():
+    minimal = plan_chunksize(PROFILE, 0, TARGET_COUNTS, MIN_CHUNK_ROWS, baseline=BASELINE)["estimate"]
+    profiles = [PROFILE, PROFILE]
+
+    assert plan_workers(profiles, minimal * 3, 4, TARGET_COUNTS, baseline=BASELINE) == 3
+    assert plan_workers(profiles, minimal * 3, 2, TARGET_COUNTS, baseline=BASELINE) == 2
+    assert plan_workers(profiles, minimal - 1, 4, TARGET_COUNTS, baseline=BASELINE) == 1
@@ -0,0 +1,99 @@
+# tests/test_metrics_store.py
+
+import itertools
+import sqlite3
+import types
+import pytest
+from src.flow import metrics_store
+from src.flow.metrics_store import connect, detect_regressions, record_metrics
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    # recorded_at menentukan urutan riwayat: dibuat naik tegas agar tidak bergantung resolusi jam
+    clock = itertools.count(1_000)
+    monkeypatch.setattr(metrics_store, "time", types.SimpleNamespace(time=lambda: float(next(clock))))
+    return str(tmp_path / "metrics.db")
+
+def transform_record(run_id, wall_s=1.0, peak_rss_mb=100.0, rows=100_000, status="ok", year=2015, **extra):
+    return {"run_id": run_id, "task": "transform", "year": year, "status": status,
+            "finished_at": "2026-01-01T00:00:00", "wall_s": wall_s, "cpu_s": wall_s, "peak_rss_mb": peak_rss_mb,
+            "stages": [{"stage": "read", "rows_out": rows}, {"stage": "write", "rows_out": 1_000}], **extra}
+
+def compare(db_path, run_id, **kwargs):
+    con = connect(db_path)
+    try:
+        return detect_regressions(con, run_id, **kwargs)
+    finally:
+        con.close()
+
+def record_history(db_path, runs=5, **kwargs):
+    for i in range(runs):
+        record_metrics(transform_record(f"base{i}", **kwargs), db_path)
+
+def test_no_history_is_not_a_regression(db_path):
+    record_metrics(transform_record("r1", wall_s=9.0), db_path)
+
+    [item] = compare(db_path, "r1")
+    assert item["history"] == 0 and item["baseline_throughput"] is None
+    assert not item["regression"]
+
+def test_throughput_drop_is_flagged(db_path):
+    record_history(db_path)
+    record_metrics(transform_record("r1", wall_s=1.5), db_path)
+
+    [item] = compare(db_path, "r1")
+    assert item["history"] == 5
+    assert item["baseline_throughput"] == pytest.approx(100_000) and item["throughput"] == pytest.approx(100_000 / 1.5)
+    assert item["regression"]
+    # Di bawah threshold yang lebih longgar tidak dianggap regresi
+    assert not compare(db_path, "r1", threshold=0.5)[0]["regression"]
+
+def test_peak_rss_rise_is_flagged(db_path):
+    record_history(db_path)
+    record_metrics(transform_record("r1", peak_rss_mb=130.0), db_path)
+
+    [item] = compare(db_path, "r1")
+    assert item["baseline_peak_rss_mb"] == 100.0
+    assert item["regression"]
+
+def test_small_absolute_changes_are_noise(db_path):
+    # Throughput turun 50% dan RSS naik 40%, tetapi selisih absolutnya di bawah MIN_*_DELTA
+    record_history(db_path, wall_s=0.02, peak_rss_mb=10.0)
+    record_metrics(transform_record("r1", wall_s=0.04, peak_rss_mb=14.0), db_path)
+
+    assert not compare(db_path, "r1")[0]["regression"]
+
+def test_unreliable_peak_rss_is_not_compared(db_path):
+    record_history(db_path, runs=3)
+    # Riwayat tak andal dengan puncak sangat tinggi tidak boleh ikut menjadi baseline
+    record_metrics(transform_record("noisy", peak_rss_mb=900.0, rss_unreliable=True), db_path)
+    record_metrics(transform_record("r1", peak_rss_mb=500.0, rss_unreliable=True), db_path)
+    record_metrics(transform_record("r2", peak_rss_mb=130.0), db_path)
+
+    [item] = compare(db_path, "r1")
+    assert item["rss_unreliable"] and not item["regression"]
+    [item] = compare(db_path, "r2")
+    assert item["baseline_peak_rss_mb"] == 100.0 and item["regression"]
+
+def test_history_only_uses_earlier_successful_runs_of_the_same_year(db_path):
+    record_history(db_path, runs=2)
+    record_metrics(transform_record("failed", wall_s=0.1, status="validation_failed"), db_path)
+    record_metrics(transform_record("other_year", wall_s=0.1, year=2016), db_path)
+    record_metrics(transform_record("r1"), db_path)
+    record_metrics(transform_record("later", wall_s=0.1), db_path)
+
+    [item] = compare(db_path, "r1", history=10)
+    assert item["history"] == 2 and not item["regression"]
+    # Default: run yang paling akhir dicatat
+    assert compare(db_path, None)[0]["run_id"] == "later"
+
+def test_old_store_is_migrated(db_path):
+    con = sqlite3.connect(db_path)
+    con.executescript(metrics_store.SCHEMA.replace("    rss_unreliable INTEGER NOT NULL DEFAULT 0,\n", ""))
+    con.close()
+
+    record_history(db_path, runs=2)
+    record_metrics(transform_record("r1", peak_rss_mb=130.0, rss_unreliable=True), db_path)
+
+    [item] = compare(db_path, "r1")
+    assert item["history"] == 2 and item["rss_unreliable"] and not item["regression"]
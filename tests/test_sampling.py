@@ -0,0 +1,57 @@
+# tests/test_sampling.py
+
+import pandas as pd
+import pytest
+from src.transform.encoding import compile_encoding, load_encoding_rules
+from src.transform.transform import (DEFAULT_FEATURE_MAP_PATH, encode_and_sample, iter_features,
+                                     load_feature_mapping, read_features)
+
+TARGET_COUNTS = {0: 1_500}
+
+@pytest.fixture(scope="module")
+def kernel():
+    return compile_encoding(load_encoding_rules(DEFAULT_FEATURE_MAP_PATH))
+
+@pytest.fixture(scope="module")
+def feature_map():
+    return load_feature_mapping(str(DEFAULT_FEATURE_MAP_PATH))
+
+def sample(xpt_path, feature_map, kernel, chunksize=None, random_state=42, target_counts=TARGET_COUNTS):
+    if chunksize:
+        chunks, _ = iter_features(xpt_path, feature_map, chunksize)
+    else:
+        df, _ = read_features(xpt_path, feature_map)
+        chunks = [df]
+    counts = {}
+    df = encode_and_sample(chunks, target_counts, kernel=kernel, random_state=random_state, counts=counts)
+    return df, counts
+
+def test_sample_does_not_depend_on_chunksize(synthetic_xpt, feature_map, kernel):
+    expected, counts = sample(synthetic_xpt, feature_map, kernel)
+
+    for chunksize in (1_000, 7_777):
+        actual, chunk_counts = sample(synthetic_xpt, feature_map, kernel, chunksize=chunksize)
+        pd.testing.assert_frame_equal(actual, expected)
+        assert chunk_counts == counts
+
+def test_sample_is_deterministic_per_seed(synthetic_xpt, feature_map, kernel):
+    first, _ = sample(synthetic_xpt, feature_map, kernel, random_state=7)
+    again, _ = sample(synthetic_xpt, feature_map, kernel, random_state=7)
+    other, _ = sample(synthetic_xpt, feature_map, kernel, random_state=8)
+
+    pd.testing.assert_frame_equal(first, again)
+    assert not first.equals(other)
+    # Seed lain memilih baris kelas 0 yang berbeda; kelas tanpa target tetap utuh
+    assert len(other) == len(first)
+
+def test_sample_counts_per_class(synthetic_xpt, feature_map, kernel):
+    df, counts = sample(synthetic_xpt, feature_map, kernel, chunksize=3_000)
+    unsampled, _ = sample(synthetic_xpt, feature_map, kernel, target_counts={})
+
+    assert df["Diabetes_01"].value_counts().to_dict() == {
+        0: TARGET_COUNTS[0], 1: (unsampled["Diabetes_01"] == 1).sum()}
+    assert counts["rows_encoded"] == len(unsampled)
+
+def test_sample_rejects_class_below_target(synthetic_xpt, feature_map, kernel):
+    with pytest.raises(ValueError, match="Diabetes_01=1"):
+        sample(synthetic_xpt, feature_map, kernel, chunksize=5_000, target_counts={0: 100, 1: 1_000_000})
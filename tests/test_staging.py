@@ -0,0 +1,45 @@
+# tests/test_staging.py
+
+import os
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from src.benchmark.synthetic import generate_xpt, xport_header
+from src.load import load
+from src.load.load import SOURCE_HASH_KEY, staged_source_hash, write_staging
+
+def test_write_staging_round_trip(tmp_path):
+    xpt_path = generate_xpt(str(tmp_path / "LLCP2015.XPT"), rows=1_000, fillers=4)
+    staged_path = str(tmp_path / "LLCP2015.parquet")
+
+    assert write_staging(xpt_path, staged_path, source_sha256="abc", chunksize=300) == 1_000
+    assert pq.ParquetFile(staged_path).metadata.num_row_groups == 4
+    assert staged_source_hash(staged_path) == "abc"
+
+def test_write_staging_without_observations(tmp_path):
+    xpt_path = str(tmp_path / "LLCP2015.XPT")
+    with open(xpt_path, "wb") as f:
+        f.write(xport_header(["DIABETE3", "_BMI5"]))
+    staged_path = str(tmp_path / "LLCP2015.parquet")
+
+    assert write_staging(xpt_path, staged_path, source_sha256="abc") == 0
+    table = pq.read_table(staged_path)
+    assert table.num_rows == 0
+    assert table.schema.names == ["DIABETE3", "_BMI5"]
+    assert table.schema.field("_BMI5").type == pa.float64()
+    assert table.schema.metadata[SOURCE_HASH_KEY] == b"abc"
+
+def test_write_staging_removes_partial_file(tmp_path, monkeypatch):
+    xpt_path = generate_xpt(str(tmp_path / "LLCP2015.XPT"), rows=1_000, fillers=4)
+    staged_path = str(tmp_path / "LLCP2015.parquet")
+    chunks = load._iter_raw_chunks
+
+    def interrupted(path, chunksize):
+        iterator = chunks(path, chunksize)
+        yield next(iterator)
+        raise IOError("disk penuh")
+
+    monkeypatch.setattr(load, "_iter_raw_chunks", interrupted)
+    with pytest.raises(IOError):
+        write_staging(xpt_path, staged_path, chunksize=300)
+    assert os.listdir(tmp_path) == ["LLCP2015.XPT"]
@@ -0,0 +1,69 @@
+# tests/test_summaries.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import special, stats
+from src.transform.summaries import (apply_numeric_params, fit_numeric_params, merge_counts, quantile,
+                                     value_counts)
+
+def bmi_values(sigma, rows=30_000, seed=0):
+    # BMI dua desimal seperti _BMI5 / 100, dengan sebagian nilai hilang
+    rng = np.random.default_rng(seed)
+    values = np.round(rng.lognormal(np.log(27.5), sigma, rows), 2)
+    values[rng.random(rows) < 0.05] = np.nan
+    return pd.Series(values)
+
+def full_data_fit(values, skew_threshold=0.75):
+    """
+    Fit dari seluruh baris: quantile pandas, scipy.stats.skew/boxcox dan standarisasi ddof=0.
+    """
+    values = values.dropna()
+    q1, q3 = values.quantile([0.25, 0.75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    values = values.clip(low, high)
+    skew = stats.skew(values)
+    boxcox = None
+    if abs(skew) > skew_threshold:
+        transformed, lmbda = stats.boxcox(values)
+        boxcox = {"lambda": lmbda, "mean": transformed.mean(), "std": transformed.std()}
+        values = pd.Series((transformed - transformed.mean()) / transformed.std())
+    return {"iqr_bounds": [low, high], "skew": skew, "boxcox": boxcox,
+            "scaler": {"mean": values.mean(), "std": values.std(ddof=0)}}
+
+@pytest.mark.parametrize("sigma", [0.05, 0.21, 0.6])
+def test_fit_from_counts_matches_full_data(sigma):
+    values = bmi_values(sigma)
+    expected = full_data_fit(values)
+
+    actual = fit_numeric_params(value_counts(values))
+
+    np.testing.assert_allclose(actual["iqr_bounds"], expected["iqr_bounds"], rtol=1e-12)
+    assert actual["skew"] == pytest.approx(expected["skew"], rel=1e-9)
+    assert (actual["boxcox"] is None) == (expected["boxcox"] is None)
+    if expected["boxcox"]:
+        for key in ("lambda", "mean", "std"):
+            assert actual["boxcox"][key] == pytest.approx(expected["boxcox"][key], rel=1e-6, abs=1e-9)
+    assert actual["scaler"]["mean"] == pytest.approx(expected["scaler"]["mean"], abs=1e-9)
+    assert actual["scaler"]["std"] == pytest.approx(expected["scaler"]["std"], rel=1e-9)
+
+    scaled = apply_numeric_params(values.dropna(), actual)
+    assert scaled.mean() == pytest.approx(0.0, abs=1e-9)
+    assert scaled.std(ddof=0) == pytest.approx(1.0, rel=1e-9)
+
+def test_boxcox_applied_only_to_skewed_data():
+    assert fit_numeric_params(value_counts(bmi_values(0.05)))["boxcox"] is None
+    params = fit_numeric_params(value_counts(bmi_values(0.6)))
+    assert params["boxcox"] is not None
+    clipped = bmi_values(0.6).dropna().clip(*params["iqr_bounds"])
+    np.testing.assert_allclose(apply_numeric_params(clipped, params),
+                               (special.boxcox(clipped, params["boxcox"]["lambda"]) - params["boxcox"]["mean"])
+                               / params["boxcox"]["std"] / params["scaler"]["std"]
+                               - params["scaler"]["mean"] / params["scaler"]["std"], rtol=1e-9, atol=1e-12)
+
+def test_merged_chunk_counts_equal_full_counts():
+    values = bmi_values(0.21)
+    merged = merge_counts(*(value_counts(chunk) for chunk in np.array_split(values, 7)))
+
+    pd.testing.assert_series_equal(merged, value_counts(values), check_names=False)
+    assert quantile(merged, [0.1, 0.5, 0.9]) == pytest.approx(values.dropna().quantile([0.1, 0.5, 0.9]).tolist())
@@ -0,0 +1,72 @@
+# tests/test_synthetic.py
+
+import hashlib
+import pandas as pd
+import pytest
+from src.benchmark.runner import compare
+from src.benchmark.synthetic import CODE_DISTRIBUTIONS, generate_xpt, zip_xpt
+from src.extract.extract import extract_zip
+from src.transform.xport import read_xport, read_xport_header
+
+def variable_names(path):
+    return {column["name"] for column in read_xport_header(path)["columns"]}
+
+def test_same_seed_same_rows(tmp_path):
+    first = generate_xpt(str(tmp_path / "a.XPT"), rows=3_000, fillers=5, seed=3)
+    second = generate_xpt(str(tmp_path / "b.XPT"), rows=3_000, fillers=5, seed=3)
+    other = generate_xpt(str(tmp_path / "c.XPT"), rows=3_000, fillers=5, seed=4)
+
+    # Header memuat timestamp pembuatan; isi baris harus identik
+    pd.testing.assert_frame_equal(read_xport(first), read_xport(second))
+    assert not read_xport(first).equals(read_xport(other))
+
+@pytest.mark.parametrize("year, present, absent", [
+    (2015, {"DIABETE3", "_RFHYPE5", "TOLDHI2", "_FRTLT1", "SEX"}, {"DIABETE4", "SEXVAR", "_FRTLT1A"}),
+    (2018, {"DIABETE3", "_FRTLT1A", "SEXVAR"}, {"DIABETE4", "SEX", "_RFHYPE6"}),
+    (2021, {"DIABETE4", "_RFHYPE6", "TOLDHI3", "SEXVAR"}, {"DIABETE3", "_RFHYPE5", "TOLDHI2"}),
+])
+def test_variable_names_follow_year(tmp_path, year, present, absent):
+    path = generate_xpt(str(tmp_path / f"LLCP{year}.XPT"), rows=10, year=year, fillers=3)
+
+    names = variable_names(path)
+    assert present <= names and not absent & names
+    assert len(names) == len(CODE_DISTRIBUTIONS) + 1 + 3
+
+def test_codes_rows_and_fillers(tmp_path):
+    path = generate_xpt(str(tmp_path / "LLCP2015.XPT"), rows=60_001, fillers=7)
+    df = read_xport(path)
+
+    assert len(df) == 60_001
+    assert sum(name.startswith("FILL") for name in df.columns) == 7
+    assert set(df["DIABETE3"].dropna().unique()) <= set(CODE_DISTRIBUTIONS["Diabetes_01"][0])
+    bmi = df["_BMI5"].dropna()
+    assert bmi.between(1200, 9999).all() and (bmi == bmi.round()).all()
+    assert df["_BMI5"].isna().any()
+
+def test_zip_round_trip(tmp_path):
+    xpt_path = generate_xpt(str(tmp_path / "LLCP2015.XPT"), rows=500, fillers=3)
+    zip_path = zip_xpt(xpt_path, str(tmp_path / "LLCP2015XPT.zip"))
+    (tmp_path / "raw").mkdir()
+
+    path, sha256 = extract_zip(zip_path, str(tmp_path / "raw"))
+
+    assert path == str(tmp_path / "raw" / "LLCP2015.XPT")
+    with open(xpt_path, "rb") as f:
+        assert sha256 == hashlib.sha256(f.read()).hexdigest()
+
+def result(stage, wall_s, peak_rss_delta_mb):
+    return {"rows": 10_000, "year": 2015, "stage": stage, "wall_s": wall_s, "peak_rss_delta_mb": peak_rss_delta_mb}
+
+def test_compare_flags_relative_and_absolute_changes():
+    baseline = {"results": [result("slower", 1.0, 50.0), result("heavier", 1.0, 50.0), result("noise", 0.1, 10.0),
+                            result("same", 1.0, 50.0)]}
+    results = {"results": [result("slower", 1.2, 50.0), result("heavier", 1.0, 65.0), result("noise", 0.14, 16.0),
+                           result("same", 1.05, 52.0), result("new", 9.0, 900.0)]}
+
+    comparisons = {item["stage"]: item for item in compare(results, baseline, threshold=0.10)}
+
+    # Stage tanpa baseline tidak dibandingkan
+    assert set(comparisons) == {"slower", "heavier", "noise", "same"}
+    assert comparisons["slower"]["regression"] and comparisons["heavier"]["regression"]
+    assert not comparisons["noise"]["regression"] and not comparisons["same"]["regression"]
+    assert comparisons["slower"]["wall_ratio"] == pytest.approx(1.2)
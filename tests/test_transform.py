@@ -0,0 +1,80 @@
+# tests/test_transform.py
+
+import os
+import numpy as np
+import pandas as pd
+from src.benchmark.synthetic import generate_xpt, xport_header
+from src.load.load import staging_path_for, write_staging
+from src.transform.fingerprint import input_hash
+from src.transform.transform import (DEFAULT_FEATURE_MAP_PATH, list_inputs, output_path_for, run_transform_jobs,
+                                     transform_dataset)
+from src.transform.xport import RECORD_LENGTH, ieee_to_ibm, read_xport
+
+TARGET_COUNTS = {0: 1_500}
+
+def write_xpt(path, df):
+    block = np.column_stack([ieee_to_ibm(df[column].to_numpy()) for column in df.columns]).astype(">u8")
+    data = memoryview(block).cast("B")
+    with open(path, "wb") as f:
+        f.write(xport_header(list(df.columns)))
+        f.write(data)
+        f.write(b" " * (-len(data) % RECORD_LENGTH))
+    return path
+
+def run_transform(input_path, tmp_path, **kwargs):
+    output_path = output_path_for(str(tmp_path / "processed"), 2015)
+    record = transform_dataset.fn(input_path, str(DEFAULT_FEATURE_MAP_PATH), output_path, "2015",
+                                  str(tmp_path / "missing_features.log"), target_counts=TARGET_COUNTS,
+                                  metrics_path=None, metrics_db=None, **kwargs)
+    return record, output_path
+
+def test_missing_feature_without_chunks(synthetic_xpt, tmp_path):
+    # Regresi: chunksize=None dulu gagal dengan TypeError saat read_features mengembalikan None
+    input_path = write_xpt(str(tmp_path / "LLCP2015.XPT"), read_xport(synthetic_xpt).drop(columns="SEX"))
+
+    record, output_path = run_transform(input_path, tmp_path, chunksize=None)
+
+    assert record["status"] == "missing_features"
+    assert record["stages"][0]["stage"] == "read" and record["stages"][0]["rows_out"] is None
+    with open(tmp_path / "missing_features.log") as f:
+        assert "Fitur tidak lengkap untuk 2015: ['Sex']" in f.read()
+    assert not (tmp_path / "processed").exists()
+
+def test_parallel_backfill_matches_serial(tmp_path):
+    inputs = {year: generate_xpt(str(tmp_path / f"LLCP{year}.XPT"), rows=20_000, year=year, fillers=4, seed=year)
+              for year in (2015, 2021)}
+
+    def backfill(name, max_workers):
+        jobs = [{"input_path": path, "feature_map_path": str(DEFAULT_FEATURE_MAP_PATH),
+                 "output_path": output_path_for(str(tmp_path / name), year), "year": str(year),
+                 "log_file_path": str(tmp_path / f"{name}.log"), "chunksize": 7_000, "target_counts": TARGET_COUNTS,
+                 "metrics_path": None, "metrics_db": None} for year, path in inputs.items()]
+        jobs.append({**jobs[0], "input_path": str(tmp_path / "LLCP2016.XPT"), "year": "2016",
+                     "output_path": output_path_for(str(tmp_path / name), 2016)})
+        return run_transform_jobs(jobs, max_workers=max_workers), jobs
+
+    serial, jobs = backfill("serial", 1)
+    parallel, _ = backfill("parallel", 2)
+
+    assert serial["2015"] is None and serial["2021"] is None and serial["2016"]
+    assert parallel.keys() == serial.keys() and parallel["2016"] == serial["2016"]
+    for job in jobs[:2]:
+        expected = pd.read_parquet(job["output_path"])
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(pd.read_parquet(job["output_path"].replace("serial", "parallel")), expected)
+
+def test_list_inputs_includes_staged_years(synthetic_xpt, tmp_path):
+    raw_dir, staging_dir = tmp_path / "raw", tmp_path / "staging"
+    raw_dir.mkdir()
+    staging_dir.mkdir()
+    os.link(synthetic_xpt, raw_dir / "LLCP2015.XPT")
+    # 2016 di-staging dengan staging.delete_raw: hanya Parquet-nya yang tersisa
+    for year in (2015, 2016):
+        write_staging(synthetic_xpt, staging_path_for(str(staging_dir), year), source_sha256=f"sha-{year}")
+    (staging_dir / "notes.parquet").touch()
+
+    inputs = list_inputs(str(raw_dir), str(staging_dir))
+
+    assert inputs == {"2015": str(raw_dir / "LLCP2015.XPT"), "2016": staging_path_for(str(staging_dir), 2016)}
+    assert list_inputs(str(raw_dir)) == {"2015": str(raw_dir / "LLCP2015.XPT")}
+    assert input_hash(inputs["2016"]) == "sha-2016"
@@ -0,0 +1,64 @@
+# tests/test_validation.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.transform.schema import OUTPUT_DTYPES
+from src.transform.validation import validate_dataset
+
+FLAGS = ["Diabetes_01", "HighBP", "HighChol", "Smoker", "PhysActivity", "Fruits", "Veggies", "DiffWalk", "Sex"]
+
+def valid_frame(rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({column: rng.integers(0, 2, rows) for column in FLAGS})
+    bmi = rng.standard_normal(rows)
+    df["BMI"] = (bmi - bmi.mean()) / bmi.std()
+    df["Age"] = rng.integers(1, 14, rows)
+    return df[list(OUTPUT_DTYPES)].astype(OUTPUT_DTYPES)
+
+def out_of_range_code(df):
+    df.loc[df.index[:3], "HighBP"] = 5
+    return df
+
+def negative_age(df):
+    df.loc[df.index[3], "Age"] = -1
+    return df
+
+def nan_in_non_nullable(df):
+    df.loc[df.index[10], "BMI"] = np.nan
+    return df
+
+def bmi_outlier(df):
+    df.loc[df.index[0], "BMI"] = 6.0
+    return df
+
+def bmi_not_standardized(df):
+    df["BMI"] = df["BMI"] * 3
+    return df
+
+def wrong_dtype(df):
+    return df.astype({"HighChol": "int64"})
+
+def duplicate_rows(df):
+    return pd.concat([df, df.iloc[:2]])
+
+def missing_column(df):
+    return df.drop(columns="Sex")
+
+@pytest.mark.parametrize("corrupt", [None, out_of_range_code, negative_age, nan_in_non_nullable, bmi_outlier,
+                                     bmi_not_standardized, wrong_dtype, duplicate_rows, missing_column])
+def test_compiled_validator_agrees_with_pandera(corrupt):
+    df = valid_frame()
+    if corrupt is not None:
+        df = corrupt(df)
+
+    expected = validate_dataset(df.copy(), method="pandera")
+    actual = validate_dataset(df.copy())
+
+    assert actual.empty == expected.empty == (corrupt is None)
+    assert set(actual["column"].dropna()) == set(expected["column"].dropna())
+    assert set(actual["check"]) == set(expected["check"])
+
+def test_sampled_validation_still_finds_duplicates():
+    df = duplicate_rows(valid_frame())
+    assert not validate_dataset(df, sample=100).empty
@@ -0,0 +1,71 @@
+# tests/test_xport.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.benchmark.synthetic import generate_xpt, xport_header
+from src.transform.xport import RECORD_LENGTH, ibm_to_ieee, ieee_to_ibm, iter_xport, read_xport, read_xport_header
+
+VALUES = {
+    "ZERO": [0.0, 0.0, 1.0, 0.0, -0.0, 5.0, 0.0],
+    "MIXED": [1.0, -2.5, np.nan, 1e-5, 123456789.125, -7.25e70, 0.1],
+    "BMI5": [2750.0, np.nan, np.nan, 1200.0, 9999.0, np.nan, 3141.0],
+}
+
+def write_xpt(path, columns):
+    names = list(columns)
+    block = np.column_stack([ieee_to_ibm(values) for values in columns.values()]).astype(">u8")
+    data = memoryview(block).cast("B")
+    with open(path, "wb") as f:
+        f.write(xport_header(names))
+        f.write(data)
+        f.write(b" " * (-len(data) % RECORD_LENGTH))
+    return path
+
+def read_sas(path, columns=None):
+    expected = pd.read_sas(path, format="xport")
+    if columns is not None:
+        expected = expected[columns]
+    # pd.read_sas mengubah 0 IBM menjadi 16 ** -65; reader ini mengembalikan 0 persis
+    return expected.mask(expected.abs() < 1e-70, 0.0)
+
+@pytest.fixture
+def small_xpt(tmp_path):
+    return write_xpt(str(tmp_path / "SMALL.XPT"), VALUES)
+
+@pytest.fixture(scope="module")
+def synthetic_xpt(tmp_path_factory):
+    return generate_xpt(str(tmp_path_factory.mktemp("xport") / "LLCP2015.XPT"), rows=2_003, fillers=6, seed=1)
+
+def test_read_xport_matches_read_sas(small_xpt):
+    actual = read_xport(small_xpt)
+
+    pd.testing.assert_frame_equal(actual, read_sas(small_xpt), check_exact=False, rtol=1e-12)
+    assert read_xport_header(small_xpt)["nobs"] == len(VALUES["ZERO"])
+    # Nilai hilang SAS '.' menjadi NaN, 0 IBM menjadi 0 persis
+    assert actual["MIXED"].isna().tolist() == [False, False, True, False, False, False, False]
+    assert (actual["ZERO"][[0, 1, 3, 4, 6]] == 0.0).all()
+
+def test_ieee_to_ibm_round_trip():
+    values = np.array(VALUES["MIXED"] + VALUES["ZERO"])
+    words = ieee_to_ibm(values)
+    actual = ibm_to_ieee(words.view(np.uint8).reshape(-1, 8))
+    np.testing.assert_array_equal(actual, np.where(values == 0, 0.0, values))
+
+@pytest.mark.parametrize("chunksize", [1, 3, 4, 7, 100])
+def test_iter_xport_chunks_match_read_sas(small_xpt, chunksize):
+    chunks = list(iter_xport(small_xpt, chunksize=chunksize))
+
+    assert [len(chunk) for chunk in chunks[:-1]] == [chunksize] * (len(chunks) - 1)
+    pd.testing.assert_frame_equal(pd.concat(chunks), read_sas(small_xpt), check_exact=False, rtol=1e-12)
+
+@pytest.mark.parametrize("chunksize", [500, 1_000, 2_003, 10_000])
+def test_synthetic_columns_match_read_sas(synthetic_xpt, chunksize):
+    columns = ["DIABETE3", "_BMI5", "FILL0003", "SEX"]
+    expected = read_sas(synthetic_xpt, columns)
+
+    pd.testing.assert_frame_equal(read_xport(synthetic_xpt, columns=columns), expected,
+                                  check_exact=False, rtol=1e-12)
+    actual = pd.concat(iter_xport(synthetic_xpt, columns=columns, chunksize=chunksize))
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+    assert actual.isna().any().any()